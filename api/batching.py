@@ -0,0 +1,175 @@
+"""
+FILE: api/batching.py
+DESCRIPTION: Dynamic micro-batching of concurrent /assist queries
+FEATURES:
+  - Coalesces queries for up to a time window or maximum batch size
+  - Runs each TaxNLP stage once per batch
+  - Honours per-request deadlines
+  - Queue-depth, batch-size and queue-wait metrics
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from utils.error_handler import InferenceTimeoutError
+from utils.metrics import BATCH_QUEUE_DEPTH, BATCH_SIZE, BATCH_WAIT_SECONDS
+
+BatchFn = Callable[[List[str], List[str], List[Optional[List[str]]]], List[Dict[str, Any]]]
+
+
+class PendingQuery(NamedTuple):
+    query: str
+    language: str
+    future: asyncio.Future
+    enqueued: float
+    deadline: Optional[float]
+    fields: Optional[List[str]]
+
+
+class QueryBatcher:
+    def __init__(self, process_batch: BatchFn, max_batch_size: int = 16, max_wait_ms: float = 10,
+                 executor=None, max_concurrent_batches: int = 1):
+        """
+        In-process request coalescer for the NLP pipeline
+        :param process_batch: Callable taking (queries, languages, fields) and returning one result per query
+        :param max_batch_size: Largest batch handed to the pipeline
+        :param max_wait_ms: Longest time the first query of a batch waits for company
+        :param executor: InferenceExecutor to run batches on (default: loop's executor)
+        :param max_concurrent_batches: Batches allowed in the pipeline at once
+        """
+        self.process_batch = process_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_concurrent_batches = max_concurrent_batches
+        self._queue = None
+        self._worker = None
+        self._slots = None
+        self._dispatches = set()
+
+    async def start(self):
+        """Start the background batching loop on the running event loop"""
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop batching and fail any queries still waiting"""
+        if self._worker is not None:
+            self._worker.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._worker
+            self._worker = None
+
+        for task in list(self._dispatches):
+            task.cancel()
+
+        while self._queue is not None and not self._queue.empty():
+            pending = self._queue.get_nowait()
+            if not pending.future.done():
+                pending.future.set_exception(RuntimeError("Query batcher stopped"))
+        BATCH_QUEUE_DEPTH.set(0)
+
+    async def submit(self, query: str, language: str, deadline: Optional[float] = None,
+                     fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Queue a query and wait for its share of the batch result
+        :param query: User input text
+        :param language: Preferred response language
+        :param deadline: Absolute time.time() after which the caller gives up
+        :param fields: Requested output fields (default: all)
+        :return: Structured analysis results for this query
+        :raises InferenceTimeoutError: When the deadline passes first
+        """
+        if self._worker is None:
+            raise RuntimeError("Query batcher not started. Call start() first.")
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(PendingQuery(query, language, future, time.time(), deadline, fields))
+        BATCH_QUEUE_DEPTH.set(self._queue.qsize())
+
+        if deadline is None:
+            return await future
+        try:
+            # A timed-out wait cancels the future, so the batch loop skips it
+            return await asyncio.wait_for(future, max(0.0, deadline - time.time()))
+        except asyncio.TimeoutError:
+            raise InferenceTimeoutError()
+
+    async def _run(self):
+        """Collect batches until the window closes or the batch is full"""
+        loop = asyncio.get_running_loop()
+        while True:
+            # Keep collecting while earlier batches run, up to the concurrency limit
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            window_closes = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                remaining = window_closes - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            BATCH_QUEUE_DEPTH.set(self._queue.qsize())
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch):
+        """Run one batch through the pipeline and fan results back out"""
+        try:
+            await self._run_batch(batch)
+        finally:
+            self._slots.release()
+
+    async def _run_batch(self, batch):
+        """Execute a collected batch and resolve its callers' futures"""
+        # Skip queries whose callers have timed out or gone away
+        batch = [pending for pending in batch if not pending.future.done()]
+        if not batch:
+            return
+
+        started = time.time()
+        for pending in batch:
+            BATCH_WAIT_SECONDS.observe(started - pending.enqueued)
+        BATCH_SIZE.observe(len(batch))
+
+        queries = [pending.query for pending in batch]
+        languages = [pending.language for pending in batch]
+        fields = [pending.fields for pending in batch]
+
+        # The batch is worth finishing until its most patient caller gives up
+        deadlines = [pending.deadline for pending in batch]
+        deadline = None if None in deadlines else max(deadlines)
+
+        try:
+            if self.executor is not None:
+                results = await self.executor.run(
+                    self.process_batch, queries, languages, fields, deadline=deadline
+                )
+            else:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    None, self.process_batch, queries, languages, fields
+                )
+        except Exception as e:
+            logging.error(f"Batch of {len(batch)} queries failed: {str(e)}")
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        for pending, result in zip(batch, results):
+            if not pending.future.done():
+                pending.future.set_result(result)
+
+# Example usage:
+# batcher = QueryBatcher(nlp.process_batch, max_batch_size=16, max_wait_ms=10, executor=executor)
+# await batcher.start()
+# result = await batcher.submit("Nahitaji msaada na malipo ya VAT", "sw", deadline=time.time() + 10)
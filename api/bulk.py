@@ -0,0 +1,157 @@
+"""
+FILE: api/bulk.py
+DESCRIPTION: Streaming helpers for the /assist/batch endpoint
+FEATURES:
+  - Incremental NDJSON request parsing
+  - Model-sized chunking
+  - NDJSON result lines emitted as each chunk finishes
+  - Streaming response that can keep reading the request body while it writes
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+from starlette.responses import StreamingResponse
+from starlette.types import Receive
+
+ChunkRunner = Callable[[List[str], List[str], List[Any]], Awaitable[List[Dict[str, Any]]]]
+
+
+class RequestStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose content is still reading the request body
+    StreamingResponse listens for client disconnects with receive() while it
+    streams, which would swallow the body chunks the content is waiting for; the
+    listener therefore only starts once the body has been read to the end.
+    """
+    def __init__(self, content: AsyncIterator[bytes], body_read: asyncio.Event, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body_read = body_read
+
+    async def listen_for_disconnect(self, receive: Receive) -> None:
+        await self.body_read.wait()
+        await super().listen_for_disconnect(receive)
+
+
+async def track_body(stream: AsyncIterator[bytes], body_read: asyncio.Event) -> AsyncIterator[bytes]:
+    """Pass body chunks through, setting body_read once the stream ends or is abandoned"""
+    try:
+        async for chunk in stream:
+            yield chunk
+    finally:
+        body_read.set()
+
+
+async def iter_ndjson(stream: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """
+    Parse an NDJSON byte stream one line at a time
+    :param stream: Request body chunks (e.g. request.stream())
+    :return: Decoded JSON value per non-blank line; undecodable lines yield the raw text
+    """
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _decode_line(line)
+    if buffer.strip():
+        yield _decode_line(buffer)
+
+
+def _decode_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line.decode("utf-8", errors="replace")
+
+
+async def read_body(stream: AsyncIterator[bytes], max_bytes: int) -> Optional[bytes]:
+    """
+    Read a whole request body, giving up once it passes max_bytes
+    :param stream: Request body chunks (e.g. request.stream())
+    :return: The body, or None when it is too large
+    """
+    body = bytearray()
+    async for chunk in stream:
+        body += chunk
+        if len(body) > max_bytes:
+            return None
+    return bytes(body)
+
+
+async def iter_list(items: List[Any]) -> AsyncIterator[Any]:
+    """Adapt an already-parsed JSON array to the streaming interface"""
+    for item in items:
+        yield item
+
+
+async def stream_results(records: AsyncIterator[Any], model: type, run_chunk: ChunkRunner,
+                         chunk_size: int = 64) -> AsyncIterator[bytes]:
+    """
+    Validate, chunk and process queries, yielding one NDJSON line per query
+    :param records: Raw query objects
+    :param model: Pydantic model for one query (TaxQuery)
+    :param run_chunk: Coroutine taking (queries, languages, fields) for one chunk
+    :param chunk_size: Queries per pipeline call
+    :return: Encoded NDJSON lines, in input order
+    """
+    chunk: List[Tuple[int, BaseModel]] = []
+    index = 0
+    async for record in records:
+        try:
+            chunk.append((index, model.parse_obj(record)))
+        except ValidationError as e:
+            # Flush earlier queries first so output stays in input order
+            async for line in _run(chunk, run_chunk):
+                yield line
+            chunk = []
+            yield _encode({"index": index, "success": False, "error": e.errors()})
+        index += 1
+
+        if len(chunk) >= chunk_size:
+            async for line in _run(chunk, run_chunk):
+                yield line
+            chunk = []
+
+    async for line in _run(chunk, run_chunk):
+        yield line
+
+
+async def _run(chunk: List[Tuple[int, BaseModel]], run_chunk: ChunkRunner) -> AsyncIterator[bytes]:
+    """Process one chunk and encode its results"""
+    if not chunk:
+        return
+
+    queries = [query.query for _, query in chunk]
+    languages = [query.language for _, query in chunk]
+    fields = [query.fields for _, query in chunk]
+    try:
+        results = await run_chunk(queries, languages, fields)
+    except Exception as e:
+        for index, _ in chunk:
+            yield _encode({"index": index, "success": False, "error": str(e)})
+        return
+
+    for (index, query), result in zip(chunk, results):
+        yield _encode({
+            "index": index,
+            "success": "error" not in result,
+            "data": result,
+            "metadata": {
+                "user_id": query.user_id,
+                "language": query.language
+            }
+        })
+
+
+def _encode(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+
+# Example usage:
+# body_read = asyncio.Event()
+# records = iter_ndjson(track_body(request.stream(), body_read))
+# lines = stream_results(records, TaxQuery, run_chunk, chunk_size=64)
+# return RequestStreamingResponse(lines, body_read, media_type="application/x-ndjson")
@@ -0,0 +1,138 @@
+"""
+FILE: api/executor.py
+DESCRIPTION: Non-blocking inference executor for the FastAPI app
+FEATURES:
+  - Runs CPU-bound pipeline work on a thread or process pool
+  - Bounded admission with fast 503 + Retry-After when full
+  - Per-request deadlines; queued work that has expired is dropped
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, List, Optional
+
+from utils.error_handler import InferenceTimeoutError, ServiceOverloadedError
+from utils.metrics import INFERENCE_IN_FLIGHT, INFERENCE_REJECTED, INFERENCE_TIMEOUTS
+
+# Pipeline instance owned by each worker process in process mode
+_worker_pipeline = None
+
+
+def init_pipeline_worker(factory: Callable[[], Any]):
+    """Process-pool initializer: build one pipeline per worker process"""
+    global _worker_pipeline
+    _worker_pipeline = factory()
+
+
+def process_batch_in_worker(queries: List[str], languages: List[str],
+                            fields: Optional[List[Optional[List[str]]]] = None):
+    """Run a batch on the worker-local pipeline (process mode)"""
+    return _worker_pipeline.process_batch(queries, languages, fields)
+
+
+def model_status_in_worker():
+    """Report the worker-local pipeline's model status (process mode)"""
+    return _worker_pipeline.model_status()
+
+
+def _run_before_deadline(deadline: Optional[float], fn: Callable, *args):
+    """Skip work that sat in the pool queue past its deadline"""
+    if deadline is not None and time.time() >= deadline:
+        raise InferenceTimeoutError()
+    return fn(*args)
+
+
+class InferenceExecutor:
+    def __init__(self, kind: str = "thread", max_workers: int = 2, max_pending: int = 64,
+                 retry_after: int = 1, initializer: Callable = None, initargs: tuple = ()):
+        """
+        Bounded pool for synchronous model inference
+        :param kind: "thread" or "process"
+        :param max_workers: Pool size
+        :param max_pending: Requests admitted at once before shedding load
+        :param retry_after: Seconds advertised to shed clients
+        :param initializer: Per-worker setup (process mode)
+        :param initargs: Arguments for the initializer
+        """
+        if kind == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        elif kind == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=initializer,
+                initargs=initargs
+            )
+        else:
+            raise ValueError(f"Unknown executor kind: {kind}")
+
+        self.kind = kind
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._in_flight = 0
+
+    @property
+    def pool(self) -> Executor:
+        """The underlying pool, for callers that schedule their own calls (e.g. with run_in_executor)"""
+        return self._pool
+
+    @property
+    def saturated(self) -> bool:
+        """True when the next acquire() would be rejected"""
+        return self._in_flight >= self.max_pending
+
+    def acquire(self):
+        """
+        Reserve an admission slot; pair with release()
+        :raises ServiceOverloadedError: When every slot is taken
+        """
+        if self.saturated:
+            INFERENCE_REJECTED.inc()
+            raise ServiceOverloadedError(retry_after=self.retry_after)
+
+        self._in_flight += 1
+        INFERENCE_IN_FLIGHT.set(self._in_flight)
+
+    def release(self):
+        """Return an admission slot"""
+        self._in_flight -= 1
+        INFERENCE_IN_FLIGHT.set(self._in_flight)
+
+    @contextmanager
+    def admit(self):
+        """Hold an admission slot for the duration of one request"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def run(self, fn: Callable, *args, deadline: Optional[float] = None):
+        """
+        Run fn(*args) on the pool without blocking the event loop
+        :param fn: Callable (must be picklable in process mode)
+        :param deadline: Absolute time.time() after which the result is unwanted
+        :return: fn's return value
+        :raises InferenceTimeoutError: When the deadline passes first
+        """
+        future = asyncio.wrap_future(
+            self._pool.submit(_run_before_deadline, deadline, fn, *args)
+        )
+        timeout = None if deadline is None else max(0.0, deadline - time.time())
+
+        try:
+            # Cancelling the wrapper also cancels the pool task if it has not started
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, InferenceTimeoutError):
+            INFERENCE_TIMEOUTS.inc()
+            raise InferenceTimeoutError()
+
+    def shutdown(self):
+        """Stop accepting work and drop anything still queued"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+# Example usage:
+# executor = InferenceExecutor(kind="thread", max_workers=2, max_pending=64)
+# with executor.admit():
+#     result = await executor.run(nlp.process_query, "Muda wa VAT", "sw", deadline=time.time() + 10)
@@ -3,12 +3,31 @@ FILE: api/main.py
 DESCRIPTION: FastAPI service for taxpayer assistance
 """
 
-from fastapi import FastAPI, HTTPException, Security
+from fastapi import FastAPI, HTTPException, Request, Security
+from fastapi.responses import JSONResponse
 from fastapi.security import APIKeyHeader
-from pydantic import BaseModel
-from typing import Optional
-from nlp.full_pipeline import TaxNLP
+from prometheus_client import make_asgi_app
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, validator
+from typing import List, Optional
+from api.batching import QueryBatcher
+from api.bulk import (
+    RequestStreamingResponse, iter_list, iter_ndjson, read_body, stream_results, track_body
+)
+from api.executor import (
+    InferenceExecutor, init_pipeline_worker, model_status_in_worker, process_batch_in_worker
+)
+from config.settings import config
+from nlp.full_pipeline import OUTPUT_FIELDS, RESPONSE_LANGUAGES, TaxNLP
+from utils.error_handler import TaxAPIError, handle_api_error
+from functools import partial
+import asyncio
+import gc
+import json
 import logging
+import os
+import threading
+import time
 
 app = FastAPI(
     title="KRA Tax Assistance API",
@@ -19,14 +38,96 @@ app = FastAPI(
 # Security setup
 api_key_header = APIKeyHeader(name="X-API-KEY", auto_error=False)
 
-# Initialize NLP
-nlp_processor = TaxNLP()
+# Prometheus scrape endpoint
+app.mount("/metrics", make_asgi_app())
+
+serving_config = config.get('nlp_serving', {})
+executor_config = serving_config.get('executor', {})
+batching_config = serving_config.get('batching', {})
+loading_config = serving_config.get('models', {})
+bulk_config = serving_config.get('bulk', {})
+REQUEST_TIMEOUT_S = executor_config.get('request_timeout_s', 10)
+
+# Load models once in the gunicorn master and share them copy-on-write with forked workers
+SHARE_MODELS = os.getenv(
+    'KRA_SHARE_MODELS',
+    '1' if loading_config.get('share_across_workers', False) else '0'
+) == '1'
+
+# With shared models, set by each worker once its post-fork warm-up has run
+models_warmed_up = threading.Event()
+
+# Keep CPU-bound inference off the event loop
+if executor_config.get('kind', 'thread') == 'process':
+    # Each worker process builds its own pipeline
+    nlp_processor = None
+    process_batch = process_batch_in_worker
+    inference_executor = InferenceExecutor(
+        kind='process',
+        max_workers=executor_config.get('max_workers', 2),
+        max_pending=executor_config.get('max_pending', 64),
+        retry_after=executor_config.get('retry_after_s', 1),
+        initializer=init_pipeline_worker,
+        initargs=(partial(TaxNLP.from_config, serving_config),)
+    )
+elif SHARE_MODELS:
+    # Runs at import, i.e. in the master when gunicorn preloads the app. Warm-up waits
+    # until after fork so no intra-op thread pools exist in the master at fork time.
+    nlp_processor = TaxNLP.from_config(serving_config, lazy=True, warmup=False)
+    nlp_processor.load_models()
+    process_batch = nlp_processor.process_batch
+    inference_executor = InferenceExecutor(
+        kind='thread',
+        max_workers=executor_config.get('max_workers', 2),
+        max_pending=executor_config.get('max_pending', 64),
+        retry_after=executor_config.get('retry_after_s', 1)
+    )
+    # Move everything allocated so far out of the collector's reach, so collections in
+    # the workers never write to (and thereby copy) the pages holding model objects
+    gc.freeze()
+else:
+    # Models load in the background after startup so the process comes up immediately
+    nlp_processor = TaxNLP.from_config(serving_config, lazy=True)
+    process_batch = nlp_processor.process_batch
+    inference_executor = InferenceExecutor(
+        kind='thread',
+        max_workers=executor_config.get('max_workers', 2),
+        max_pending=executor_config.get('max_pending', 64),
+        retry_after=executor_config.get('retry_after_s', 1)
+    )
+
+# Coalesce concurrent queries into pipeline batches
+query_batcher = None
+if batching_config.get('enabled', True):
+    query_batcher = QueryBatcher(
+        process_batch,
+        max_batch_size=batching_config.get('max_batch_size', 16),
+        max_wait_ms=batching_config.get('max_wait_ms', 10),
+        executor=inference_executor,
+        max_concurrent_batches=executor_config.get('max_workers', 2)
+    )
 
 # Request models
 class TaxQuery(BaseModel):
     query: str
-    language: Optional[str] = "sw"
+    language: str = "sw"
     user_id: Optional[str] = None
+    fields: Optional[List[str]] = None
+
+    @validator('fields')
+    def check_fields(cls, fields):
+        """Only known analysis outputs may be requested"""
+        unknown = set(fields or []) - set(OUTPUT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields {sorted(unknown)}; choose from {list(OUTPUT_FIELDS)}")
+        return fields
+
+    @validator('language')
+    def check_language(cls, language):
+        """Only languages the service can answer in"""
+        if language not in RESPONSE_LANGUAGES:
+            raise ValueError(f"Unknown language {language!r}; choose from {list(RESPONSE_LANGUAGES)}")
+        return language
 
 # Logging configuration
 logging.basicConfig(
@@ -35,6 +136,86 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+@app.on_event("startup")
+async def start_batcher():
+    if query_batcher is not None:
+        await query_batcher.start()
+
+@app.on_event("startup")
+async def preload_models():
+    if nlp_processor is None:
+        return
+    if SHARE_MODELS:
+        asyncio.get_running_loop().run_in_executor(None, warm_up_shared_models)
+    elif loading_config.get('preload', True):
+        asyncio.get_running_loop().run_in_executor(None, nlp_processor.load_models)
+
+def warm_up_shared_models():
+    """Warm up the models inherited from the master; failures leave the worker unready"""
+    try:
+        nlp_processor.warm_up()
+    except Exception as e:
+        logging.error(f"Warm-up failed: {str(e)}")
+        return
+    models_warmed_up.set()
+
+async def get_model_status():
+    """Per-model load state from this process or a pool worker"""
+    if nlp_processor is not None:
+        return nlp_processor.model_status()
+    return await inference_executor.run(
+        model_status_in_worker,
+        deadline=time.time() + 2
+    )
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving the event loop"""
+    try:
+        models = await get_model_status()
+    except TaxAPIError:
+        models = {}
+    return {"status": "ok", "models": models}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: every model is loaded and warmed up"""
+    try:
+        models = await get_model_status()
+    except TaxAPIError:
+        models = {}
+    loaded = bool(models) and all(m['state'] == 'ready' for m in models.values())
+    if nlp_processor is not None and SHARE_MODELS:
+        # Loaded in the master before fork; this worker still has to run its warm-up
+        ready = loaded and models_warmed_up.is_set()
+    elif nlp_processor is not None and not loading_config.get('preload', True):
+        ready = True  # lazy mode: models load on first request
+    else:
+        ready = loaded
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "models": models}
+    )
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    if query_batcher is not None:
+        await query_batcher.stop()
+    inference_executor.shutdown()
+
+@app.exception_handler(TaxAPIError)
+async def tax_api_error_handler(request: Request, error: TaxAPIError):
+    """Render API errors, advertising Retry-After when load is shed"""
+    error_info = handle_api_error(error)
+    headers = {}
+    if getattr(error, 'retry_after', None) is not None:
+        headers['Retry-After'] = str(error.retry_after)
+    return JSONResponse(
+        status_code=error_info['status_code'],
+        content={"detail": {"message": error_info['error'], "type": error_info['type']}},
+        headers=headers
+    )
+
 def validate_api_key(api_key: str = Security(api_key_header)):
     """
     Validate API key against KRA's auth service
@@ -56,12 +237,23 @@ async def tax_assistance(query: TaxQuery):
         "user_id": "12345"
     }
     """
+    deadline = time.time() + REQUEST_TIMEOUT_S
     try:
         # Process query through NLP pipeline
-        result = nlp_processor.process_query(
-            query.query,
-            query.language
-        )
+        with inference_executor.admit():
+            if query_batcher is not None:
+                result = await query_batcher.submit(
+                    query.query, query.language, deadline, fields=query.fields
+                )
+            else:
+                results = await inference_executor.run(
+                    process_batch,
+                    [query.query],
+                    [query.language],
+                    [query.fields],
+                    deadline=deadline
+                )
+                result = results[0]
         
         # Log interaction
         logging.info(f"Processed query: {query.query} | Result: {result}")
@@ -75,6 +267,10 @@ async def tax_assistance(query: TaxQuery):
             }
         }
         
+    except TaxAPIError as e:
+        logging.warning(f"Query not processed: {e.message}")
+        raise
+
     except Exception as e:
         logging.error(f"Error processing query: {str(e)}")
         raise HTTPException(
@@ -82,6 +278,74 @@ async def tax_assistance(query: TaxQuery):
             detail="Internal server error"
         )
 
+@app.post("/assist/batch", dependencies=[Security(validate_api_key)])
+async def tax_assistance_batch(request: Request):
+    """
+    Bulk endpoint for backfill jobs and SMS gateways
+    Body: an NDJSON upload (Content-Type: application/x-ndjson) with one TaxQuery per
+    line, parsed as it streams in; or a JSON array of TaxQuery objects, which is parsed
+    whole and so is capped at bulk.max_json_bytes (413 beyond that).
+    Response: NDJSON, one line per query in input order, streamed as each chunk finishes
+    {"index": 0, "success": true, "data": {...}, "metadata": {...}}
+    """
+    content_type = request.headers.get('content-type', '')
+    body_read = asyncio.Event()
+    if 'ndjson' in content_type or 'jsonlines' in content_type:
+        records = iter_ndjson(track_body(request.stream(), body_read))
+    else:
+        body_read.set()
+        raw = await read_body(request.stream(), bulk_config.get('max_json_bytes', 1048576))
+        if raw is None:
+            raise HTTPException(
+                status_code=413,
+                detail="JSON array too large; send large uploads as NDJSON (application/x-ndjson)"
+            )
+        try:
+            body = json.loads(raw)
+        except ValueError:
+            # Malformed JSON (or non-UTF-8 bytes) is the client's fault, not a 500
+            raise HTTPException(status_code=400, detail="Request body is not valid JSON")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=422, detail="Expected a JSON array of queries")
+        records = iter_list(body)
+
+    async def run_chunk(queries: List[str], languages: List[str], fields: List[Optional[List[str]]]):
+        return await inference_executor.run(
+            process_batch,
+            queries,
+            languages,
+            fields,
+            deadline=time.time() + REQUEST_TIMEOUT_S
+        )
+
+    # Take the stream's admission slot before the 200 headers go out, so overload
+    # is a clean 503 (ServiceOverloadedError) rather than a truncated response
+    inference_executor.acquire()
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            inference_executor.release()
+
+    async def stream():
+        try:
+            async for line in stream_results(
+                records,
+                TaxQuery,
+                run_chunk,
+                chunk_size=bulk_config.get('chunk_size', 64)
+            ):
+                yield line
+        finally:
+            release()
+
+    # The background task also returns the slot if the stream never started
+    return RequestStreamingResponse(
+        stream(), body_read, media_type="application/x-ndjson", background=BackgroundTask(release)
+    )
+
 def is_valid_key(api_key: str) -> bool:
     """
     Validate API key against KRA's auth service
@@ -89,4 +353,5 @@ def is_valid_key(api_key: str) -> bool:
     # Implement actual key validation logic
     return api_key == "VALID_API_KEY"
 
-# Run with: uvicorn api.main:app --reload
\ No newline at end of file
+# Run with: uvicorn api.main:app --reload
+# Production (shared model weights): gunicorn -c deployment/gunicorn.conf.py api.main:app
\ No newline at end of file
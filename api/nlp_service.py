@@ -5,21 +5,67 @@ FEATURES:
   - Rate limiting
   - Taxpayer authentication
   - Audit logging
+  - Multi-turn context through one DialogueManager per process, with the
+    configured session store and a shared, bounded inference pool
 """
 
+import logging
+import threading
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import APIKeyHeader
+from api.executor import InferenceExecutor
+from config.settings import config
+from nlp.dialogue_manager import DialogueManager
+from nlp.session_store import session_store_from_config
 
 router = APIRouter()
 security = APIKeyHeader(name="X-Taxpayer-Token")
 
+serving_config = config.get('nlp_serving', {})
+executor_config = serving_config.get('executor', {})
+
+# Every turn's intent and NER calls share one pool; admission sheds load with 503
+dialogue_executor = InferenceExecutor(
+    kind='thread',
+    max_workers=executor_config.get('max_workers', 2),
+    max_pending=executor_config.get('max_pending', 64),
+    retry_after=executor_config.get('retry_after_s', 1)
+)
+_dialogue_manager = None
+_dialogue_manager_lock = threading.Lock()
+
+def load_dialogue_models():
+    """Intent classifier and entity recognizer for dialogue turns"""
+    # Imported here so the router can be mounted without the model stacks installed
+    from nlp.entity_recognition.train_ner import TaxEntityRecognizer
+    from nlp.intent_classification.train_classifier import TaxIntentClassifier
+    return TaxIntentClassifier(backend=serving_config.get('inference_backend', 'eager')), TaxEntityRecognizer()
+
+def get_dialogue_manager() -> DialogueManager:
+    """
+    The process-wide dialogue manager, built on first use
+    A sync dependency, so FastAPI runs the model loading off the event loop
+    """
+    global _dialogue_manager
+    if _dialogue_manager is None:
+        with _dialogue_manager_lock:
+            if _dialogue_manager is None:
+                intent_classifier, entity_recognizer = load_dialogue_models()
+                _dialogue_manager = DialogueManager(
+                    intent_classifier,
+                    entity_recognizer,
+                    session_store=session_store_from_config(serving_config.get('sessions', {})),
+                    executor=dialogue_executor.pool
+                )
+    return _dialogue_manager
+
 async def verify_token(api_key: str = Depends(security)):
     """Validate taxpayer authentication token"""
     if not validate_kra_token(api_key):
         raise HTTPException(status_code=401, detail="Invalid taxpayer credentials")
 
 @router.post("/assist", dependencies=[Depends(verify_token)])
-async def tax_assistant(query: dict):
+async def tax_assistant(query: dict, dialogue_manager: DialogueManager = Depends(get_dialogue_manager)):
     """
     Handle taxpayer queries through NLP pipeline
     {
@@ -28,13 +74,15 @@ async def tax_assistant(query: dict):
         "history": []
     }
     """
+    # Raises ServiceOverloadedError (503 + Retry-After) when the pool is saturated
+    dialogue_executor.acquire()
     try:
-        # Process through NLP pipeline
-        intent = intent_classifier.predict_intent(query['query'])
-        entities = entity_recognizer.extract_entities(query['query'])
-        response = dialogue_manager.process_query(
+        # Process through NLP pipeline; intent and entities are analyzed
+        # once, concurrently, inside the dialogue manager
+        response = await dialogue_manager.aprocess_query(
             query.get('user_id', 'anonymous'),
-            query['query']
+            query['query'],
+            language=query.get('language', 'sw')
         )
         
         # Audit log
@@ -47,9 +95,12 @@ async def tax_assistant(query: dict):
         }
     
     except Exception as e:
-        log_error(e)
+        logging.error(f"Dialogue turn failed: {str(e)}")
         return {"error": "Samahani, kuna tatizo la kiufundi. Tafadhali jaribu tena baadaye."}
 
+    finally:
+        dialogue_executor.release()
+
 def log_interaction(query, response):
     """Store encrypted conversation logs"""
     # Implement secure logging to KRA audit system
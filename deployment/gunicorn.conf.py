@@ -0,0 +1,34 @@
+"""
+FILE: deployment/gunicorn.conf.py
+DESCRIPTION: Gunicorn serving mode that shares NLP model weights across workers
+NOTES:
+  - With nlp_serving.models.share_across_workers (or KRA_SHARE_MODELS=1, which
+    overrides it) preload_app imports api.main once in the master, which loads
+    every routed model before any worker is forked
+  - Forked workers map the same physical pages copy-on-write; tensor storage is
+    only read during inference, so it stays shared
+  - Each worker gets an even share of the CPU for torch intra-op threads
+Run with: gunicorn -c deployment/gunicorn.conf.py api.main:app
+"""
+
+import multiprocessing
+import os
+from config.settings import config as app_config
+
+# settings.yaml decides unless the environment overrides it; must be set before the
+# app is imported by the master. (Not named "config": gunicorn reads that as a setting.)
+share_default = app_config.get("nlp_serving", {}).get("models", {}).get("share_across_workers", False)
+share_models = os.getenv("KRA_SHARE_MODELS", "1" if share_default else "0") == "1"
+os.environ["KRA_SHARE_MODELS"] = "1" if share_models else "0"
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = share_models
+timeout = 120
+
+
+def post_fork(server, worker):
+    """Split CPU cores between workers instead of each one claiming all of them"""
+    import torch
+    torch.set_num_threads(max(1, multiprocessing.cpu_count() // workers))
@@ -0,0 +1,75 @@
+"""
+Module: Fitted feature pipeline for FraudDetector
+Features:
+  - Column selection, standard scaling and coercion to C-contiguous float32
+    (the dtype sklearn trees evaluate in, so the forest makes no extra copy)
+  - Fitted once at training time and saved inside the detector artifact with a
+    format version; inference only applies the stored statistics
+  - DataFrame, NumPy and single-record (dict) inputs; one output allocation per call
+"""
+
+from typing import Mapping, Sequence
+import numpy as np
+import pandas as pd
+
+# Bump when the stored fields or the transform change meaning
+FEATURE_PIPELINE_VERSION = 1
+
+class FeaturePipeline:
+    def __init__(self, columns: Sequence[str]):
+        """
+        :param columns: Input columns, in model order
+        """
+        self.columns = list(columns)
+        self.version = FEATURE_PIPELINE_VERSION
+        self.mean_ = None
+        self.inv_scale_ = None
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.mean_ is not None
+
+    def fit(self, df: pd.DataFrame) -> "FeaturePipeline":
+        """
+        Learn per-column mean and standard deviation (as StandardScaler does)
+        :param df: Training data with at least the pipeline's columns
+        """
+        values = df[self.columns].to_numpy(dtype=np.float64)
+        scale = values.std(axis=0)
+        # Constant columns are centred but not scaled
+        scale[scale == 0] = 1.0
+        self.mean_ = values.mean(axis=0).astype(np.float32)
+        self.inv_scale_ = (1.0 / scale).astype(np.float32)
+        return self
+
+    def transform(self, data) -> np.ndarray:
+        """
+        Model-ready features
+        :param data: DataFrame with the pipeline's columns, or an array whose
+            columns are already in pipeline order
+        :return: C-contiguous float32 matrix, shape (rows, columns)
+        """
+        if not self.is_fitted:
+            raise Exception("Feature pipeline not fitted. Call fit() first.")
+        if isinstance(data, pd.DataFrame):
+            X = np.empty((len(data), len(self.columns)), dtype=np.float32)
+            for idx, column in enumerate(self.columns):
+                X[:, idx] = data[column].to_numpy()
+        else:
+            X = np.array(data, dtype=np.float32, order="C", ndmin=2)
+        X -= self.mean_
+        X *= self.inv_scale_
+        return X
+
+    def transform_record(self, record: Mapping[str, float]) -> np.ndarray:
+        """
+        Features for one taxpayer without building a DataFrame
+        :param record: Column -> value, e.g. a parsed JSON request body
+        :return: float32 matrix of shape (1, columns)
+        """
+        return self.transform([[record[column] for column in self.columns]])
+
+# Example usage:
+# pipeline = FeaturePipeline(['amount', 'frequency']).fit(history)
+# pipeline.transform(batch)                              # (n, 2) float32
+# pipeline.transform_record({'amount': 150000, 'frequency': 2})
@@ -1,11 +1,20 @@
 """
 Module: Anomaly Detection for Tax Evasion
 Algorithm: Isolation Forest for unsupervised anomaly detection
+Artifact: one joblib file holding the forest, its compiled node table and its
+          fitted FeaturePipeline
 """
 
 from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
+from models.fraud_detection.compiled_trees import compile_isolation_forest
+from models.fraud_detection.features import FEATURE_PIPELINE_VERSION, FeaturePipeline
 import joblib
+import numpy as np
+
+FEATURES = ['amount', 'frequency', 'declared_income', 'asset_value']
+MODEL_PATH = 'models/fraud_detection/fraud_detector.joblib'
+# Above this many rows sklearn's Cython tree walk is faster than the compiled table
+COMPILED_MAX_ROWS = 2048
 
 class FraudDetector:
     def __init__(self, contamination=0.05):
@@ -18,34 +27,92 @@ class FraudDetector:
             contamination=contamination,
             random_state=42
         )
-        self.scaler = StandardScaler()
+        self.features = FeaturePipeline(FEATURES)
+        self.compiled = None
         self.is_trained = False
 
+    @classmethod
+    def load(cls, path=MODEL_PATH, mmap_mode=None):
+        """
+        Load a detector saved by train()
+        :param mmap_mode: "r" memory-maps its arrays so worker processes share one copy
+        """
+        detector = joblib.load(path, mmap_mode=mmap_mode)
+        version = getattr(getattr(detector, "features", None), "version", None)
+        if version != FEATURE_PIPELINE_VERSION:
+            raise ValueError(
+                f"{path} has feature pipeline version {version}, expected {FEATURE_PIPELINE_VERSION}. "
+                "Retrain the detector."
+            )
+        return detector
+
+    def save(self, path=MODEL_PATH):
+        """Persist feature pipeline and forest together; arrays are stored uncompressed so they can be memory-mapped"""
+        joblib.dump(self, path)
+
     def preprocess_data(self, df):
         """
-        Prepare financial data for model input
+        Fit the feature pipeline on training data (training only; use transform at inference)
         :param df: Raw transaction data
-        :return: Scaled features DataFrame
+        :return: Scaled float32 feature matrix
         """
-        features = df[['amount', 'frequency', 'declared_income', 'asset_value']]
-        return self.scaler.fit_transform(features)
+        return self.features.fit(df).transform(df)
+
+    def transform(self, data):
+        """
+        Apply the fitted feature pipeline; never refits
+        :param data: Raw transaction DataFrame, or an array with FEATURES columns in order
+        :return: Scaled C-contiguous float32 feature matrix
+        """
+        return self.features.transform(data)
 
     def train(self, X):
         """Train model on historical data"""
         self.model.fit(X)
         self.is_trained = True
-        joblib.dump(self.model, 'models/fraud_detection/fraud_model.pkl')
+        self.compile()
+        self.save()
 
-    def predict(self, X):
-        """Identify potential fraud cases"""
+    def compile(self):
+        """Flatten the fitted forest into array node tables; score() uses them for batches up to COMPILED_MAX_ROWS"""
+        self.compiled = compile_isolation_forest(self.model)
+        return self
+
+    def score(self, X):
+        """
+        Fraud labels and anomaly scores in one pass over the forest
+        :param X: Scaled feature matrix
+        :return: (labels, scores) NumPy arrays; labels are 1 for suspected fraud,
+            scores are the Isolation Forest anomaly score (higher is more anomalous)
+        """
         if not self.is_trained:
             raise Exception("Model not trained. Call train() first.")
-            
-        predictions = self.model.predict(X)
-        return [1 if x == -1 else 0 for x in predictions]  # Convert to binary labels
+
+        compiled = getattr(self, "compiled", None)
+        # Both paths give identical scores, so route on batch size alone
+        forest = compiled if compiled is not None and len(X) <= COMPILED_MAX_ROWS else self.model
+        scores = -forest.score_samples(X)
+        # Same cut as IsolationForest.predict: decision_function < 0
+        labels = (scores > -self.model.offset_).astype(np.int8)
+        return labels, scores
+
+    def predict(self, X):
+        """Identify potential fraud cases"""
+        return self.score(X)[0]
+
+    def score_record(self, record):
+        """
+        Score one taxpayer, e.g. from an API request, without building a DataFrame
+        :param record: Feature name -> raw value
+        :return: (label, anomaly score)
+        """
+        labels, scores = self.score(self.features.transform_record(record))
+        return int(labels[0]), float(scores[0])
 
 # Example Usage:
 # detector = FraudDetector()
 # processed_data = detector.preprocess_data(raw_transactions)
 # detector.train(processed_data)
-# fraud_predictions = detector.predict(new_data)
\ No newline at end of file
+# fraud_predictions = detector.predict(detector.transform(new_data))
+# FraudDetector.load().score_record({'amount': 150000, 'frequency': 2, 'declared_income': 50000, 'asset_value': 0})
+# python -m scripts.score_fraud taxpayers.parquet scores.parquet --n-jobs 8
@@ -9,7 +9,10 @@ import xgboost as xgb
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
+from sklearn.metrics import ConfusionMatrixDisplay, classification_report
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from joblib import dump
+from models.fraud_detection.compiled_trees import compile_xgboost
 
 class FraudModelTrainer:
     def __init__(self, config):
@@ -59,18 +62,21 @@ class FraudModelTrainer:
         :param X: Training features
         :param y: Labeled fraud cases
         """
-        X_processed = self.preprocessor.fit_transform(X)
-        self.model.fit(X_processed, y)
+        # The pipeline fits self.preprocessor in place on the way to the classifier
+        self.model.fit(X, y)
         
         # Save model artifacts
         dump(self.preprocessor, 'models/fraud_detection/preprocessor.joblib')
         dump(self.model, 'models/fraud_detection/model.joblib')
+        # Array node tables for single-request scoring (the preprocessor still runs first;
+        # its sparse one-hot output can be passed straight in)
+        dump(compile_xgboost(self.model), 'models/fraud_detection/model_compiled.joblib')
 
     def evaluate(self, X_test, y_test):
         """Generate performance metrics"""
         predictions = self.model.predict(X_test)
         print(classification_report(y_test, predictions))
-        plot_confusion_matrix(self.model, X_test, y_test)
+        ConfusionMatrixDisplay.from_estimator(self.model, X_test, y_test)
 
 # Configuration example in settings.yaml:
 # fraud_model:
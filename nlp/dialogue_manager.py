@@ -4,51 +4,129 @@ FEATURES:
   - Maintain conversation context
   - Handle follow-up questions
   - Escalate complex issues
+  - Bounded session history (TTL, turn and memory caps; optional SQLite store shared across workers)
+  - Query language detected once per turn; replies follow it when the client sets no language
 """
 
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, List, Optional
+from nlp.language_id import detect_language
+from nlp.session_store import InMemorySessionStore, Turn
 
 class DialogueManager:
-    def __init__(self):
-        self.conversation_context = {}
+    def __init__(self, intent_classifier, entity_recognizer, knowledge_base=None,
+                 session_store=None, executor=None):
+        """
+        :param intent_classifier: TaxIntentClassifier (or anything with predict_intent(text, language))
+        :param entity_recognizer: TaxEntityRecognizer (or anything with extract_entities)
+        :param knowledge_base: TaxKnowledgeBase; None uses the canned answer
+        :param session_store: InMemorySessionStore (default) or SQLiteSessionStore
+        :param executor: Executor for aprocess_query's model calls; None uses the loop default
+        """
+        self.intent_classifier = intent_classifier
+        self.entity_recognizer = entity_recognizer
+        self.knowledge_base = knowledge_base
+        self.sessions = session_store if session_store is not None else InMemorySessionStore()
+        self.executor = executor
         self.ESCALATION_THRESHOLD = 0.65
 
-    def process_query(self, user_id: str, query: str) -> Dict[str, Any]:
+    def process_query(self, user_id: str, query: str, language: Optional[str] = "sw") -> Dict[str, Any]:
         """
         Manage multi-turn conversations
         :param user_id: Unique taxpayer identifier
         :param query: Current user input
+        :param language: Preferred response language; None replies in the query's language
         :return: Response and system action
         """
-        # Retrieve conversation history
-        history = self.conversation_context.get(user_id, [])
-        
+        detected = detect_language(query)
+
         # Analyze current intent and entities
-        intent = intent_classifier.predict_intent(query)
-        entities = entity_recognizer.extract_entities(query)
-        
+        intent = self.intent_classifier.predict_intent(query, detected)
+        entities = self.entity_recognizer.extract_entities(query)
+
+        return self._respond(user_id, query, language or self._reply_language(detected), intent, entities)
+
+    async def aprocess_query(self, user_id: str, query: str, language: Optional[str] = "sw") -> Dict[str, Any]:
+        """
+        process_query for async callers: intent and NER run concurrently on the
+        executor, so a turn takes about as long as the slower model
+        :param user_id: Unique taxpayer identifier
+        :param query: Current user input
+        :param language: Preferred response language; None replies in the query's language
+        :return: Response and system action
+        """
+        detected = detect_language(query)
+        loop = asyncio.get_running_loop()
+        intent, entities = await asyncio.gather(
+            loop.run_in_executor(self.executor, self.intent_classifier.predict_intent, query, detected),
+            loop.run_in_executor(self.executor, self.entity_recognizer.extract_entities, query)
+        )
+        return await loop.run_in_executor(
+            self.executor, self._respond, user_id, query, language or self._reply_language(detected),
+            intent, entities
+        )
+
+    @staticmethod
+    def _reply_language(detected: str) -> str:
+        """Response language for a detected query language; Swahili unless the query is plainly English"""
+        return "en" if detected == "en" else "sw"
+
+    def _respond(self, user_id: str, query: str, language: str, intent: Dict[str, Any],
+                 entities: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Build the response from one turn's analysis and record it"""
+        # Retrieve conversation history
+        history = self.sessions.get_history(user_id)
+
         # Handle context carryover
-        if history and "pending_action" in history[-1]:
-            return self._handle_follow_up(user_id, query, history[-1])
-        
+        if history and history[-1].pending_action:
+            return self._handle_follow_up(user_id, query, language, intent, entities, history[-1])
+
         # Generate response
-        response = self._generate_response(intent, entities)
-        
+        response = self._generate_response(query, language, intent, entities)
+
         # Update context
         self._update_context(user_id, intent, entities, response)
-        
+
         return response
 
-    def _generate_response(self, intent, entities):
+    def _handle_follow_up(self, user_id: str, query: str, language: str, intent: Dict[str, Any],
+                          entities: Dict[str, List[str]], last_turn: Turn) -> Dict[str, Any]:
+        """
+        Answer a reply to a clarification request using the previous turn
+        :param last_turn: Turn that asked for clarification
+        """
+        # Entities from the earlier question still apply unless restated
+        merged = last_turn.entity_dict()
+        for label, values in entities.items():
+            merged[label] = values or merged.get(label, [])
+
+        # A short reply ("ni tarehe gani?") rarely carries a confident intent on its own
+        if intent['confidence'] < self.ESCALATION_THRESHOLD and last_turn.confidence > intent['confidence']:
+            intent = {"intent": last_turn.intent, "confidence": last_turn.confidence}
+
+        response = self._generate_response(query, language, intent, merged, clarified=True)
+        self._update_context(user_id, intent, merged, response)
+        return response
+
+    def _update_context(self, user_id: str, intent: Dict[str, Any],
+                        entities: Dict[str, List[str]], response: Dict[str, Any]):
+        """Append this turn to the user's bounded session history"""
+        self.sessions.append_turn(user_id, Turn.create(intent, entities, response))
+
+    def _generate_response(self, query, language, intent, entities, clarified=False):
         """Select appropriate response strategy"""
         if intent['confidence'] < self.ESCALATION_THRESHOLD:
-            return {
+            response = {
                 "action": "escalate",
                 "message": "Samahani, tafadhali eleza swali lako kwa undani zaidi."
             }
+            # Ask once; a second unclear answer goes to an agent instead of looping
+            if not clarified:
+                response["pending_action"] = "clarify"
+            return response
         
         # Connect to KRA knowledge base
-        kb_response = self._query_knowledge_base(intent, entities)
+        kb_response = self._query_knowledge_base(query, language, intent, entities)
         
         return {
             "action": "respond",
@@ -56,10 +134,14 @@ class DialogueManager:
             "suggestions": self._generate_quick_replies(intent)
         }
 
-    def _query_knowledge_base(self, intent, entities):
+    def _query_knowledge_base(self, query, language, intent, entities):
         """Retrieve official tax information"""
-        # Implement integration with KRA document database
-        return "Muda wa kuwasilisha fomu P9A ni tarehe 30 Juni kila mwaka."
+        if self.knowledge_base is None:
+            return "Muda wa kuwasilisha fomu P9A ni tarehe 30 Juni kila mwaka."
+
+        # Entities carried over from earlier turns sharpen short follow-up questions
+        terms = [value for values in entities.values() for value in values if value not in query]
+        return self.knowledge_base.search(" ".join([query, *terms]), language=language)
 
     def _generate_quick_replies(self, intent):
         """Generate context-aware suggestions"""
@@ -69,6 +151,6 @@ class DialogueManager:
         }.get(intent['intent'], [])
 
 # Example conversation flow:
-# dm = DialogueManager()
+# dm = DialogueManager(TaxIntentClassifier(), TaxEntityRecognizer(), TaxKnowledgeBase())
 # response1 = dm.process_query("user123", "Nahitaji msaada na P9A")
-# response2 = dm.process_query("user123", "Je, ni tarehe gani?")
\ No newline at end of file
+# response2 = await dm.aprocess_query("user123", "Je, ni tarehe gani?")
\ No newline at end of file
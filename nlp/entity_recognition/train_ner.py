@@ -10,28 +10,46 @@ ENTITIES:
 
 import spacy
 from spacy.lang.en import English
-from spacy.lang.sw import Swahili
+from nlp.entity_recognition.rule_extractor import RuleExtractor
+from nlp.language_id import detect_language
+from utils.metrics import MULTI_LANGUAGE, timed_stage
 import re
+import time
+
+# Components en_core_web_sm ships that entity extraction never reads
+UNUSED_COMPONENTS = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+
+# Token-level patterns for KRA-specific entities, shared by both pipelines
+ENTITY_PATTERNS = [
+    # KRA PIN pattern: A letter + 9 digits + another letter
+    {"label": "KRA_PIN", "pattern": [{"TEXT": {"REGEX": r"^[A-Z]\d{9}[A-Z]$"}}]},
+    {"label": "TAX_FORM", "pattern": [{"TEXT": {"REGEX": r"^(P9A|IT1|VAT3)$"}}]}
+]
+
+ENTITY_LABELS = ("TAX_TYPE", "KRA_PIN", "TAX_FORM", "CURRENCY")
 
 class TaxEntityRecognizer:
     def __init__(self):
         """
         Hybrid entity recognizer with rules and ML
         """
-        self.nlp = spacy.load("en_core_web_sm")
-        self.sw_nlp = Swahili()
+        self.nlp = spacy.load("en_core_web_sm", exclude=UNUSED_COMPONENTS)
+        # ner in the small English model carries its own tok2vec; drop the shared
+        # one once nothing listens to it
+        if "tok2vec" in self.nlp.pipe_names and not self.nlp.get_pipe("tok2vec").listening_components:
+            self.nlp.remove_pipe("tok2vec")
+        # spaCy has no Swahili language class; the blank multi-language pipeline
+        # tokenizes it well enough for the entity ruler
+        self.sw_nlp = spacy.blank("xx")
+        self.model_version = f"{self.nlp.meta['name']}-{self.nlp.meta['version']}"
+        self.rules = RuleExtractor("spacy_ner", {label: label for label in ENTITY_LABELS})
         self._add_special_patterns()
 
     def _add_special_patterns(self):
-        """Add regex patterns for KRA-specific entities"""
-        # KRA PIN pattern: A letter + 9 digits + another letter
-        kra_pin_pattern = re.compile(r"\b[A-Z]\d{9}[A-Z]\b")
-        
-        ruler = self.nlp.add_pipe("entity_ruler")
-        ruler.add_patterns([
-            {"label": "KRA_PIN", "pattern": [{"TEXT": {"REGEX": kra_pin_pattern}}]},
-            {"label": "TAX_FORM", "pattern": [{"TEXT": {"REGEX": r"\b(P9A|IT1|VAT3)\b"}}]}
-        ])
+        """Add regex patterns for KRA-specific entities to both pipelines, once at load"""
+        # Rules run before the statistical model so a PIN is never relabelled
+        self.nlp.add_pipe("entity_ruler", before="ner").add_patterns(ENTITY_PATTERNS)
+        self.sw_nlp.add_pipe("entity_ruler").add_patterns(ENTITY_PATTERNS)
 
     def extract_entities(self, text):
         """
@@ -39,8 +57,48 @@ class TaxEntityRecognizer:
         :param text: User input text
         :return: Dictionary of entities
         """
-        doc = self.nlp(text) if self._is_english(text) else self.sw_nlp(text)
-        
+        return self.extract_entities_batch([text])[0]
+
+    def extract_entities_batch(self, texts, batch_size=64, n_process=1):
+        """
+        Extract entities from many queries with spaCy's nlp.pipe
+        Queries carrying only structured entities (PIN, form code, tax type, KES
+        amount) are answered by the rule fast path and never reach spaCy
+        :param texts: User input texts
+        :param batch_size: Texts per spaCy batch
+        :param n_process: Worker processes for nlp.pipe (1 runs in-process)
+        :return: Entity dictionaries, in input order
+        """
+        results = [None] * len(texts)
+        by_language = {"en": [], "sw": []}
+        with timed_stage("ner.rules", MULTI_LANGUAGE, self.model_version):
+            for position, text in enumerate(texts):
+                results[position] = self.rules.fast_path(text)
+                if results[position] is None:
+                    by_language["en" if self._is_english(text) else "sw"].append(position)
+
+        for language, positions in by_language.items():
+            if not positions:
+                continue
+            nlp = self.nlp if language == "en" else self.sw_nlp
+            started = time.perf_counter()
+            with timed_stage("ner.spacy", language, self.model_version):
+                docs = nlp.pipe((texts[i] for i in positions), batch_size=batch_size, n_process=n_process)
+                for position, doc in zip(positions, docs):
+                    results[position] = self._collect_entities(doc)
+
+            # Additional currency detection; the rules also add any PIN, form or
+            # tax type the model missed, so both paths agree on structured entities
+            with timed_stage("ner.currency", language, self.model_version):
+                for position in positions:
+                    self.rules.merge(results[position], self.rules.extract(texts[position]))
+            self.rules.record_model_time(time.perf_counter() - started, len(positions))
+
+        return results
+
+    @staticmethod
+    def _collect_entities(doc):
+        """Tax entities found in a processed spaCy doc"""
         entities = {
             "TAX_TYPE": [],
             "KRA_PIN": [],
@@ -51,18 +109,17 @@ class TaxEntityRecognizer:
         for ent in doc.ents:
             if ent.label_ in entities:
                 entities[ent.label_].append(ent.text)
-        
-        # Additional currency detection
-        currencies = re.findall(r"KES\s?\d+|\d+\s?(shillings|bob)", text)
-        entities["CURRENCY"] = currencies
-
         return entities
 
     def _is_english(self, text):
-        """Simple language detection heuristic"""
-        return any(char.isascii() for char in text[:10])
+        """
+        Whether a query needs the English model; Swahili and unscorable text
+        (bare PINs, amounts) go to the cheaper blank multi-language pipeline
+        """
+        return detect_language(text) in ("en", "mixed")
 
 # Example usage:
 # ner = TaxEntityRecognizer()
 # entities = ner.extract_entities("Nimekosa deadline ya P9A kwa PIN A123456789K")
-# {'TAX_FORM': ['P9A'], 'KRA_PIN': ['A123456789K'], ...}
\ No newline at end of file
+# {'TAX_FORM': ['P9A'], 'KRA_PIN': ['A123456789K'], ...}
+# ner.extract_entities_batch(queries, batch_size=128, n_process=2)
\ No newline at end of file
@@ -4,75 +4,427 @@ DESCRIPTION: End-to-end NLP processing for taxpayer queries
 """
 
 from transformers import pipeline
-from typing import Dict, Any
-import re
+from typing import Dict, Any, Iterable, List, Optional
+from nlp.entity_recognition.rule_extractor import RuleExtractor, has_free_text_cues
+from nlp.inference_backends import load_model, load_tokenizer
+from nlp.intent_classification.cascade import DEFAULT_THRESHOLD, IntentCascade
+from nlp.intent_classification.linear_classifier import DEFAULT_MODEL_PATH, HashedIntentClassifier
+from nlp.language_id import UNKNOWN, detect_language
+from nlp.model_registry import ModelRegistry
+from nlp.normalizer import DEFAULT_GLOSSARY, GlossaryNormalizer
+from nlp.query_cache import QueryCache
+from utils.metrics import MULTI_LANGUAGE, PIPELINE_BATCH_SIZE, REQUEST_TOKENS, language_label, timed_stage
+import time
+
+# Output field -> registry model that produces it
+FIELD_MODELS = {"intent": "classifier", "entities": "ner", "sentiment": "sentiment"}
+OUTPUT_FIELDS = tuple(FIELD_MODELS)
+
+# Languages a client may ask to be answered in
+RESPONSE_LANGUAGES = ("sw", "en")
+
+# Stage names used in latency metrics
+FIELD_STAGES = {"intent": "intent", "entities": "ner", "sentiment": "sentiment"}
+
+# Fields served by English-only models; Swahili input is translated first
+ENGLISH_ONLY_FIELDS = {"sentiment"}
+
+# Detected languages whose text goes through the translator for those fields
+TRANSLATED_LANGUAGES = {"sw", "mixed"}
+
+# Entity dictionary returned for every query, and the rule labels that fill it
+ENTITY_LABELS = ("TAX_TYPE", "KRA_PIN", "AMOUNT", "DATE")
+RULE_LABELS = {"TAX_TYPE": "TAX_TYPE", "KRA_PIN": "KRA_PIN", "CURRENCY": "AMOUNT"}
+
+# Dummy inputs used to warm up each model after loading
+WARMUP_INPUTS = {
+    "translator": "Nahitaji msaada na malipo ya VAT",
+    "classifier": "nahitaji msaada na malipo ya VAT",
+    "ner": "PIN yangu ni A123456789K",
+    "sentiment": "asante sana"
+}
 
 class TaxNLP:
-    def __init__(self):
+    def __init__(self, lazy: bool = False, parallel: bool = True, warmup: bool = True,
+                 cache: Optional[QueryCache] = None, model_version: str = "unknown",
+                 fields: Iterable[str] = OUTPUT_FIELDS, translate: bool = True,
+                 backend: str = "eager", glossary_path: str = DEFAULT_GLOSSARY,
+                 intent_cascade: Optional[IntentCascade] = None):
         """
         Initialize all NLP components
+        :param lazy: Defer loading each model until first use
+        :param parallel: Load models concurrently
+        :param warmup: Run a dummy inference after each model loads
+        :param cache: Optional result cache keyed on normalized text
+        :param model_version: Deployed model version, used as a metrics label
+        :param fields: Output fields this deployment serves; other models are never loaded
+        :param translate: Translate Swahili input for English-only models
+        :param backend: Inference backend for the fine-tuned intent and NER models
+        :param glossary_path: TSV glossary of tax terms and their standard forms
+        :param intent_cascade: Linear first tier; only its low-confidence queries reach the intent model
         """
-        # Load multilingual models
-        self.translator = pipeline("translation", model="Helsinki-NLP/opus-mt-sw-en")
-        self.classifier = self._load_intent_classifier()
-        self.ner = self._load_entity_recognizer()
-        self.sentiment = pipeline("sentiment-analysis")
+        self.backend = backend
+
+        # Multilingual models, loaded through the registry
+        self.models = ModelRegistry(
+            loaders={
+                "translator": lambda: pipeline("translation", model="Helsinki-NLP/opus-mt-sw-en"),
+                "classifier": self._load_intent_classifier,
+                "ner": self._load_entity_recognizer,
+                "sentiment": lambda: pipeline("sentiment-analysis")
+            },
+            warmups={
+                name: (lambda model, text=text: model(text))
+                for name, text in WARMUP_INPUTS.items()
+            },
+            warmup_on_load=warmup
+        )
+        self.parallel = parallel
+        self.model_version = model_version
+        self.fields = tuple(field for field in OUTPUT_FIELDS if field in set(fields))
+        self.translate = translate
+        self.intent_cascade = intent_cascade
+
+        # Cached results are stale once models change
+        self.cache = cache
+        if cache is not None:
+            self.models.on_reload(cache.invalidate)
+
+        if not lazy:
+            self.load_models()
         
         # Tax-specific configurations
-        self.TAX_TERMS = {
-            "sw": {"VAT": "VAT", "PAYE": "PAYE", "P9A": "P9A"},
-            "en": {"VAT": "VAT", "PAYE": "PAYE", "P9A": "P9A"}
-        }
+        self.normalizer = GlossaryNormalizer.from_file(glossary_path)
+        self.entity_rules = RuleExtractor("pipeline_ner", RULE_LABELS, ENTITY_LABELS)
+
+    @classmethod
+    def from_config(cls, serving_config: Dict[str, Any], lazy: bool = False,
+                    warmup: Optional[bool] = None) -> "TaxNLP":
+        """
+        Build the pipeline from the nlp_serving settings block
+        :param serving_config: config['nlp_serving']
+        :param lazy: Defer loading each model until first use
+        :param warmup: Override the configured warm-up-on-load setting
+        """
+        loading_config = serving_config.get('models', {})
+        routing_config = serving_config.get('routing', {})
+        cache_config = serving_config.get('cache', {})
+        cascade_config = serving_config.get('intent_cascade', {})
+        model_version = str(serving_config.get('model_version', 'unknown'))
+        return cls(
+            lazy=lazy,
+            parallel=loading_config.get('parallel', True),
+            warmup=loading_config.get('warmup', True) if warmup is None else warmup,
+            cache=(
+                QueryCache.from_config(cache_config, model_version)
+                if cache_config.get('enabled', False) else None
+            ),
+            model_version=model_version,
+            fields=routing_config.get('fields', OUTPUT_FIELDS),
+            translate=routing_config.get('translate', True),
+            backend=serving_config.get('inference_backend', 'eager'),
+            glossary_path=serving_config.get('glossary_path', DEFAULT_GLOSSARY),
+            intent_cascade=(
+                IntentCascade(
+                    HashedIntentClassifier.load(cascade_config.get('model_path', DEFAULT_MODEL_PATH)),
+                    threshold=cascade_config.get('threshold', DEFAULT_THRESHOLD),
+                    component="pipeline_intent",
+                    model_version=model_version
+                )
+                if cascade_config.get('enabled', False) else None
+            )
+        )
+
+    @property
+    def translator(self):
+        return self.models.get("translator")
+
+    @property
+    def classifier(self):
+        return self.models.get("classifier")
+
+    @property
+    def ner(self):
+        return self.models.get("ner")
+
+    @property
+    def sentiment(self):
+        return self.models.get("sentiment")
+
+    def routed_models(self) -> List[str]:
+        """Models that some query can be routed to under this configuration"""
+        names = [FIELD_MODELS[field] for field in self.fields]
+        if self.translate and ENGLISH_ONLY_FIELDS.intersection(self.fields):
+            names.append("translator")
+        return names
+
+    def load_models(self, names: Optional[Iterable[str]] = None):
+        """
+        Load (and warm up) models ahead of traffic
+        :param names: Models to load (default: every routed model)
+        """
+        self.models.load_all(names if names is not None else self.routed_models(), parallel=self.parallel)
+
+    def warm_up(self):
+        """Run warm-up inference on every loaded routed model"""
+        self.models.warm_up(self.routed_models())
+
+    def model_status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model load state and load time for health endpoints"""
+        status = self.models.status()
+        return {name: status[name] for name in self.routed_models()}
         
     def _load_intent_classifier(self):
         """Load fine-tuned intent classification model"""
+        model_path = "models/nlp/intent_classifier"
         return pipeline(
             "text-classification", 
-            model="models/nlp/intent_classifier"
+            model=load_model(model_path, "sequence-classification", self.backend),
+            tokenizer=load_tokenizer(model_path)
         )
 
     def _load_entity_recognizer(self):
         """Load custom NER model"""
+        model_path = "models/nlp/entity_recognizer"
         return pipeline(
             "ner", 
-            model="models/nlp/entity_recognizer",
+            model=load_model(model_path, "token-classification", self.backend),
+            tokenizer=load_tokenizer(model_path),
             grouped_entities=True
         )
 
-    def process_query(self, query: str, language: str = "sw") -> Dict[str, Any]:
+    def process_query(self, query: str, language: str = "sw",
+                      fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
         """
         Full NLP processing pipeline
         :param query: User input text
         :param language: Preferred response language
+        :param fields: Subset of "intent", "entities", "sentiment" (default: all served)
         :return: Structured analysis results
         """
+        return self.process_batch([query], [language], [fields])[0]
+
+    def process_batch(self, queries: List[str], languages: List[str],
+                      fields: Optional[List[Optional[Iterable[str]]]] = None) -> List[Dict[str, Any]]:
+        """
+        Run every pipeline stage once over a batch of queries
+        :param queries: User input texts
+        :param languages: Preferred response language per query
+        :param fields: Requested output fields per query (None entries mean all served)
+        :return: Structured analysis results, in input order
+        """
+        fields = [self._resolve_fields(requested) for requested in (fields or [None] * len(queries))]
+        if self.cache is None:
+            return self._process_uncached(queries, languages, fields)
+
+        keys = [
+            self._cache_key(query, language, query_fields)
+            for query, language, query_fields in zip(queries, languages, fields)
+        ]
+        results = [self.cache.get(key) if key is not None else None for key in keys]
+
+        # Identical queries within a batch are analysed once; uncacheable ones keep their index
+        misses = {}
+        for idx, result in enumerate(results):
+            if result is None:
+                misses.setdefault(keys[idx] if keys[idx] is not None else idx, idx)
+
+        if misses:
+            fresh = self._process_uncached(
+                [queries[idx] for idx in misses.values()],
+                [languages[idx] for idx in misses.values()],
+                [fields[idx] for idx in misses.values()]
+            )
+            computed = dict(zip(misses, fresh))
+            for key, result in computed.items():
+                if isinstance(key, str) and "error" not in result:
+                    self.cache.put(key, result)
+            for idx, key in enumerate(keys):
+                if results[idx] is None:
+                    results[idx] = dict(computed[key if key is not None else idx])
+
+        return results
+
+    def _resolve_fields(self, requested: Optional[Iterable[str]]) -> tuple:
+        """Requested fields that this deployment serves, in canonical order"""
+        if requested is None:
+            return self.fields
+        requested = set(requested)
+        return tuple(field for field in self.fields if field in requested)
+
+    def _cache_key(self, query: str, language: str, fields: tuple) -> Optional[str]:
+        """Cache key for a query, or None if it cannot be normalized"""
         try:
-            # Step 1: Language detection and normalization
-            normalized_text = self._normalize_text(query, language)
-            
-            # Step 2: Intent classification
-            intent = self.classifier(normalized_text)[0]
-            
-            # Step 3: Entity extraction
-            entities = self.ner(normalized_text)
-            tax_entities = self._filter_tax_entities(entities)
-            
-            # Step 4: Sentiment analysis
-            sentiment = self.sentiment(normalized_text)[0]
-            
-            return {
-                "intent": intent['label'],
-                "confidence": intent['score'],
-                "entities": tax_entities,
-                "sentiment": sentiment['label'],
-                "language": language
-            }
-            
+            detected = self._detect_language(query, language)
+            text = self._normalize_text(query, detected)
+        except Exception:
+            return None
+        # Stages that read the raw query must not be shared by queries that only
+        # normalize alike: the translator gets the raw text, and the entity fast
+        # path looks for date cues (e.g. "20/07/2024") before normalization strips them
+        if self.translate and detected in TRANSLATED_LANGUAGES and ENGLISH_ONLY_FIELDS.intersection(fields):
+            text = query
+        cues = "entities" in fields and has_free_text_cues(query)
+        # Intents depend on the cascade's routing as well as on the loaded models
+        intent_route = "transformer" if self.intent_cascade is None else self.intent_cascade.cache_tag
+        return self.cache.make_key(
+            text, language, f"{self.models.version}:{intent_route}:{detected}:{int(cues)}", fields
+        )
+
+    def _process_uncached(self, queries: List[str], languages: List[str],
+                          fields: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Analyse a batch, falling back to per-query processing on failure
+        :param queries: User input texts
+        :param languages: Preferred response language per query
+        :param fields: Resolved output fields per query
+        :return: Structured analysis results, in input order
+        """
+        try:
+            return self._analyze_batch(queries, languages, fields)
+
         except Exception as e:
-            return {
-                "error": str(e),
-                "fallback_response": self._get_fallback_response(language)
-            }
+            if len(queries) == 1:
+                return [{
+                    "error": str(e),
+                    "fallback_response": self._get_fallback_response(languages[0])
+                }]
+
+            # Isolate the failing query so the rest of the batch still gets answers
+            return [
+                self._process_uncached([query], [language], [query_fields])[0]
+                for query, language, query_fields in zip(queries, languages, fields)
+            ]
+
+    def _analyze_batch(self, queries: List[str], languages: List[str],
+                       fields: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Batched analysis; raises on any stage failure
+        :param queries: User input texts
+        :param languages: Preferred response language per query
+        :param fields: Resolved output fields per query
+        :return: Structured analysis results
+        """
+        batch_size = len(queries)
+        PIPELINE_BATCH_SIZE.observe(batch_size)
+
+        # Step 1: Language detection and normalization; models are routed on the
+        # detected language, the preferred one only picks the response language
+        detected = [self._detect_language(query, language) for query, language in zip(queries, languages)]
+        label = detected[0] if len(set(detected)) == 1 else MULTI_LANGUAGE
+        with timed_stage("normalize", label, self.model_version):
+            normalized = self.normalizer.normalize_batch(queries, detected)
+        for text, language in zip(normalized, detected):
+            REQUEST_TOKENS.labels(language_label(language)).observe(len(text.split()))
+
+        results = [
+            {"language": language, "detected_language": query_language}
+            for language, query_language in zip(languages, detected)
+        ]
+
+        # Steps 2-4: intent, entities, sentiment - each only for the queries that asked
+        for field in self.fields:
+            routed = [idx for idx, query_fields in enumerate(fields) if field in query_fields]
+            if not routed:
+                continue
+
+            texts = [normalized[idx] for idx in routed]
+            if field in ENGLISH_ONLY_FIELDS and self.translate:
+                texts = self._to_english(
+                    [queries[idx] for idx in routed],
+                    [detected[idx] for idx in routed],
+                    texts
+                )
+
+            with timed_stage(FIELD_STAGES[field], label, self.model_version):
+                outputs = self._run_field(field, texts, [queries[idx] for idx in routed])
+
+            for idx, output in zip(routed, outputs):
+                results[idx].update(output)
+
+        return results
+
+    def _run_field(self, field: str, texts: List[str], queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Run the model behind one output field
+        :param field: "intent", "entities" or "sentiment"
+        :param texts: Prepared model inputs
+        :param queries: Raw user input for the same queries
+        :return: Output fragment per text
+        """
+        if field == "intent":
+            if self.intent_cascade is None:
+                return self._classify_intents(texts)
+            return [
+                {"intent": intent['intent'], "confidence": intent['confidence']}
+                for intent in self.intent_cascade.predict_batch(texts, self._classify_intents)
+            ]
+        if field == "entities":
+            return [{"entities": entities} for entities in self._extract_entities(texts, queries)]
+        return [
+            {"sentiment": sentiment['label']}
+            for sentiment in self.sentiment(texts, batch_size=len(texts))
+        ]
+
+    def _classify_intents(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Transformer intent and confidence per text"""
+        return [
+            {"intent": intent['label'], "confidence": intent['score']}
+            for intent in self.classifier(texts, batch_size=len(texts))
+        ]
+
+    def _extract_entities(self, texts: List[str], queries: List[str]) -> List[Dict[str, List[str]]]:
+        """
+        Rule fast path first; the NER model only sees queries that may hold
+        free-text entities (or no structured ones)
+        :param texts: Prepared model inputs
+        :param queries: Raw user input; date cues are matched before normalization strips "/" and "-"
+        :return: Entity dictionary per text
+        """
+        results = [self.entity_rules.fast_path(text, query) for text, query in zip(texts, queries)]
+        pending = [idx for idx, entities in enumerate(results) if entities is None]
+        if not pending:
+            return results
+
+        started = time.perf_counter()
+        outputs = self.ner([texts[idx] for idx in pending], batch_size=len(pending))
+        for idx, entities in zip(pending, outputs):
+            results[idx] = self.entity_rules.merge(
+                self._filter_tax_entities(entities), self.entity_rules.extract(texts[idx])
+            )
+        self.entity_rules.record_model_time(time.perf_counter() - started, len(pending))
+        return results
+
+    def _to_english(self, queries: List[str], languages: List[str], normalized: List[str]) -> List[str]:
+        """
+        Translate Swahili and code-switched queries for English-only models
+        :param queries: Raw user input (the translator prefers original casing and punctuation)
+        :param languages: Detected language per text
+        :param normalized: Normalized text, kept for queries that need no translation
+        :return: Model inputs
+        """
+        swahili = [idx for idx, language in enumerate(languages) if language in TRANSLATED_LANGUAGES]
+        if not swahili:
+            return normalized
+
+        with timed_stage("translate", "sw", self.model_version):
+            translations = self.translator([queries[idx] for idx in swahili], batch_size=len(swahili))
+
+        texts = list(normalized)
+        for idx, translation in zip(swahili, translations):
+            texts[idx] = translation['translation_text']
+        return texts
+
+    @staticmethod
+    def _detect_language(query: str, preferred: str) -> str:
+        """
+        Language the query is written in
+        :param query: Raw user input
+        :param preferred: Client-supplied language, used when nothing in the query can be scored
+        :return: "sw", "en" or "mixed"
+        """
+        detected = detect_language(query)
+        return preferred if detected == UNKNOWN else detected
 
     def _normalize_text(self, text: str, language: str) -> str:
         """
@@ -81,17 +433,7 @@ class TaxNLP:
         :param language: Target language
         :return: Normalized text
         """
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Replace tax terms with standard forms
-        for term, standard in self.TAX_TERMS[language].items():
-            text = text.replace(term.lower(), standard)
-            
-        # Remove special characters
-        text = re.sub(r"[^\w\s]", "", text)
-        
-        return text
+        return self.normalizer.normalize(text, language)
 
     def _filter_tax_entities(self, entities: list) -> dict:
         """
@@ -125,5 +467,7 @@ class TaxNLP:
         }[language]
 
 # Example usage:
-# nlp = TaxNLP()
-# result = nlp.process_query("Nahitaji msaada na malipo ya VAT", language="sw")
\ No newline at end of file
+# nlp = TaxNLP()  # or TaxNLP(lazy=True) to load each model on first use
+# result = nlp.process_query("Nahitaji msaada na malipo ya VAT", language="sw")
+# results = nlp.process_batch(["Muda wa VAT", "PAYE deadline"], ["sw", "en"])
+# intent_only = nlp.process_query("Muda wa VAT", language="sw", fields=["intent"])
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+FILE: nlp/inference_backends.py
+DESCRIPTION: Pluggable CPU inference backends for transformer models
+BACKENDS:
+  - eager: full-precision PyTorch (default)
+  - int8: PyTorch dynamic int8 quantization of Linear layers
+  - onnx: exported ONNX Runtime graph (requires optimum[onnxruntime])
+"""
+
+import os
+from transformers import (
+    AutoModelForSequenceClassification,
+    AutoModelForTokenClassification,
+    AutoTokenizer
+)
+import torch
+
+BACKENDS = ("eager", "int8", "onnx")
+
+# Exported graphs live next to the PyTorch weights
+ONNX_SUBDIR = "onnx"
+QUANTIZED_ONNX = "model_quantized.onnx"
+
+_TASK_MODELS = {
+    "sequence-classification": AutoModelForSequenceClassification,
+    "token-classification": AutoModelForTokenClassification
+}
+TASKS = tuple(_TASK_MODELS)
+
+
+def onnx_path(model_path: str) -> str:
+    """Directory holding the exported ONNX graph for a model"""
+    return os.path.join(model_path, ONNX_SUBDIR)
+
+
+def load_model(model_path: str, task: str = "sequence-classification", backend: str = "eager"):
+    """
+    Load a fine-tuned model for CPU inference
+    :param model_path: Directory with the fine-tuned PyTorch weights
+    :param task: "sequence-classification" or "token-classification"
+    :param backend: One of BACKENDS
+    :return: Model exposing the usual transformers forward() / logits interface
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}'. Choose from {BACKENDS}")
+    if task not in TASKS:
+        raise ValueError(f"Unknown task '{task}'. Choose from {TASKS}")
+
+    if backend == "onnx":
+        return _load_onnx(model_path, task)
+
+    model = _TASK_MODELS[task].from_pretrained(model_path)
+    model.eval()
+    if backend == "int8":
+        # Weights are stored int8; activations are quantized on the fly per batch
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def load_tokenizer(model_path: str):
+    """Fast tokenizer shared by every backend"""
+    return AutoTokenizer.from_pretrained(model_path)
+
+
+def _load_onnx(model_path: str, task: str):
+    """Load an exported graph into ONNX Runtime"""
+    try:
+        from optimum.onnxruntime import (
+            ORTModelForSequenceClassification,
+            ORTModelForTokenClassification
+        )
+    except ImportError:
+        raise ImportError(
+            "The onnx inference backend requires optimum[onnxruntime]. "
+            "Install it or set nlp_serving.inference_backend to eager/int8."
+        )
+
+    model_cls = {
+        "sequence-classification": ORTModelForSequenceClassification,
+        "token-classification": ORTModelForTokenClassification
+    }[task]
+
+    exported = onnx_path(model_path)
+    if not os.path.isdir(exported):
+        raise FileNotFoundError(
+            f"No ONNX export at {exported}. Run: "
+            f"python -m scripts.export_intent_model --task {task} --model-path {model_path}"
+        )
+    # Prefer the int8 graph when the export step produced one
+    quantized = os.path.join(exported, QUANTIZED_ONNX)
+    if os.path.exists(quantized):
+        return model_cls.from_pretrained(exported, file_name=QUANTIZED_ONNX)
+    return model_cls.from_pretrained(exported)
+
+
+def export_onnx(model_path: str, task: str = "sequence-classification", quantize: bool = False) -> str:
+    """
+    Export a PyTorch model to ONNX next to its weights
+    :param model_path: Directory with the fine-tuned PyTorch weights
+    :param task: "sequence-classification" or "token-classification"
+    :param quantize: Also apply ONNX Runtime dynamic int8 quantization
+    :return: Export directory
+    """
+    from optimum.onnxruntime import (
+        ORTModelForSequenceClassification,
+        ORTModelForTokenClassification,
+        ORTQuantizer
+    )
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    model_cls = {
+        "sequence-classification": ORTModelForSequenceClassification,
+        "token-classification": ORTModelForTokenClassification
+    }[task]
+
+    exported = onnx_path(model_path)
+    model = model_cls.from_pretrained(model_path, export=True)
+    model.save_pretrained(exported)
+    load_tokenizer(model_path).save_pretrained(exported)
+
+    if quantize:
+        quantizer = ORTQuantizer.from_pretrained(exported)
+        quantizer.quantize(
+            save_dir=exported,
+            quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        )
+    return exported
+
+# Example usage:
+# model = load_model("models/nlp/intent_classifier", backend="int8")
+# tokenizer = load_tokenizer("models/nlp/intent_classifier")
@@ -0,0 +1,96 @@
+"""
+FILE: nlp/intent_classification/linear_classifier.py
+MODEL: Hashed word + character n-gram logistic regression
+TASKS: First tier of the intent cascade; answers keyword-obvious queries in
+       well under a millisecond so only ambiguous ones reach XLM-RoBERTa
+FEATURES:
+  - No vocabulary to store or grow: n-grams are hashed into a fixed space
+  - Character n-grams cover Swahili inflection and code-switched spellings
+  - Trained from the same labelled CSV as the transformer; saved with joblib
+"""
+
+from typing import Any, Dict, Iterable, List
+import re
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import LogisticRegression
+
+DEFAULT_MODEL_PATH = "models/nlp/intent_linear.joblib"
+
+# 2^18 buckets keeps the five-class weight matrix around 10 MB
+N_FEATURES = 2 ** 18
+
+_TOKEN = re.compile(r"\w+")
+
+
+def query_ngrams(text: str) -> List[str]:
+    """Word unigrams and bigrams plus character 3-5 grams within each word"""
+    words = _TOKEN.findall(text.lower())
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f" {word} "
+        features.extend(
+            padded[i:i + n] for n in (3, 4, 5) for i in range(len(padded) - n + 1)
+        )
+    return features
+
+
+class HashedIntentClassifier:
+    def __init__(self, c: float = 10.0, n_features: int = N_FEATURES):
+        """
+        :param c: Inverse L2 regularization strength of the logistic regression
+        :param n_features: Hash space size
+        """
+        self.vectorizer = HashingVectorizer(
+            analyzer=query_ngrams, n_features=n_features, alternate_sign=False, norm="l2"
+        )
+        self.model = LogisticRegression(C=c, max_iter=1000)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> "HashedIntentClassifier":
+        return joblib.load(path)
+
+    def save(self, path: str = DEFAULT_MODEL_PATH):
+        joblib.dump(self, path)
+
+    @property
+    def labels(self) -> List[str]:
+        return list(self.model.classes_)
+
+    def fit(self, texts: Iterable[str], labels: Iterable[str]) -> "HashedIntentClassifier":
+        """
+        Train on labelled queries
+        :param texts: Raw user inputs
+        :param labels: Intent per input
+        """
+        self.model.fit(self.vectorizer.transform(texts), list(labels))
+        return self
+
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Classify many queries in one sparse matrix product
+        :param texts: Raw user inputs
+        :return: {"intent", "confidence"} per input, in input order
+        """
+        probs = self.model.predict_proba(self.vectorizer.transform(texts))
+        best = probs.argmax(axis=1)
+        classes = self.model.classes_
+        return [
+            {"intent": str(classes[idx]), "confidence": float(confidence)}
+            for idx, confidence in zip(best, probs[np.arange(len(texts)), best])
+        ]
+
+    def predict_intent(self, text: str, language: str = "unknown") -> Dict[str, Any]:
+        """
+        Classify one query
+        :param text: Raw user input
+        :param language: Unused; matches TaxIntentClassifier.predict_intent
+        """
+        return self.predict_batch([text])[0]
+
+# Example usage:
+# linear = HashedIntentClassifier().fit(df["text"], df["intent"])
+# linear.save()
+# HashedIntentClassifier.load().predict_intent("Nina shida kulipa KRA kwa M-Pesa")
+# {'intent': 'payment_issue', 'confidence': 0.97}
@@ -2,53 +2,141 @@
 FILE: nlp/intent_classification/train_classifier.py
 MODEL: XLM-RoBERTa fine-tuned on Kenyan tax corpus
 TASKS: Detect intent in Swahili/English code-switched queries
+FEATURES:
+  - Fast (Rust) tokenizer shared with the other inference backends
+  - predict_batch for bulk relabelling: length-bucketed batches to minimize
+    padding, results streamed back in input order
+  - Optional IntentCascade: a hashed n-gram linear model answers confident
+    queries and only the rest reach XLM-RoBERTa
 """
 
-from transformers import XLMRobertaForSequenceClassification, XLMRobertaTokenizer
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from nlp.inference_backends import load_model, load_tokenizer
+from nlp.intent_classification.cascade import IntentCascade
+from utils.metrics import timed_stage
+import os
 import torch
 
+# Batches per length-sorting window in predict_batch
+WINDOW_BATCHES = 16
+
 class TaxIntentClassifier:
-    def __init__(self, model_path="models/nlp/intent_classifier"):
+    def __init__(self, model_path="models/nlp/intent_classifier", backend="eager",
+                 batch_size: int = 32, num_threads: Optional[int] = None, max_length: int = 128,
+                 cascade: Optional[IntentCascade] = None):
         """
         Initialize multilingual tax intent classifier
         :param model_path: Path to fine-tuned model
+        :param backend: Inference backend: "eager", "int8" or "onnx"
+        :param batch_size: Default queries per forward pass in predict_batch
+        :param num_threads: Intra-op threads for PyTorch (process-wide); None keeps the current setting
+        :param max_length: Tokens kept per query
+        :param cascade: Linear first tier; predictions then carry the "tier" that made them
         """
-        self.tokenizer = XLMRobertaTokenizer.from_pretrained(model_path)
-        self.model = XLMRobertaForSequenceClassification.from_pretrained(model_path)
+        self.backend = backend
+        self.model_version = f"{os.path.basename(os.path.normpath(model_path))}-{backend}"
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.cascade = cascade
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.tokenizer = load_tokenizer(model_path)
+        self.model = load_model(model_path, "sequence-classification", backend)
         self.labels = [
-            "payment_issue", 
+            "payment_issue",
             "deadline_query",
             "form_help",
             "complaint",
             "policy_clarification"
         ]
 
-    def predict_intent(self, text):
+    def predict_intent(self, text, language="unknown"):
         """
         Classify taxpayer query intent
         :param text: Raw user input (English/Swahili mix)
+        :param language: Query language, used only as a metrics label
         :return: Predicted intent and confidence
         """
-        inputs = self.tokenizer(
-            text,
-            return_tensors="pt",
-            padding=True,
-            truncation=True,
-            max_length=128
-        )
-        
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-        
-        probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
-        confidence, pred_idx = torch.max(probs, dim=1)
-        
-        return {
-            "intent": self.labels[pred_idx.item()],
-            "confidence": confidence.item()
-        }
+        if self.cascade is not None:
+            return self.cascade.predict_batch(
+                [text], lambda rest: [self._predict_one(rest[0], language)], language
+            )[0]
+        return self._predict_one(text, language)
+
+    def _predict_one(self, text, language):
+        """Transformer prediction for a single query"""
+        with timed_stage("intent.tokenize", language, self.model_version):
+            inputs = self.tokenizer(
+                text,
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=self.max_length
+            )
+
+        with timed_stage("intent.forward", language, self.model_version):
+            return self._classify(inputs)[0]
+
+    def predict_batch(self, texts: Iterable[str], batch_size: Optional[int] = None,
+                      language: str = "unknown") -> Iterator[Dict[str, Any]]:
+        """
+        Classify many queries, e.g. a day of logged traffic
+        Input is read a window of batch_size * WINDOW_BATCHES texts at a time;
+        each window is sorted by token count so a batch only pads to its own
+        longest query, and its results are yielded in input order
+        :param texts: Raw user inputs; any iterable, consumed lazily
+        :param batch_size: Queries per forward pass (default: the constructor's)
+        :param language: Metrics label for the whole run
+        :return: Iterator of predictions, one per input, in input order
+        """
+        batch_size = batch_size or self.batch_size
+        texts = iter(texts)
+        while True:
+            window = list(islice(texts, batch_size * WINDOW_BATCHES))
+            if not window:
+                return
+            if self.cascade is not None:
+                yield from self.cascade.predict_batch(
+                    window, lambda rest: self._predict_window(rest, batch_size, language), language
+                )
+            else:
+                yield from self._predict_window(window, batch_size, language)
+
+    def _predict_window(self, texts: List[str], batch_size: int, language: str) -> List[Dict[str, Any]]:
+        """Predictions for one window, in input order"""
+        with timed_stage("intent.tokenize", language, self.model_version):
+            encoded = self.tokenizer(texts, truncation=True, max_length=self.max_length)["input_ids"]
+        order = sorted(range(len(texts)), key=lambda idx: len(encoded[idx]))
+
+        results = [None] * len(texts)
+        for start in range(0, len(order), batch_size):
+            positions = order[start:start + batch_size]
+            inputs = self.tokenizer.pad(
+                {"input_ids": [encoded[idx] for idx in positions]},
+                return_tensors="pt"
+            )
+            with timed_stage("intent.forward", language, self.model_version):
+                predictions = self._classify(inputs)
+            for idx, prediction in zip(positions, predictions):
+                results[idx] = prediction
+        return results
+
+    def _classify(self, inputs) -> List[Dict[str, Any]]:
+        """Intent and confidence for each row of a tokenized batch"""
+        with torch.inference_mode():
+            logits = self.model(**inputs).logits
+        probs = torch.nn.functional.softmax(logits, dim=-1)
+        confidences, pred_idx = torch.max(probs, dim=1)
+
+        return [
+            {"intent": self.labels[idx], "confidence": confidence}
+            for idx, confidence in zip(pred_idx.tolist(), confidences.tolist())
+        ]
 
 # Example usage:
-# classifier = TaxIntentClassifier()
+# classifier = TaxIntentClassifier()  # or TaxIntentClassifier(backend="onnx")
 # query = "Nina shida kulipa KRA kwa M-Pesa, sielewi"
-# result = classifier.predict_intent(query)  # {'intent': 'payment_issue', 'confidence': 0.92}
\ No newline at end of file
+# result = classifier.predict_intent(query)  # {'intent': 'payment_issue', 'confidence': 0.92}
+# for prediction in TaxIntentClassifier(batch_size=64, num_threads=8).predict_batch(logged_queries): ...
+# TaxIntentClassifier(cascade=IntentCascade(HashedIntentClassifier.load(), threshold=0.9))
@@ -0,0 +1,150 @@
+"""
+FILE: nlp/language_id.py
+DESCRIPTION: Lightweight Swahili / English / code-switched language identification
+FEATURES:
+  - Per-word decision from a compact precomputed model (nlp/resources/langid_model.json,
+    built by scripts/build_language_model.py): words seen in only one language's
+    corpus decide directly, other words by character n-gram naive Bayes
+  - Text label from the share of word characters in each language:
+    "sw", "en", "mixed", or "unknown" when no word can be scored
+  - Memoized per word and per text, so repeated queries cost a dict lookup
+"""
+
+import json
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_MODEL = "nlp/resources/langid_model.json"
+
+LANGUAGES = ("sw", "en")
+MIXED = "mixed"
+UNKNOWN = "unknown"
+
+# Minority-language share of scored characters above which a text is "mixed"
+MIXED_THRESHOLD = 0.25
+
+# Log-likelihood margin below which an unknown word counts for neither language
+MIN_MARGIN = 3.0
+
+# Words only: PINs, amounts and form codes say nothing about the language
+_WORD = re.compile(r"[^\W\d_]{2,}")
+
+
+def word_ngrams(word: str, max_n: int) -> List[str]:
+    """Character n-grams of a space-padded word, lengths 1 to max_n"""
+    padded = f" {word} "
+    return [padded[i:i + n] for n in range(1, max_n + 1) for i in range(len(padded) - n + 1)]
+
+
+def train(corpora: Dict[str, Iterable[str]], max_n: int = 3, top_k: int = 3000,
+          top_words: int = 2000) -> Dict:
+    """
+    Fit per-language vocabularies and n-gram log probabilities
+    :param corpora: Language -> training texts
+    :param max_n: Longest n-gram
+    :param top_k: N-grams kept per language; the rest share the unseen probability
+    :param top_words: Most frequent words kept per language
+    :return: JSON-serializable model
+    """
+    words = {
+        language: Counter(word for text in texts for word in _WORD.findall(text.lower()))
+        for language, texts in corpora.items()
+    }
+    # Words used by several languages (loanwords, names) are left to the n-grams
+    shared = {word for language in words for word in words[language]
+              if sum(word in other for other in words.values()) > 1}
+
+    languages = {}
+    for language, counts in words.items():
+        ngrams = Counter()
+        for word, count in counts.items():
+            for ngram in word_ngrams(word, max_n):
+                ngrams[ngram] += count
+        kept = dict(ngrams.most_common(top_k))
+        # Add-one smoothing over the kept n-grams plus one unseen bucket
+        total = sum(kept.values()) + len(kept) + 1
+        languages[language] = {
+            "words": sorted(word for word, _ in counts.most_common(top_words) if word not in shared),
+            "ngrams": {ngram: round(math.log((count + 1) / total), 3) for ngram, count in kept.items()},
+            "unseen": round(math.log(1 / total), 3)
+        }
+    return {"max_n": max_n, "languages": languages}
+
+
+class LanguageIdentifier:
+    def __init__(self, model: Dict, cache_size: int = 65536):
+        """
+        :param model: Output of train() (or the JSON file it was saved to)
+        :param cache_size: Texts remembered by identify()
+        """
+        self.max_n = model["max_n"]
+        self.ngrams = {language: params["ngrams"] for language, params in model["languages"].items()}
+        self.unseen = {language: params["unseen"] for language, params in model["languages"].items()}
+        self.vocabulary = {
+            word: language for language, params in model["languages"].items() for word in params["words"]
+        }
+        self.word_language = lru_cache(maxsize=cache_size * 4)(self._word_language)
+        self.identify = lru_cache(maxsize=cache_size)(self._identify)
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_MODEL, **kwargs) -> "LanguageIdentifier":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    def _word_language(self, word: str) -> Optional[str]:
+        """Language of one lowercased word, or None if the evidence is weak"""
+        known = self.vocabulary.get(word)
+        if known is not None:
+            return known
+
+        ngrams = word_ngrams(word, self.max_n)
+        scores = sorted(
+            (sum(table.get(ngram, self.unseen[language]) for ngram in ngrams), language)
+            for language, table in self.ngrams.items()
+        )
+        if scores[-1][0] - scores[-2][0] < MIN_MARGIN:
+            return None
+        return scores[-1][1]
+
+    def proportions(self, text: str) -> Dict[str, float]:
+        """Share of scored word characters per language"""
+        chars = Counter()
+        for word in _WORD.findall(text.lower()):
+            language = self.word_language(word)
+            if language is not None:
+                chars[language] += len(word)
+        total = sum(chars.values())
+        return {language: chars[language] / total for language in self.ngrams} if total else {}
+
+    def _identify(self, text: str) -> str:
+        """
+        Language of a query
+        :param text: Raw user input
+        :return: "sw", "en", "mixed" or "unknown"
+        """
+        shares = self.proportions(text)
+        if not shares:
+            return UNKNOWN
+        ranked: List[Tuple[str, float]] = sorted(shares.items(), key=lambda item: -item[1])
+        if len(ranked) > 1 and ranked[1][1] >= MIXED_THRESHOLD:
+            return MIXED
+        return ranked[0][0]
+
+
+@lru_cache(maxsize=None)
+def default_identifier() -> LanguageIdentifier:
+    """Process-wide identifier loaded from DEFAULT_MODEL on first use"""
+    return LanguageIdentifier.from_file()
+
+
+def detect_language(text: str) -> str:
+    """Language of a query using the shared default model"""
+    return default_identifier().identify(text)
+
+# Example usage:
+# detect_language("Nahitaji msaada na malipo ya VAT")        -> 'sw'
+# detect_language("When is the PAYE deadline?")              -> 'en'
+# detect_language("Nimekosa deadline ya filing returns yangu") -> 'mixed'
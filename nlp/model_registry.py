@@ -0,0 +1,149 @@
+"""
+FILE: nlp/model_registry.py
+DESCRIPTION: Lazy, parallel model loading with warm-up and load-state tracking
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class ModelRegistry:
+    def __init__(self, loaders: Dict[str, Callable[[], Any]],
+                 warmups: Optional[Dict[str, Callable[[Any], Any]]] = None,
+                 warmup_on_load: bool = True):
+        """
+        Track and load named models on demand
+        :param loaders: Model name -> zero-argument loader
+        :param warmups: Model name -> callable run on the loaded model
+        :param warmup_on_load: Run the warm-up as part of loading
+        """
+        self._loaders = loaders
+        self._warmups = warmups or {}
+        self.warmup_on_load = warmup_on_load
+        self._models = {}
+        self._state = {name: PENDING for name in loaders}
+        self._load_time = {}
+        self._errors = {}
+        self._locks = {name: threading.Lock() for name in loaders}
+        self._reload_callbacks = []
+        self.version = 0
+
+    def get(self, name: str) -> Any:
+        """
+        Return a model, loading it first if needed
+        :param name: Registered model name
+        :return: Loaded model
+        """
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        return self.load(name)
+
+    def load(self, name: str) -> Any:
+        """Load and warm up one model; concurrent callers share the work"""
+        with self._locks[name]:
+            if name in self._models:
+                return self._models[name]
+
+            self._state[name] = LOADING
+            started = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+                warmup = self._warmups.get(name)
+                if warmup is not None and self.warmup_on_load:
+                    warmup(model)
+            except Exception as e:
+                self._state[name] = FAILED
+                self._errors[name] = str(e)
+                logging.error(f"Failed to load model '{name}': {str(e)}")
+                raise
+
+            self._load_time[name] = time.perf_counter() - started
+            self._models[name] = model
+            self._state[name] = READY
+            self._errors.pop(name, None)
+            logging.info(f"Loaded model '{name}' in {self._load_time[name]:.2f}s")
+            return model
+
+    def load_all(self, names: Optional[Iterable[str]] = None, parallel: bool = True):
+        """
+        Load several models, concurrently by default
+        :param names: Models to load (default: all registered)
+        :param parallel: Load on a thread pool instead of one after another
+        """
+        names = list(names) if names is not None else list(self._loaders)
+        if not parallel or len(names) < 2:
+            for name in names:
+                self._load_quietly(name)
+            return
+
+        # Model loading is dominated by file I/O and native code, so threads overlap well
+        with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="model-load") as pool:
+            list(pool.map(self._load_quietly, names))
+
+    def _load_quietly(self, name: str):
+        """Load a model, leaving failures in the status report"""
+        try:
+            self.load(name)
+        except Exception:
+            pass
+
+    def warm_up(self, names: Optional[Iterable[str]] = None):
+        """
+        Run warm-up inference on already loaded models
+        :param names: Models to warm up (default: all loaded)
+        """
+        names = list(names) if names is not None else list(self._models)
+        for name in names:
+            warmup = self._warmups.get(name)
+            if name in self._models and warmup is not None:
+                warmup(self._models[name])
+
+    def reload(self, names: Optional[Iterable[str]] = None, parallel: bool = True):
+        """
+        Drop and reload models, notifying dependants of the new version
+        :param names: Models to reload (default: all currently loaded)
+        """
+        names = list(names) if names is not None else list(self._models)
+        for name in names:
+            with self._locks[name]:
+                self._models.pop(name, None)
+                self._state[name] = PENDING
+        self.load_all(names, parallel=parallel)
+
+        self.version += 1
+        for callback in self._reload_callbacks:
+            callback(self.version)
+
+    def on_reload(self, callback: Callable[[int], Any]):
+        """Register a callback invoked with the new version after reload()"""
+        self._reload_callbacks.append(callback)
+
+    def is_ready(self, names: Optional[Iterable[str]] = None) -> bool:
+        """True once every named model (default: all) is loaded"""
+        names = names if names is not None else self._loaders
+        return all(self._state[name] == READY for name in names)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model load state, load time and last error"""
+        return {
+            name: {
+                "state": self._state[name],
+                "load_time_s": self._load_time.get(name),
+                "error": self._errors.get(name)
+            }
+            for name in self._loaders
+        }
+
+# Example usage:
+# registry = ModelRegistry({"sentiment": lambda: pipeline("sentiment-analysis")})
+# registry.load_all(parallel=True)
+# registry.status()  # {'sentiment': {'state': 'ready', 'load_time_s': 3.1, 'error': None}}
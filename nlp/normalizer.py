@@ -0,0 +1,179 @@
+"""
+FILE: nlp/normalizer.py
+DESCRIPTION: Glossary-driven text normalizer for taxpayer queries
+FEATURES:
+  - Loads Swahili/English/Sheng tax synonyms and form codes from a TSV glossary
+  - Indexes each language's glossary by first word, so a query is split into
+    words once and each word costs one dict lookup whatever the glossary size
+  - Batch API for lists of queries
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_GLOSSARY = "nlp/resources/tax_glossary.tsv"
+
+# Glossary language tag for terms shared by every language
+ALL_LANGUAGES = "*"
+
+# Language of code-switched queries; normalized with every language's terms
+MIXED = "mixed"
+
+_WHITESPACE = re.compile(r"\s+")
+_SPECIAL_CHARS = re.compile(r"[^\w\s]")
+_SEPARATOR = re.compile(r"(\W)")
+
+
+def _canonical(term: str) -> str:
+    """Lowercase and collapse whitespace, matching how queries are compared"""
+    return _WHITESPACE.sub(" ", term.strip().lower())
+
+
+def _tokens(text: str) -> List[str]:
+    """
+    Split text on every non-word character
+    :return: Words (possibly empty) at even positions, single separators at odd
+        ones; joining them restores the text
+    """
+    return _SEPARATOR.split(text)
+
+
+def _term_index(terms: Dict[str, str]) -> Dict[str, List[Tuple[Tuple[str, ...], str]]]:
+    """
+    Key every term on its first word
+    :param terms: Canonical (lowercased, single-spaced) term -> standard form
+    :return: First word -> [(term tokens, standard form)], longest term first
+    """
+    index = {}
+    for term, standard in terms.items():
+        if term:
+            tokens = tuple(_tokens(term))
+            index.setdefault(tokens[0], []).append((tokens, standard))
+    for candidates in index.values():
+        candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+    return index
+
+
+def _match_end(tokens: List[str], start: int, term: Tuple[str, ...]) -> Optional[int]:
+    """
+    Match a term against the text's tokens
+    Words are whole tokens, so word boundaries hold without extra checks; a
+    space in the term matches any run of whitespace
+    :return: Token position just past the match, or None
+    """
+    position = start + 1
+    for expected in term[1:]:
+        if position >= len(tokens):
+            return None
+        token = tokens[position]
+        if expected == " " and token.isspace():
+            while position + 2 < len(tokens) and not tokens[position + 1] and tokens[position + 2].isspace():
+                position += 2
+        elif token != expected:
+            return None
+        position += 1
+    return position
+
+
+def _replace_terms(text: str, index: Dict[str, List[Tuple[Tuple[str, ...], str]]]) -> str:
+    """Replace glossary terms left to right, longest match first"""
+    tokens = _tokens(text)
+    words = tokens[::2]
+    if index.keys().isdisjoint(words):
+        return text
+
+    pieces = []
+    position = 0
+    for start in [2 * i for i, word in enumerate(words) if word in index]:
+        if start < position:
+            continue
+        for term, standard in index[tokens[start]]:
+            end = _match_end(tokens, start, term)
+            if end is not None:
+                pieces.extend(tokens[position:start])
+                pieces.append(standard)
+                position = end
+                break
+    pieces.extend(tokens[position:])
+    return "".join(pieces)
+
+
+class GlossaryNormalizer:
+    def __init__(self, glossary: Dict[str, Dict[str, str]]):
+        """
+        Index a glossary per language
+        :param glossary: Language (or "*") -> {term: standard form}
+        """
+        shared = {_canonical(term): standard for term, standard in glossary.get(ALL_LANGUAGES, {}).items()}
+        self._replacements = {}
+        self._indexes = {}
+
+        for language in set(glossary) | {ALL_LANGUAGES}:
+            terms = dict(shared)
+            if language != ALL_LANGUAGES:
+                terms.update({_canonical(term): standard for term, standard in glossary[language].items()})
+            self._replacements[language] = terms
+            self._indexes[language] = _term_index(terms)
+
+        if MIXED not in glossary:
+            terms = dict(shared)
+            for language in sorted(set(glossary) - {ALL_LANGUAGES}):
+                terms.update(self._replacements[language])
+            self._replacements[MIXED] = terms
+            self._indexes[MIXED] = _term_index(terms)
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_GLOSSARY) -> "GlossaryNormalizer":
+        """
+        Load a TSV glossary: language<TAB>term<TAB>standard form
+        Blank lines and lines starting with # are ignored
+        """
+        glossary = {}
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.rstrip("\n")
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                parts = line.split("\t")
+                if len(parts) != 3:
+                    raise ValueError(f"{path}:{line_no}: expected 3 tab-separated columns")
+                language, term, standard = (part.strip() for part in parts)
+                glossary.setdefault(language, {})[term] = standard
+        return cls(glossary)
+
+    def normalize(self, text: str, language: str) -> str:
+        """
+        Standardize text for processing
+        :param text: Raw input
+        :param language: Query language; "mixed" uses every language's terms,
+            unknown languages the shared terms only
+        :return: Lowercased text with glossary terms replaced and special characters removed
+        """
+        if language not in self._indexes:
+            language = ALL_LANGUAGES
+        index = self._indexes[language]
+
+        # Convert to lowercase
+        text = text.lower()
+
+        # Replace tax terms with standard forms in a single pass
+        if index:
+            text = _replace_terms(text, index)
+
+        # Remove special characters
+        return _SPECIAL_CHARS.sub("", text)
+
+    def normalize_batch(self, texts: List[str], languages: List[str]) -> List[str]:
+        """
+        Normalize many queries
+        :param texts: Raw inputs
+        :param languages: Query language per input
+        :return: Normalized texts, in input order
+        """
+        normalize = self.normalize
+        return [normalize(text, language) for text, language in zip(texts, languages)]
+
+# Example usage:
+# normalizer = GlossaryNormalizer.from_file()
+# normalizer.normalize("Nahitaji msaada na Kodi ya Ongezeko la Thamani", "sw")
+# 'nahitaji msaada na VAT'
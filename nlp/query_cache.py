@@ -0,0 +1,277 @@
+"""
+FILE: nlp/query_cache.py
+DESCRIPTION: Bounded LRU+TTL cache for NLP pipeline results
+FEATURES:
+  - Keyed on normalized text, language and model version
+  - Entry-count and byte-size limits with LRU eviction
+  - Optional SQLite backend shared by all workers on a node; hits are pure
+    reads, with LRU access times written back in batches
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from utils.metrics import CACHE_EVICTIONS, CACHE_REQUESTS
+
+
+class MemoryCacheBackend:
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024**2):
+        """
+        Per-process LRU store
+        :param max_entries: Entry limit
+        :param max_bytes: Limit on the summed size of stored values
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, payload)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key: str, payload: bytes, ttl: float) -> int:
+        """Store a value; returns the number of entries evicted to make room"""
+        if len(payload) > self.max_bytes:
+            return 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.time() + ttl, payload)
+            self._bytes += len(payload)
+
+            evicted = 0
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+            return evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str):
+        _, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    def __init__(self, path: str = "/tmp/kra_nlp_cache.sqlite", max_entries: int = 100000,
+                 max_bytes: int = 256 * 1024**2, access_flush_s: float = 1.0,
+                 access_flush_size: int = 256):
+        """
+        Node-local store shared by every worker process
+        :param path: SQLite file (WAL mode, safe for concurrent processes)
+        :param max_entries: Entry limit
+        :param max_bytes: Limit on the summed size of stored values
+        :param access_flush_s: Longest time a hit's access time waits before being written
+        :param access_flush_size: Buffered access times that trigger a write
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.access_flush_s = access_flush_s
+        self.access_flush_size = access_flush_size
+        self._local = threading.local()
+        # Hits only record their access time here; one write transaction applies
+        # a batch of them, so readers do not queue on the WAL write lock
+        self._accessed = {}
+        self._accessed_pid = os.getpid()
+        self._last_flush = time.monotonic()
+        self._access_lock = threading.Lock()
+
+        conn = self._connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS query_cache (
+                key TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_query_cache_access ON query_cache(last_access)")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread and process; sqlite3 connections are not shareable"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            "SELECT payload, expires_at FROM query_cache WHERE key = ?", (key,)
+        ).fetchone()
+        # Expired rows are left for the next set() to sweep
+        if row is None or row[1] <= now:
+            return None
+        self._touch(conn, key, now)
+        return row[0]
+
+    def _touch(self, conn: sqlite3.Connection, key: str, now: float):
+        """Buffer a hit's access time; write the buffer once it is large or old enough"""
+        with self._access_lock:
+            self._accessed[key] = now
+            due = (len(self._accessed) >= self.access_flush_size
+                   or time.monotonic() - self._last_flush >= self.access_flush_s)
+        if due:
+            with conn:
+                self._flush_accessed(conn)
+
+    def _flush_accessed(self, conn: sqlite3.Connection):
+        """Write buffered access times inside the caller's transaction"""
+        with self._access_lock:
+            # Times buffered before a fork belong to the parent
+            accessed = self._accessed if self._accessed_pid == os.getpid() else {}
+            self._accessed, self._accessed_pid = {}, os.getpid()
+            self._last_flush = time.monotonic()
+        if accessed:
+            conn.executemany(
+                "UPDATE query_cache SET last_access = MAX(last_access, ?) WHERE key = ?",
+                [(at, key) for key, at in accessed.items()]
+            )
+
+    def set(self, key: str, payload: bytes, ttl: float) -> int:
+        """Store a value; returns the number of entries evicted to make room"""
+        if len(payload) > self.max_bytes:
+            return 0
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO query_cache VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now + ttl, now)
+            )
+            # Eviction order must see this process's recent hits
+            self._flush_accessed(conn)
+            return self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        """Drop expired rows, then least recently used rows until within limits"""
+        evicted = conn.execute("DELETE FROM query_cache WHERE expires_at <= ?", (now,)).rowcount
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM query_cache"
+        ).fetchone()
+
+        if count <= self.max_entries and total <= self.max_bytes:
+            return evicted
+
+        for key, size in conn.execute(
+            "SELECT key, size FROM query_cache ORDER BY last_access"
+        ).fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM query_cache WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            evicted += 1
+        return evicted
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM query_cache")
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM query_cache").fetchone()[0]
+
+
+class QueryCache:
+    def __init__(self, backend=None, ttl_seconds: float = 3600, model_version: str = ""):
+        """
+        Result cache placed in front of TaxNLP.process_query
+        :param backend: MemoryCacheBackend (default) or SQLiteCacheBackend
+        :param ttl_seconds: Lifetime of each entry
+        :param model_version: Deployed model version, part of every key
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttl = ttl_seconds
+        self.model_version = model_version
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @classmethod
+    def from_config(cls, cache_config: Dict[str, Any], model_version: str = "") -> "QueryCache":
+        """
+        Build a cache from the nlp_serving.cache settings block
+        :param cache_config: Settings dictionary
+        :param model_version: Deployed model version
+        """
+        max_bytes = int(cache_config.get('max_mb', 64) * 1024**2)
+        if cache_config.get('backend', 'memory') == 'sqlite':
+            backend = SQLiteCacheBackend(
+                path=cache_config.get('sqlite_path', '/tmp/kra_nlp_cache.sqlite'),
+                max_entries=cache_config.get('max_entries', 100000),
+                max_bytes=max_bytes,
+                access_flush_s=cache_config.get('access_flush_s', 1.0)
+            )
+        else:
+            backend = MemoryCacheBackend(
+                max_entries=cache_config.get('max_entries', 10000),
+                max_bytes=max_bytes
+            )
+        return cls(
+            backend=backend,
+            ttl_seconds=cache_config.get('ttl_s', 3600),
+            model_version=model_version
+        )
+
+    def make_key(self, normalized_text: str, language: str, model_version: Any = "",
+                 fields: Iterable[str] = ()) -> str:
+        """Cache key for one normalized query and its requested output fields"""
+        return f"{self.model_version}:{model_version}:{language}:{','.join(fields)}:{normalized_text}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh copy of a cached result, or None"""
+        payload = self.backend.get(key)
+        if payload is None:
+            self.stats["misses"] += 1
+            CACHE_REQUESTS.labels(result="miss").inc()
+            return None
+        self.stats["hits"] += 1
+        CACHE_REQUESTS.labels(result="hit").inc()
+        return json.loads(payload)
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """Store a result"""
+        evicted = self.backend.set(key, json.dumps(value).encode("utf-8"), self.ttl)
+        if evicted:
+            self.stats["evictions"] += evicted
+            CACHE_EVICTIONS.inc(evicted)
+
+    def invalidate(self, *_):
+        """Drop every entry, e.g. after models are reloaded"""
+        self.backend.clear()
+
+    def __len__(self):
+        return len(self.backend)
+
+# Example usage:
+# cache = QueryCache(MemoryCacheBackend(max_entries=5000), ttl_seconds=600, model_version="v2.1")
+# key = cache.make_key("nahitaji msaada na malipo ya VAT", "sw")
+# cache.get(key) or cache.put(key, result)
@@ -0,0 +1,291 @@
+"""
+FILE: nlp/session_store.py
+DESCRIPTION: Bounded conversation session storage for DialogueManager
+FEATURES:
+  - Per-session TTL and a cap on turns kept per history
+  - Global session and memory caps with LRU eviction; in both backends a
+    session's recency (for TTL and LRU) is its last appended turn, so reading
+    a history never writes
+  - Compact turn records
+  - SQLite (WAL) backend so every worker on a node sees the same conversation
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+
+class Turn(NamedTuple):
+    """One dialogue turn; only what follow-up handling needs"""
+    intent: str
+    confidence: float
+    entities: Tuple[Tuple[str, str], ...]  # (label, value) pairs, empty labels dropped
+    action: str
+    pending_action: Optional[str]
+    timestamp: float
+
+    @classmethod
+    def create(cls, intent: Dict[str, Any], entities: Dict[str, List[str]],
+               response: Dict[str, Any]) -> "Turn":
+        """Build a turn from classifier, NER and response dictionaries"""
+        return cls(
+            intent=intent['intent'],
+            confidence=round(float(intent['confidence']), 4),
+            entities=tuple(
+                (label, value) for label, values in entities.items() for value in values
+            ),
+            action=response.get('action', ''),
+            pending_action=response.get('pending_action'),
+            timestamp=time.time()
+        )
+
+    def entity_dict(self) -> Dict[str, List[str]]:
+        """Entities back in extract_entities() shape"""
+        grouped = {}
+        for label, value in self.entities:
+            grouped.setdefault(label, []).append(value)
+        return grouped
+
+    def encode(self) -> str:
+        return json.dumps(self, separators=(",", ":"))
+
+    @classmethod
+    def decode(cls, payload: str) -> "Turn":
+        intent, confidence, entities, action, pending_action, timestamp = json.loads(payload)
+        return cls(intent, confidence, tuple(map(tuple, entities)), action, pending_action, timestamp)
+
+
+class InMemorySessionStore:
+    def __init__(self, ttl_seconds: float = 1800, max_turns: int = 10,
+                 max_sessions: int = 100000, max_bytes: int = 64 * 1024**2):
+        """
+        Per-process session store
+        :param ttl_seconds: Idle time after which a session is forgotten
+        :param max_turns: Turns kept per session (oldest dropped first)
+        :param max_sessions: Sessions kept before evicting the least recently used
+        :param max_bytes: Approximate memory cap across all sessions
+        """
+        self.ttl = ttl_seconds
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._sessions = OrderedDict()  # user_id -> (last_seen, [turns], bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_history(self, user_id: str) -> List[Turn]:
+        """Turns for a session, oldest first; empty if unknown or expired"""
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is None:
+                return []
+            last_seen, turns, _ = session
+            if last_seen + self.ttl <= time.time():
+                self._drop(user_id)
+                return []
+            return [turn for turn, _ in turns]
+
+    def append_turn(self, user_id: str, turn: Turn):
+        """Record a turn, then enforce the per-session and global caps"""
+        size = len(turn.encode())
+        with self._lock:
+            _, turns, used = self._sessions.pop(user_id, (0, [], 0))
+            self._bytes -= used
+
+            turns.append((turn, size))
+            used += size
+            while len(turns) > self.max_turns:
+                used -= turns.pop(0)[1]
+
+            self._sessions[user_id] = (time.time(), turns, used)
+            self._bytes += used
+            self._enforce_limits()
+
+    def clear(self, user_id: str):
+        with self._lock:
+            if user_id in self._sessions:
+                self._drop(user_id)
+
+    def prune_expired(self) -> int:
+        """Drop every expired session; returns how many were removed"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [user_id for user_id, (last_seen, _, _) in self._sessions.items() if last_seen <= cutoff]
+            for user_id in expired:
+                self._drop(user_id)
+            return len(expired)
+
+    def _enforce_limits(self):
+        """Evict least recently used sessions while over either cap"""
+        while self._sessions and (len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes):
+            self._drop(next(iter(self._sessions)))
+
+    def _drop(self, user_id: str):
+        _, _, used = self._sessions.pop(user_id)
+        self._bytes -= used
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class SQLiteSessionStore:
+    def __init__(self, path: str = "/tmp/kra_sessions.sqlite", ttl_seconds: float = 1800,
+                 max_turns: int = 10, max_sessions: int = 100000, max_bytes: int = 256 * 1024**2):
+        """
+        Node-local session store shared by every worker process, so a follow-up
+        question reaches its context whichever worker handles it
+        :param path: SQLite file (WAL mode, safe for concurrent processes)
+        :param ttl_seconds: Idle time after which a session is forgotten
+        :param max_turns: Turns kept per session (oldest dropped first)
+        :param max_sessions: Sessions kept before evicting the least recently used
+        :param max_bytes: Limit on the summed size of stored turns
+        """
+        self.path = path
+        self.ttl = ttl_seconds
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+
+        conn = self._connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS dialogue_sessions (
+                    user_id TEXT PRIMARY KEY,
+                    last_seen REAL NOT NULL,
+                    size INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS dialogue_turns (
+                    user_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (user_id, seq)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_dialogue_sessions_seen ON dialogue_sessions(last_seen)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread and process; sqlite3 connections are not shareable"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get_history(self, user_id: str) -> List[Turn]:
+        """Turns for a session, oldest first; empty if unknown or expired"""
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT last_seen FROM dialogue_sessions WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if row is None:
+            return []
+        if row[0] + self.ttl <= time.time():
+            with conn:
+                self._drop(conn, user_id)
+            return []
+        return [
+            Turn.decode(payload) for (payload,) in conn.execute(
+                "SELECT payload FROM dialogue_turns WHERE user_id = ? ORDER BY seq", (user_id,)
+            )
+        ]
+
+    def append_turn(self, user_id: str, turn: Turn):
+        """Record a turn, then enforce the per-session and global caps"""
+        payload = turn.encode()
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            # Take the write lock before reading MAX(seq), so two processes
+            # appending to one session cannot pick the same seq
+            conn.execute("BEGIN IMMEDIATE")
+            seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) + 1 FROM dialogue_turns WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+            conn.execute("INSERT INTO dialogue_turns VALUES (?, ?, ?)", (user_id, seq, payload))
+            conn.execute(
+                "DELETE FROM dialogue_turns WHERE user_id = ? AND seq <= ?", (user_id, seq - self.max_turns)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO dialogue_sessions VALUES (?, ?, "
+                "(SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM dialogue_turns WHERE user_id = ?))",
+                (user_id, now, user_id)
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired sessions, then least recently used ones until within limits"""
+        for (user_id,) in conn.execute(
+            "SELECT user_id FROM dialogue_sessions WHERE last_seen <= ?", (now - self.ttl,)
+        ).fetchall():
+            self._drop(conn, user_id)
+
+        count, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM dialogue_sessions"
+        ).fetchone()
+        if count <= self.max_sessions and total <= self.max_bytes:
+            return
+
+        for user_id, size in conn.execute(
+            "SELECT user_id, size FROM dialogue_sessions ORDER BY last_seen"
+        ).fetchall():
+            if count <= self.max_sessions and total <= self.max_bytes:
+                break
+            self._drop(conn, user_id)
+            count -= 1
+            total -= size
+
+    @staticmethod
+    def _drop(conn: sqlite3.Connection, user_id: str):
+        conn.execute("DELETE FROM dialogue_turns WHERE user_id = ?", (user_id,))
+        conn.execute("DELETE FROM dialogue_sessions WHERE user_id = ?", (user_id,))
+
+    def clear(self, user_id: str):
+        conn = self._connection()
+        with conn:
+            self._drop(conn, user_id)
+
+    def prune_expired(self) -> int:
+        """Drop every expired session; returns how many were removed"""
+        conn = self._connection()
+        with conn:
+            expired = conn.execute(
+                "SELECT user_id FROM dialogue_sessions WHERE last_seen <= ?", (time.time() - self.ttl,)
+            ).fetchall()
+            for (user_id,) in expired:
+                self._drop(conn, user_id)
+        return len(expired)
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM dialogue_sessions").fetchone()[0]
+
+
+def session_store_from_config(session_config: Dict[str, Any]):
+    """
+    Build a session store from the nlp_serving.sessions settings block
+    :param session_config: Settings dictionary
+    :return: InMemorySessionStore or SQLiteSessionStore
+    """
+    options = dict(
+        ttl_seconds=session_config.get('ttl_s', 1800),
+        max_turns=session_config.get('max_turns', 10),
+        max_sessions=session_config.get('max_sessions', 100000),
+        max_bytes=int(session_config.get('max_mb', 64) * 1024**2)
+    )
+    if session_config.get('backend', 'memory') == 'sqlite':
+        return SQLiteSessionStore(path=session_config.get('sqlite_path', '/tmp/kra_sessions.sqlite'), **options)
+    return InMemorySessionStore(**options)
+
+# Example usage:
+# store = session_store_from_config({"backend": "sqlite", "ttl_s": 900})
+# store.append_turn("user123", Turn.create(intent, entities, response))
+# store.get_history("user123")[-1].pending_action
@@ -0,0 +1,189 @@
+"""
+FILE: nlp/tax_knowledge/bm25_index.py
+DESCRIPTION: Persistent BM25 inverted index stored in SQLite
+FEATURES:
+  - Postings, document lengths and corpus statistics kept on disk and
+    memory-mapped on open, so startup does not re-tokenize the corpus
+  - Incremental add/update/delete keyed on the document rowid
+  - Top-k scoring that only touches postings of the query terms
+"""
+
+import heapq
+import math
+import sqlite3
+from collections import Counter
+from typing import Callable, Collection, Dict, Iterable, List, Optional, Tuple
+
+MMAP_BYTES = 256 * 1024**2
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased whitespace tokens"""
+    return text.lower().split()
+
+
+class BM25Index:
+    def __init__(self, connect: Callable[[], sqlite3.Connection], k1: float = 1.5, b: float = 0.75):
+        """
+        Inverted index living in the given database (tables prefixed bm25_)
+        :param connect: Returns the calling thread's connection; sharing the knowledge
+            base's connection keeps document and index writes in one transaction
+        :param k1: Term frequency saturation
+        :param b: Document length normalization
+        """
+        self.connect = connect
+        self.k1 = k1
+        self.b = b
+
+        conn = connect()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bm25_docs (
+                    doc_id INTEGER PRIMARY KEY,
+                    length INTEGER NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bm25_postings (
+                    term TEXT NOT NULL,
+                    doc_id INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, doc_id)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_bm25_postings_doc ON bm25_postings(doc_id)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bm25_terms (
+                    term TEXT PRIMARY KEY,
+                    df INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bm25_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO bm25_meta VALUES ('doc_count', 0), ('total_length', 0)")
+
+    @property
+    def doc_count(self) -> int:
+        return self._meta("doc_count")
+
+    @property
+    def avg_length(self) -> float:
+        count = self.doc_count
+        return self._meta("total_length") / count if count else 0.0
+
+    def _meta(self, key: str) -> int:
+        return self.connect().execute("SELECT value FROM bm25_meta WHERE key = ?", (key,)).fetchone()[0]
+
+    def __contains__(self, doc_id: int) -> bool:
+        row = self.connect().execute("SELECT 1 FROM bm25_docs WHERE doc_id = ?", (doc_id,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        return self.doc_count
+
+    def add(self, doc_id: int, text: str):
+        """Index one document; replaces any earlier version with the same id"""
+        self.add_many([(doc_id, text)])
+
+    def add_many(self, docs: Iterable[Tuple[int, str]]):
+        """Index (doc_id, text) pairs in one transaction"""
+        conn = self.connect()
+        with conn:
+            for doc_id, text in docs:
+                self._delete(conn, doc_id)
+                self._insert(conn, doc_id, tokenize(text))
+
+    update = add
+
+    def delete(self, doc_id: int):
+        """Remove a document from the index"""
+        conn = self.connect()
+        with conn:
+            self._delete(conn, doc_id)
+
+    def _insert(self, conn: sqlite3.Connection, doc_id: int, tokens: List[str]):
+        counts = Counter(tokens)
+        conn.execute("INSERT INTO bm25_docs (doc_id, length) VALUES (?, ?)", (doc_id, len(tokens)))
+        conn.executemany(
+            "INSERT INTO bm25_postings VALUES (?, ?, ?)",
+            [(term, doc_id, tf) for term, tf in counts.items()]
+        )
+        conn.executemany(
+            "INSERT INTO bm25_terms VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1",
+            [(term,) for term in counts]
+        )
+        self._bump(conn, 1, len(tokens))
+
+    def _delete(self, conn: sqlite3.Connection, doc_id: int):
+        row = conn.execute("SELECT length FROM bm25_docs WHERE doc_id = ?", (doc_id,)).fetchone()
+        if row is None:
+            return
+        conn.execute(
+            "UPDATE bm25_terms SET df = df - 1 "
+            "WHERE term IN (SELECT term FROM bm25_postings WHERE doc_id = ?)", (doc_id,)
+        )
+        conn.execute("DELETE FROM bm25_terms WHERE df <= 0")
+        conn.execute("DELETE FROM bm25_postings WHERE doc_id = ?", (doc_id,))
+        conn.execute("DELETE FROM bm25_docs WHERE doc_id = ?", (doc_id,))
+        self._bump(conn, -1, -row[0])
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, docs: int, length: int):
+        conn.execute("UPDATE bm25_meta SET value = value + ? WHERE key = 'doc_count'", (docs,))
+        conn.execute("UPDATE bm25_meta SET value = value + ? WHERE key = 'total_length'", (length,))
+
+    @staticmethod
+    def idf(df: int, doc_count: int) -> float:
+        """Non-negative BM25 idf, so updates never need a corpus-wide idf pass"""
+        return math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+
+    def scores(self, tokens: List[str], doc_ids: Optional[Collection[int]] = None) -> Dict[int, float]:
+        """
+        BM25 score of every document containing at least one query token
+        :param tokens: Query tokens (see tokenize)
+        :param doc_ids: Only score these documents (default: all)
+        :return: doc_id -> score
+        """
+        doc_count = self.doc_count
+        if not doc_count or not tokens or (doc_ids is not None and not doc_ids):
+            return {}
+        avg_length = self.avg_length
+        k1, b = self.k1, self.b
+        conn = self.connect()
+
+        scores = {}
+        for term, query_tf in Counter(tokens).items():
+            row = conn.execute("SELECT df FROM bm25_terms WHERE term = ?", (term,)).fetchone()
+            if row is None:
+                continue
+            idf = self.idf(row[0], doc_count) * query_tf
+            sql = ("SELECT p.doc_id, p.tf, d.length FROM bm25_postings p "
+                   "JOIN bm25_docs d ON d.doc_id = p.doc_id WHERE p.term = ?")
+            params = [term]
+            if doc_ids is not None:
+                sql += f" AND p.doc_id IN ({','.join('?' * len(doc_ids))})"
+                params.extend(doc_ids)
+            for doc_id, tf, length in conn.execute(sql, params):
+                weight = tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_length))
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * weight
+        return scores
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Best-scoring documents for a query
+        :param query: Natural language question
+        :param k: Number of hits
+        :return: (doc_id, score) pairs, best first
+        """
+        scores = self.scores(tokenize(query))
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+# Example usage:
+# conn = sqlite3.connect("nlp/tax_knowledge/tax_db.sqlite")
+# index = BM25Index(lambda: conn)
+# index.add(42, "VAT returns are due on the 20th of the following month")
+# index.search("VAT due date", k=3)
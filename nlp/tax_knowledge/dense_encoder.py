@@ -0,0 +1,52 @@
+"""
+FILE: nlp/tax_knowledge/dense_encoder.py
+DESCRIPTION: Sentence embeddings from a local transformer for dense retrieval
+FEATURES:
+  - Reuses the XLM-R weights of the intent classifier by default (no download)
+  - Mean pooling over non-padding tokens, unit-length float32 output
+  - Batched, no-grad CPU inference
+"""
+
+from typing import List
+import numpy as np
+import torch
+from transformers import AutoModel
+from nlp.inference_backends import load_tokenizer
+
+
+class DenseEncoder:
+    def __init__(self, model_path: str = "models/nlp/intent_classifier", max_length: int = 256):
+        """
+        :param model_path: Local transformer weights; the encoder body is used, heads are ignored
+        :param max_length: Tokens kept per text
+        """
+        self.model_path = model_path
+        self.max_length = max_length
+        self.tokenizer = load_tokenizer(model_path)
+        self.model = AutoModel.from_pretrained(model_path)
+        self.model.eval()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Embed texts
+        :param texts: Queries or documents
+        :param batch_size: Texts per forward pass
+        :return: len(texts) x hidden_size unit-length float32 matrix
+        """
+        batches = []
+        with torch.no_grad():
+            for start in range(0, len(texts), batch_size):
+                inputs = self.tokenizer(
+                    texts[start:start + batch_size], padding=True, truncation=True,
+                    max_length=self.max_length, return_tensors="pt"
+                )
+                hidden = self.model(**inputs).last_hidden_state
+                mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+                batches.append(torch.nn.functional.normalize(pooled, dim=1).numpy())
+        return np.concatenate(batches) if batches else np.zeros((0, self.model.config.hidden_size), np.float32)
+
+# Example usage:
+# encoder = DenseEncoder()
+# encoder.encode(["Muda wa kuwasilisha VAT ni lini?"]).shape
+# (1, 768)
@@ -0,0 +1,138 @@
+"""
+FILE: nlp/tax_knowledge/dense_index.py
+DESCRIPTION: Local approximate nearest-neighbour index for document embeddings
+FEATURES:
+  - float16 embedding matrix, memory-mapped so workers share the page cache
+  - IVF coarse quantizer: k-means centroids, rows stored grouped by cluster,
+    queries scan only the nprobe closest clusters
+  - Batched cosine-similarity search returning ranked (doc_id, score) pairs
+"""
+
+import json
+import os
+from typing import List, Tuple
+import numpy as np
+
+EMBEDDINGS_FILE = "embeddings.f16"
+DOC_IDS_FILE = "doc_ids.npy"
+CENTROIDS_FILE = "centroids.npy"
+OFFSETS_FILE = "offsets.npy"
+META_FILE = "meta.json"
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Unit-length rows, so inner product is cosine similarity"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, iterations: int = 20,
+                    sample_size: int = 100000, seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means on a sample of the embeddings
+    :param vectors: Unit-length float32 rows
+    :param nlist: Number of clusters
+    :return: nlist x dim unit-length centroids
+    """
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample_size:
+        vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        for cluster in range(nlist):
+            members = vectors[assignment == cluster]
+            if len(members):
+                centroids[cluster] = members.sum(axis=0)
+            else:
+                # Re-seed empty clusters on a random point
+                centroids[cluster] = vectors[rng.integers(len(vectors))]
+        centroids = normalize_rows(centroids)
+    return centroids
+
+
+class DenseIndex:
+    def __init__(self, directory: str, nprobe: int = 8):
+        """
+        Open an index written by DenseIndex.build
+        :param directory: Index directory
+        :param nprobe: Clusters scanned per query; higher is slower and more exact
+        """
+        with open(os.path.join(directory, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.nprobe = nprobe
+        self.doc_ids = np.load(os.path.join(directory, DOC_IDS_FILE), mmap_mode="r")
+        self.centroids = np.load(os.path.join(directory, CENTROIDS_FILE))
+        self.offsets = np.load(os.path.join(directory, OFFSETS_FILE))
+        self.embeddings = np.memmap(
+            os.path.join(directory, EMBEDDINGS_FILE), dtype=np.float16, mode="r",
+            shape=(self.meta["count"], self.meta["dim"])
+        )
+
+    @classmethod
+    def build(cls, directory: str, embeddings: np.ndarray, doc_ids: np.ndarray,
+              nlist: int = None, encoder: str = "", **kwargs) -> "DenseIndex":
+        """
+        Cluster embeddings and write the index
+        :param directory: Output directory (created if missing)
+        :param embeddings: One row per document
+        :param doc_ids: tax_documents rowid of each row
+        :param nlist: Clusters; defaults to about sqrt(count)
+        :param encoder: Name of the model that produced the embeddings, stored for queries
+        """
+        vectors = normalize_rows(embeddings)
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        count, dim = vectors.shape
+        nlist = min(count, nlist or max(1, int(np.sqrt(count))))
+
+        centroids = train_centroids(vectors, nlist, **kwargs)
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=nlist))])
+
+        os.makedirs(directory, exist_ok=True)
+        matrix = np.memmap(os.path.join(directory, EMBEDDINGS_FILE), dtype=np.float16,
+                           mode="w+", shape=(count, dim))
+        matrix[:] = vectors[order].astype(np.float16)
+        matrix.flush()
+        del matrix
+        np.save(os.path.join(directory, DOC_IDS_FILE), doc_ids[order])
+        np.save(os.path.join(directory, CENTROIDS_FILE), centroids)
+        np.save(os.path.join(directory, OFFSETS_FILE), offsets)
+        with open(os.path.join(directory, META_FILE), "w") as f:
+            json.dump({"count": int(count), "dim": int(dim), "nlist": int(nlist), "encoder": encoder}, f)
+        return cls(directory)
+
+    def __len__(self):
+        return self.meta["count"]
+
+    def search_many(self, query_vectors: np.ndarray, k: int = 10) -> List[List[Tuple[int, float]]]:
+        """
+        Nearest documents for a batch of query embeddings
+        :param query_vectors: One row per query, from the same encoder as the index
+        :param k: Hits per query
+        :return: Per query, (doc_id, cosine similarity) pairs, best first
+        """
+        queries = normalize_rows(query_vectors)
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+
+        results = []
+        for query, clusters in zip(queries, probes):
+            rows = np.concatenate([
+                np.arange(self.offsets[cluster], self.offsets[cluster + 1]) for cluster in clusters
+            ])
+            if not len(rows):
+                results.append([])
+                continue
+            scores = self.embeddings[rows].astype(np.float32) @ query
+            top = np.argpartition(-scores, k - 1)[:k] if len(scores) > k else np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            results.append([(int(self.doc_ids[rows[i]]), float(scores[i])) for i in top])
+        return results
+
+# Example usage:
+# index = DenseIndex.build("nlp/tax_knowledge/dense_index", embeddings, doc_ids)
+# DenseIndex("nlp/tax_knowledge/dense_index", nprobe=8).search_many(encoder.encode(["muda wa VAT"]), k=5)
@@ -0,0 +1,88 @@
+"""
+FILE: nlp/tax_knowledge/fts_index.py
+DESCRIPTION: SQLite FTS5 search over tax_documents
+FEATURES:
+  - External-content FTS5 table kept in sync by triggers, so documents written
+    by any process or tool are searchable without an explicit reindex
+  - bm25() ranking inside SQLite; nothing but the hits reaches Python
+"""
+
+import sqlite3
+from typing import Callable, List, Tuple
+from nlp.tax_knowledge.bm25_index import tokenize
+
+FTS_TABLE = "tax_documents_fts"
+
+
+def match_expression(query: str) -> str:
+    """Quote every token and OR them, so user text cannot inject FTS5 syntax"""
+    return " OR ".join('"{}"'.format(token.replace('"', '""')) for token in tokenize(query))
+
+
+class FTS5Index:
+    def __init__(self, connect: Callable[[], sqlite3.Connection]):
+        """
+        :param connect: Returns the calling thread's connection to the knowledge base
+        """
+        self.connect = connect
+
+        conn = connect()
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).fetchone()
+        if exists:
+            return
+
+        with conn:
+            conn.execute(f"""
+                CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+                    content, content='tax_documents', content_rowid='rowid'
+                )
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON tax_documents BEGIN
+                    INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.rowid, new.content);
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON tax_documents BEGIN
+                    INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.rowid, old.content);
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON tax_documents BEGIN
+                    INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, content) VALUES ('delete', old.rowid, old.content);
+                    INSERT INTO {FTS_TABLE}(rowid, content) VALUES (new.rowid, new.content);
+                END
+            """)
+            # One-off index of the documents that predate the table
+            conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+    def __len__(self):
+        return self.connect().execute(f"SELECT COUNT(*) FROM {FTS_TABLE}").fetchone()[0]
+
+    def search_many(self, queries: List[str], k: int = 10) -> List[List[Tuple[int, float]]]:
+        """
+        Rank documents inside SQLite
+        :param queries: Natural language questions
+        :param k: Hits per query
+        :return: Per query, (doc_id, score) pairs, best first (bm25() negated, higher is better)
+        """
+        conn = self.connect()
+        results = []
+        for query in queries:
+            expression = match_expression(query)
+            if not expression:
+                results.append([])
+                continue
+            results.append([
+                (doc_id, -rank) for doc_id, rank in conn.execute(
+                    f"SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ? ORDER BY rank LIMIT ?",
+                    (expression, k)
+                )
+            ])
+        return results
+
+# Example usage:
+# index = FTS5Index(lambda: conn)
+# index.search_many(["VAT due date"], k=3)
@@ -1,42 +1,393 @@
 """
 FILE: nlp/tax_knowledge/knowledge_connector.py
 INTEGRATION: KRA Document Management System + FAQ Database
+FEATURES:
+  - Persistent BM25 index stored next to the documents (no rebuild at startup)
+  - Incremental add/update/delete of documents keyed on rowid; triggers log
+    writes made outside this class, so startup re-indexes only those rows
+  - Vectorized scoring from a sparse weight matrix; ranked hits for batches of queries.
+    Writes never rebuild the matrix on the request path: until a background
+    rebuild folds in max_delta_docs changed documents, the stale matrix only
+    shortlists hits, which are rescored from the index with the changed ones
+  - Optional SQLite FTS5 backend: ranking runs inside SQLite, instant startup
+  - Search structures hold document ids only; content of hits is fetched on
+    demand through a small LRU of hot documents, dropped whenever another
+    connection (process, thread or tool) commits to the database
+  - Optional dense retrieval over a memory-mapped IVF index, and hybrid
+    lexical + dense ranking by reciprocal rank fusion
 """
 
-from rank_bm25 import BM25Okapi
+import heapq
+import logging
+import os
 import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, NamedTuple
+from nlp.tax_knowledge.bm25_index import BM25Index, MMAP_BYTES, tokenize
+from nlp.tax_knowledge.dense_index import DenseIndex
+from nlp.tax_knowledge.fts_index import FTS5Index
+from nlp.tax_knowledge.sparse_scorer import SparseBM25Scorer
+
+NO_MATCH_MESSAGE = "Samahani, sijapata taarifa rasmi kuhusu swali lako."
+
+SEARCH_BACKENDS = ("bm25", "fts5")
+SEARCH_MODES = ("lexical", "dense", "hybrid")
+
+# Rowids of tax_documents written since the BM25 index last caught up
+CHANGE_LOG = "bm25_changes"
+
+# Reciprocal rank fusion constant and candidates taken from each ranker
+RRF_K = 60
+HYBRID_CANDIDATES = 50
+
+class SearchHit(NamedTuple):
+    doc_id: int
+    score: float
+    content: str
 
 class TaxKnowledgeBase:
-    def __init__(self, db_path="nlp/tax_knowledge/tax_db.sqlite"):
+    def __init__(self, db_path="nlp/tax_knowledge/tax_db.sqlite", backend="bm25",
+                 content_cache_size=1024, fetch_chunk_size=1000,
+                 dense_index_path=None, encoder=None, nprobe=8, max_delta_docs=256):
         """
         Semantic search over tax regulations
         :param db_path: Path to SQLite knowledge base
+        :param backend: "bm25" (in-process sparse scoring) or "fts5" (ranking inside SQLite)
+        :param content_cache_size: Documents whose content is kept in memory
+        :param fetch_chunk_size: Rows read per round trip while indexing
+        :param dense_index_path: Directory written by scripts/build_dense_index.py; enables
+            the "dense" and "hybrid" search modes
+        :param encoder: Query encoder matching the dense index (e.g. DenseEncoder)
+        :param nprobe: IVF clusters scanned per dense query
+        :param max_delta_docs: Documents changed since the BM25 matrix was built that
+            trigger a background rebuild; until then they are scored from the index
         """
-        self.conn = sqlite3.connect(db_path)
-        self._build_search_index()
+        if backend not in SEARCH_BACKENDS:
+            raise ValueError(f"Unknown search backend {backend!r}; expected one of {SEARCH_BACKENDS}")
+        self.db_path = db_path
+        self.backend = backend
+        self._local = threading.local()
+        # (write generation the matrix covers, SparseBM25Scorer)
+        self._scorer = None
+        self._scorer_lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._generation = 0
+        # doc_id -> generation of its latest write, for writes the matrix may not cover
+        self._changed = {}
+        self._rebuilding = False
+        self.max_delta_docs = max_delta_docs
+        self.content_cache_size = content_cache_size
+        self.fetch_chunk_size = fetch_chunk_size
+        self._contents = OrderedDict()
+        self._contents_lock = threading.Lock()
+        self._contents_generation = 0
+        self.dense_index = DenseIndex(dense_index_path, nprobe=nprobe) if dense_index_path else None
+        self.encoder = encoder
+
+        if backend == "fts5":
+            self.index = FTS5Index(self._connection)
+        else:
+            self.index = BM25Index(self._connection)
+            self._track_changes()
+            self._build_search_index()
+
+    def _connection(self):
+        """One connection per thread and process; the index file is memory-mapped"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._local.data_version = None
+        return conn
+
+    def _track_changes(self):
+        """
+        Log every write to tax_documents, whoever makes it, like the FTS5 triggers
+        Installing the triggers queues every document once, since edits made
+        before they existed cannot be told apart from unchanged rows
+        """
+        conn = self._connection()
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?", (f"{CHANGE_LOG}_ai",)
+        ).fetchone()
+        if exists:
+            return
+
+        with conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {CHANGE_LOG} (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    doc_id INTEGER NOT NULL
+                )
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {CHANGE_LOG}_ai AFTER INSERT ON tax_documents BEGIN
+                    INSERT INTO {CHANGE_LOG} (doc_id) VALUES (new.rowid);
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {CHANGE_LOG}_ad AFTER DELETE ON tax_documents BEGIN
+                    INSERT INTO {CHANGE_LOG} (doc_id) VALUES (old.rowid);
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {CHANGE_LOG}_au AFTER UPDATE ON tax_documents BEGIN
+                    INSERT INTO {CHANGE_LOG} (doc_id) VALUES (old.rowid);
+                    INSERT INTO {CHANGE_LOG} (doc_id) VALUES (new.rowid);
+                END
+            """)
+            conn.execute(
+                f"INSERT INTO {CHANGE_LOG} (doc_id) SELECT rowid FROM tax_documents UNION SELECT doc_id FROM bm25_docs"
+            )
 
     def _build_search_index(self):
-        """Create BM25 search index from documents"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT content FROM tax_documents")
-        self.documents = [row[0] for row in cursor.fetchall()]
-        self.bm25 = BM25Okapi([doc.split() for doc in self.documents])
+        """
+        Bring the BM25 index in line with tax_documents
+        Only rows in the change log, i.e. written outside this class since the last
+        run, are (re)indexed or removed; startup cost follows the number of changes
+        """
+        # Stream logged documents through a separate read connection; under WAL it
+        # reads one snapshot of the log and the documents while chunks are committed
+        reader = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            reader.execute("BEGIN")
+            last_seq = reader.execute(f"SELECT MAX(seq) FROM {CHANGE_LOG}").fetchone()[0]
+            if last_seq is None:
+                return
+            cursor = reader.execute(
+                f"SELECT c.doc_id, t.content FROM (SELECT DISTINCT doc_id FROM {CHANGE_LOG} WHERE seq <= ?) c "
+                "LEFT JOIN tax_documents t ON t.rowid = c.doc_id", (last_seq,)
+            )
+            while True:
+                rows = cursor.fetchmany(self.fetch_chunk_size)
+                if not rows:
+                    break
+                self.index.add_many([(doc_id, content) for doc_id, content in rows if content is not None])
+                for doc_id, content in rows:
+                    if content is None:
+                        self.index.delete(doc_id)
+        finally:
+            reader.close()
+
+        # Writes logged after the snapshot stay queued for the next run
+        conn = self._connection()
+        with conn:
+            conn.execute(f"DELETE FROM {CHANGE_LOG} WHERE seq <= ?", (last_seq,))
+        self._scorer = None
+
+    @property
+    def scorer(self):
+        """Weight matrix over the index as of its last build (built on first use)"""
+        return self._scorer_snapshot()[0]
+
+    def _scorer_snapshot(self):
+        """The current matrix and the documents written since it was built, read together"""
+        if self._scorer is None:
+            self.refresh_scorer()
+        with self._scorer_lock:
+            generation, scorer = self._scorer
+            return scorer, {doc_id for doc_id, changed in self._changed.items() if changed > generation}
 
-    def search(self, query, language="sw"):
+    def refresh_scorer(self):
+        """Rebuild the BM25 weight matrix from the index"""
+        with self._build_lock:
+            # Read before the snapshot: writes committed after this are kept in the
+            # delta even if the snapshot happens to include them
+            generation = self._generation
+            if self._scorer is not None and self._scorer[0] == generation:
+                return
+            scorer = SparseBM25Scorer.from_index(self.index)
+            with self._scorer_lock:
+                self._scorer = (generation, scorer)
+                self._changed = {doc_id: changed for doc_id, changed in self._changed.items() if changed > generation}
+
+    def _note_change(self, doc_id):
+        """Record a committed write; rebuild in the background once enough have piled up"""
+        with self._scorer_lock:
+            self._generation += 1
+            self._changed[doc_id] = self._generation
+            if self._scorer is None or self._rebuilding or len(self._changed) < self.max_delta_docs:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_scorer, name="bm25-rebuild", daemon=True).start()
+
+    def _rebuild_scorer(self):
+        try:
+            self.refresh_scorer()
+        except Exception as e:
+            logging.error(f"BM25 matrix rebuild failed: {str(e)}")
+        finally:
+            with self._scorer_lock:
+                self._rebuilding = False
+
+    def add_document(self, content):
+        """
+        Store and index a new document (e.g. a newly published circular)
+        :return: rowid of the document
+        """
+        conn = self._connection()
+        with conn:
+            doc_id = conn.execute("INSERT INTO tax_documents (content) VALUES (?)", (content,)).lastrowid
+            if self.backend == "bm25":
+                self.index.add(doc_id, content)
+                self._clear_change_log(conn, doc_id)
+        self._note_change(doc_id)
+        return doc_id
+
+    def update_document(self, doc_id, content):
+        """Replace a document's content and reindex only that document"""
+        conn = self._connection()
+        with conn:
+            conn.execute("UPDATE tax_documents SET content = ? WHERE rowid = ?", (content, doc_id))
+            if self.backend == "bm25":
+                self.index.update(doc_id, content)
+                self._clear_change_log(conn, doc_id)
+        self._note_change(doc_id)
+        self._forget_content(doc_id)
+
+    def delete_document(self, doc_id):
+        """Remove a document and its postings"""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM tax_documents WHERE rowid = ?", (doc_id,))
+            if self.backend == "bm25":
+                self.index.delete(doc_id)
+                self._clear_change_log(conn, doc_id)
+        self._note_change(doc_id)
+        self._forget_content(doc_id)
+
+    @staticmethod
+    def _clear_change_log(conn, doc_id):
+        """This class indexes its own writes; only outside writes need the log"""
+        conn.execute(f"DELETE FROM {CHANGE_LOG} WHERE doc_id = ?", (doc_id,))
+
+    def search(self, query, language="sw", mode="lexical"):
         """
         Find relevant tax articles
         :param query: Natural language question
         :param language: Preferred response language
+        :param mode: "lexical", "dense" or "hybrid"
         :return: Formatted answer from official docs
         """
-        tokenized_query = query.split()
-        doc_scores = self.bm25.get_scores(tokenized_query)
-        best_match_idx = doc_scores.argmax()
-        
-        return self._format_response(
-            self.documents[best_match_idx], 
-            language
-        )
+        hits = self.search_many([query], k=1, mode=mode)[0]
+        if not hits:
+            return NO_MATCH_MESSAGE
+
+        return self._format_response(hits[0].content, language)
+
+    def search_many(self, queries: List[str], k: int = 5, mode: str = "lexical") -> List[List[SearchHit]]:
+        """
+        Rank documents for a batch of queries in one scoring pass
+        :param queries: Natural language questions
+        :param k: Hits per query
+        :param mode: "lexical" (BM25/FTS5), "dense" (embeddings) or "hybrid" (both, fused by rank)
+        :return: Per query, hits best first
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {mode!r}; expected one of {SEARCH_MODES}")
+        if mode != "lexical" and (self.dense_index is None or self.encoder is None):
+            raise ValueError(f"Search mode {mode!r} needs dense_index_path and encoder")
+
+        if mode == "lexical":
+            ranked = self._lexical(queries, k)
+        elif mode == "dense":
+            ranked = self._dense(queries, k)
+        else:
+            depth = max(k, HYBRID_CANDIDATES)
+            ranked = [
+                self._fuse(lexical, dense, k=k)
+                for lexical, dense in zip(self._lexical(queries, depth), self._dense(queries, depth))
+            ]
+
+        doc_ids = {doc_id for hits in ranked for doc_id, _ in hits}
+        contents = self._fetch_contents(doc_ids)
+        # Documents deleted since the dense index was built are skipped here
+        return [
+            [SearchHit(doc_id, score, contents[doc_id]) for doc_id, score in hits if doc_id in contents]
+            for hits in ranked
+        ]
+
+    def _lexical(self, queries, k):
+        # FTS5 triggers keep its index current
+        if self.backend == "fts5":
+            return self.index.search_many(queries, k)
+
+        scorer, changed = self._scorer_snapshot()
+        if not changed:
+            return scorer.search_many(queries, k)
+        # The matrix only shortlists: it may hold old versions of changed documents and
+        # stale corpus statistics, so the shortlist (deep enough that k survive) and the
+        # changed documents are scored from the index with current statistics
+        ranked = []
+        for query, hits in zip(queries, scorer.search_many(queries, k + len(changed))):
+            candidates = changed.union(doc_id for doc_id, _ in hits)
+            scores = self.index.scores(tokenize(query), doc_ids=candidates)
+            ranked.append(heapq.nlargest(k, scores.items(), key=lambda item: item[1]))
+        return ranked
+
+    def _dense(self, queries, k):
+        return self.dense_index.search_many(self.encoder.encode(queries), k)
+
+    @staticmethod
+    def _fuse(*rankings, k):
+        """Reciprocal rank fusion; scores are comparable across rankers of any scale"""
+        fused = {}
+        for ranking in rankings:
+            for rank, (doc_id, _) in enumerate(ranking):
+                fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        return sorted(fused.items(), key=lambda item: -item[1])[:k]
+
+    def _fetch_contents(self, doc_ids):
+        """Content of the given documents, keyed by rowid; hot documents come from the LRU"""
+        conn = self._connection()
+        self._drop_contents_if_changed(conn)
+        contents, missing = {}, []
+        with self._contents_lock:
+            generation = self._contents_generation
+            for doc_id in doc_ids:
+                if doc_id in self._contents:
+                    self._contents.move_to_end(doc_id)
+                    contents[doc_id] = self._contents[doc_id]
+                else:
+                    missing.append(doc_id)
+        if not missing:
+            return contents
+
+        placeholders = ",".join("?" * len(missing))
+        fetched = dict(conn.execute(
+            f"SELECT rowid, content FROM tax_documents WHERE rowid IN ({placeholders})", missing
+        ))
+        contents.update(fetched)
+        with self._contents_lock:
+            # Rows read before another thread dropped the LRU may already be stale
+            if generation == self._contents_generation:
+                self._contents.update(fetched)
+                while len(self._contents) > self.content_cache_size:
+                    self._contents.popitem(last=False)
+        return contents
+
+    def _drop_contents_if_changed(self, conn):
+        """
+        Empty the LRU when the database changed behind this connection's back
+        PRAGMA data_version moves whenever any other connection commits, so rows
+        edited by other processes or by direct SQL are never served stale
+        """
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._local.data_version:
+            # A thread's first check has no baseline, so it also drops the LRU
+            with self._contents_lock:
+                self._contents.clear()
+                self._contents_generation += 1
+            self._local.data_version = version
+
+    def _forget_content(self, doc_id):
+        with self._contents_lock:
+            self._contents.pop(doc_id, None)
+            self._contents_generation += 1
 
     def _format_response(self, text, language):
         """Localize and simplify official text"""
@@ -45,4 +396,9 @@ class TaxKnowledgeBase:
 
 # Example usage:
 # kb = TaxKnowledgeBase()
-# answer = kb.search("Muda wa kuwasilisha fomu ya VAT")
\ No newline at end of file
+# answer = kb.search("Muda wa kuwasilisha fomu ya VAT")
+# kb.add_document("Circular 12/2024: VAT returns are due on the 20th ...")
+# kb.search_many(["VAT due date", "PAYE penalties"], k=3)
+# fts_kb = TaxKnowledgeBase(backend="fts5")
+# hybrid_kb = TaxKnowledgeBase(dense_index_path="nlp/tax_knowledge/dense_index", encoder=DenseEncoder())
+# hybrid_kb.search("Nilipe aje ushuru wa nyumba?", mode="hybrid")
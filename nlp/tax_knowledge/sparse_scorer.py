@@ -0,0 +1,148 @@
+"""
+FILE: nlp/tax_knowledge/sparse_scorer.py
+DESCRIPTION: Vectorized BM25 scoring from a precomputed sparse weight matrix
+FEATURES:
+  - Term x document matrix of BM25 weights, built from the persistent index
+    (no re-tokenizing) or directly from a tokenized corpus
+  - A batch of queries is scored with one sparse matrix product
+  - Top-k by partial sort over matching documents only
+"""
+
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Tuple
+import numpy as np
+from scipy.sparse import csr_matrix
+from nlp.tax_knowledge.bm25_index import BM25Index, tokenize
+
+
+class SparseBM25Scorer:
+    def __init__(self, vocabulary: Dict[str, int], doc_ids: np.ndarray, weights: csr_matrix):
+        """
+        :param vocabulary: Term -> matrix row
+        :param doc_ids: Document id of each matrix column
+        :param weights: BM25 weight of each (term, document) pair
+        """
+        self.vocabulary = vocabulary
+        self.doc_ids = doc_ids
+        self.weights = weights
+
+    @classmethod
+    def from_index(cls, index: BM25Index) -> "SparseBM25Scorer":
+        """Load postings from the persistent index into a weight matrix"""
+        conn = index.connect()
+        # Read documents and postings from one snapshot while writers keep committing
+        snapshot = not conn.in_transaction
+        if snapshot:
+            conn.execute("BEGIN")
+        try:
+            doc_ids, lengths = array("q"), array("q")
+            for doc_id, length in conn.execute("SELECT doc_id, length FROM bm25_docs ORDER BY doc_id"):
+                doc_ids.append(doc_id)
+                lengths.append(length)
+
+            vocabulary = {}
+            rows, posting_docs, tfs = array("q"), array("q"), array("f")
+            for term, doc_id, tf in conn.execute("SELECT term, doc_id, tf FROM bm25_postings"):
+                rows.append(vocabulary.setdefault(term, len(vocabulary)))
+                posting_docs.append(doc_id)
+                tfs.append(tf)
+        finally:
+            if snapshot:
+                conn.rollback()
+
+        doc_ids = np.frombuffer(doc_ids, dtype=np.int64)
+        columns = np.searchsorted(doc_ids, np.frombuffer(posting_docs, dtype=np.int64))
+        return cls._build(vocabulary, doc_ids, np.frombuffer(lengths, dtype=np.int64),
+                          np.frombuffer(rows, dtype=np.int64), columns,
+                          np.frombuffer(tfs, dtype=np.float32), index.k1, index.b)
+
+    @classmethod
+    def from_corpus(cls, docs: Iterable[Tuple[int, Sequence[str]]], k1: float = 1.5,
+                    b: float = 0.75) -> "SparseBM25Scorer":
+        """
+        Build straight from tokenized documents
+        :param docs: (doc_id, tokens) pairs, in any order
+        """
+        vocabulary = {}
+        doc_ids, lengths = array("q"), array("q")
+        rows, columns, tfs = array("q"), array("q"), array("f")
+        for column, (doc_id, tokens) in enumerate(docs):
+            doc_ids.append(doc_id)
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                rows.append(vocabulary.setdefault(term, len(vocabulary)))
+                columns.append(column)
+                tfs.append(tf)
+
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        order = np.argsort(doc_ids)
+        # Columns follow doc_id order, like from_index
+        columns = np.argsort(order)[np.asarray(columns, dtype=np.int64)]
+        return cls._build(vocabulary, doc_ids[order], np.asarray(lengths, dtype=np.int64)[order],
+                          np.asarray(rows, dtype=np.int64), columns, np.asarray(tfs, dtype=np.float32),
+                          k1, b)
+
+    @classmethod
+    def _build(cls, vocabulary, doc_ids, lengths, rows, columns, tfs, k1, b) -> "SparseBM25Scorer":
+        """Apply the BM25 formula to every posting at once"""
+        doc_count = len(doc_ids)
+        df = np.bincount(rows, minlength=len(vocabulary))
+        # Same non-negative idf as BM25Index.idf
+        idf = np.log1p((doc_count - df + 0.5) / (df + 0.5))
+        avg_length = lengths.mean() if doc_count else 0.0
+        norm = k1 * (1 - b + b * lengths / avg_length) if doc_count else lengths
+        values = idf[rows] * tfs * (k1 + 1) / (tfs + norm[columns])
+
+        weights = csr_matrix(
+            (values.astype(np.float32), (rows, columns)),
+            shape=(len(vocabulary), doc_count)
+        )
+        return cls(vocabulary, doc_ids, weights)
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def _query_matrix(self, queries: List[str]) -> csr_matrix:
+        """Query x term matrix of query term counts; unknown terms are dropped"""
+        rows, columns, counts = [], [], []
+        for row, query in enumerate(queries):
+            for term, count in Counter(tokenize(query)).items():
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+                    counts.append(count)
+        return csr_matrix(
+            (np.asarray(counts, dtype=np.float32), (rows, columns)),
+            shape=(len(queries), len(self.vocabulary))
+        )
+
+    def search_many(self, queries: List[str], k: int = 10) -> List[List[Tuple[int, float]]]:
+        """
+        Score a batch of queries with one sparse matrix product
+        :param queries: Natural language questions
+        :param k: Hits per query
+        :return: Per query, (doc_id, score) pairs, best first
+        """
+        scores = self._query_matrix(queries) @ self.weights
+        results = []
+        for row in range(len(queries)):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            values, columns = scores.data[start:end], scores.indices[start:end]
+            if len(values) > k:
+                top = np.argpartition(-values, k - 1)[:k]
+                values, columns = values[top], columns[top]
+            order = np.argsort(-values, kind="stable")
+            results.append([
+                (int(self.doc_ids[columns[i]]), float(values[i])) for i in order
+            ])
+        return results
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        """Ranked (doc_id, score) hits for one query"""
+        return self.search_many([query], k)[0]
+
+# Example usage:
+# scorer = SparseBM25Scorer.from_index(kb.index)
+# scorer.search_many(["VAT due date", "PAYE penalties"], k=5)
@@ -0,0 +1,74 @@
+"""
+FILE: scripts/bench_fraud_latency.py
+DESCRIPTION: Per-call latency of compiled tree ensembles against sklearn / XGBoost
+COMPARES, at batch sizes 1 to 10k:
+  - IsolationForest.score_samples vs CompiledIsolationForest.score_samples
+  - XGBClassifier.predict_proba vs CompiledXGBoost.predict_proba (if xgboost is installed)
+Models are fitted on synthetic data shaped like the fraud features, and every
+compiled result is checked against the original before timing.
+Run with: python -m scripts.bench_fraud_latency --batch-sizes 1 10 100 1000 10000
+"""
+
+import argparse
+import time
+import numpy as np
+from sklearn.ensemble import IsolationForest
+from models.fraud_detection.compiled_trees import compile_isolation_forest, compile_xgboost
+from models.fraud_detection.model import FEATURES
+
+
+def median_call_us(fn, X, min_seconds=0.5, max_calls=2000):
+    """Median wall time of fn(X) in microseconds"""
+    fn(X)  # warm-up
+    timings = []
+    deadline = time.perf_counter() + min_seconds
+    while len(timings) < 5 or (time.perf_counter() < deadline and len(timings) < max_calls):
+        started = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - started)
+    return 1e6 * float(np.median(timings))
+
+
+def report(name, original, compiled, data, batch_sizes):
+    for batch_size in batch_sizes:
+        X = data[:batch_size]
+        original_us, compiled_us = median_call_us(original, X), median_call_us(compiled, X)
+        print(
+            f"{name:<8} {batch_size:>6} {original_us:>12.1f} {compiled_us:>12.1f} "
+            f"{compiled_us / batch_size:>10.2f} {original_us / compiled_us:>7.1f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--train-rows", type=int, default=100_000)
+    parser.add_argument("--xgb-trees", type=int, default=200)
+    parser.add_argument("--xgb-depth", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X_train = rng.normal(size=(args.train_rows, len(FEATURES))).astype(np.float32)
+    X = rng.normal(size=(max(args.batch_sizes), len(FEATURES))).astype(np.float32)
+
+    forest = IsolationForest(n_estimators=100, contamination=0.05, random_state=42).fit(X_train)
+    compiled_forest = compile_isolation_forest(forest)
+    assert np.array_equal(compiled_forest.score_samples(X), forest.score_samples(X))
+
+    print(f"{'model':<8} {'batch':>6} {'original_us':>12} {'compiled_us':>12} {'us/row':>10} {'speedup':>8}")
+    report("iforest", forest.score_samples, compiled_forest.score_samples, X, args.batch_sizes)
+
+    try:
+        import xgboost as xgb
+    except ImportError:
+        print("xgboost not installed; skipping the XGBoost comparison")
+        return
+    y = (X_train[:, 0] + X_train[:, 1] ** 2 > 1).astype(int)
+    booster = xgb.XGBClassifier(n_estimators=args.xgb_trees, max_depth=args.xgb_depth).fit(X_train, y)
+    compiled_booster = compile_xgboost(booster)
+    assert np.array_equal(compiled_booster.predict_margin(X), booster.predict(X, output_margin=True))
+    report("xgboost", booster.predict_proba, compiled_booster.predict_proba, X, args.batch_sizes)
+
+
+if __name__ == "__main__":
+    main()
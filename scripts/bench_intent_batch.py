@@ -0,0 +1,69 @@
+"""
+FILE: scripts/bench_intent_batch.py
+DESCRIPTION: Throughput of TaxIntentClassifier.predict_batch against one-at-a-time predict_intent
+COMPARES:
+  - per_query: predict_intent in a loop, the original relabelling path
+  - batch N: predict_batch with length buckets of N queries
+Queries come from a CSV of logged traffic, or are synthesized with a realistic
+spread of lengths (short follow-ups to multi-sentence complaints).
+Run with: python -m scripts.bench_intent_batch --queries 2000 --batch-sizes 1 8 32 128 --threads 4
+"""
+
+import argparse
+import random
+import time
+import pandas as pd
+from nlp.intent_classification.train_classifier import TaxIntentClassifier
+
+CLAUSES = [
+    "Muda wa VAT",
+    "Nina shida kulipa KRA kwa M-Pesa, sielewi",
+    "I filed my IT1 return last week but iTax still shows it as pending",
+    "Nimekosa deadline ya P9A kwa PIN A123456789K",
+    "Why was I charged a penalty of KES 20,000 when I paid my PAYE on time",
+    "asante",
+    "Naomba msaada wa kuwasilisha returns za rental income tax mwaka huu"
+]
+
+
+def make_queries(count, seed=42):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(CLAUSES) for _ in range(rng.choice([1, 1, 1, 2, 3, 6]))) for _ in range(count)]
+
+
+def throughput(run, queries):
+    started = time.perf_counter()
+    predictions = run(queries)
+    return len(queries) / (time.perf_counter() - started), predictions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-path", default="models/nlp/intent_classifier")
+    parser.add_argument("--backend", default="eager")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--csv", help="Logged queries to use instead of synthetic ones")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--threads", type=int, help="Intra-op threads (default: PyTorch's choice)")
+    args = parser.parse_args()
+
+    if args.csv:
+        queries = pd.read_csv(args.csv)[args.text_column].astype(str).head(args.queries).tolist()
+    else:
+        queries = make_queries(args.queries)
+
+    classifier = TaxIntentClassifier(args.model_path, backend=args.backend, num_threads=args.threads)
+    list(classifier.predict_batch(queries[:8]))  # warm-up
+
+    base, expected = throughput(lambda texts: [classifier.predict_intent(text) for text in texts], queries)
+    print(f"{'mode':<10} {'queries/s':>10} {'speedup':>8} {'agree':>7}")
+    print(f"{'per_query':<10} {base:>10.1f} {1:>7.2f}x {1:>7.3f}")
+    for batch_size in args.batch_sizes:
+        rate, predictions = throughput(lambda texts: list(classifier.predict_batch(texts, batch_size)), queries)
+        agree = sum(p["intent"] == e["intent"] for p, e in zip(predictions, expected)) / len(queries)
+        print(f"{f'batch {batch_size}':<10} {rate:>10.1f} {rate / base:>7.2f}x {agree:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+FILE: scripts/bench_kb_backends.py
+DESCRIPTION: Compare TaxKnowledgeBase search backends on one SQLite corpus
+MEASURES (per backend):
+  - cold_s: first construction (index build) on a fresh copy of the database
+  - warm_s: construction when the index already exists (a worker restart)
+  - first_query_s: first search, including any lazy in-memory structures
+  - py_mb: peak Python-side allocations (tracemalloc) for construction plus
+    one query
+  - ms/query: mean latency for single searches and for search_many batches
+Corpora are synthetic, with Zipf-distributed terms.
+Run with: python -m scripts.bench_kb_backends --sizes 10000 100000
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from nlp.tax_knowledge.knowledge_connector import TaxKnowledgeBase, SEARCH_BACKENDS
+
+
+def make_database(path, rng, size, vocab_size, doc_length):
+    """tax_documents table filled with synthetic documents"""
+    words = np.array([f"w{i}" for i in range(vocab_size)])
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE tax_documents (content TEXT)")
+    for start in range(0, size, 10000):
+        count = min(10000, size - start)
+        ids = rng.zipf(1.3, size=(count, doc_length)) % vocab_size
+        conn.executemany("INSERT INTO tax_documents VALUES (?)", [(" ".join(row),) for row in words[ids]])
+    conn.commit()
+    conn.close()
+
+
+def sample_queries(path, rng, count, length=4):
+    """Queries built from document text so they have matches"""
+    conn = sqlite3.connect(path)
+    docs = [row[0] for row in conn.execute(
+        "SELECT content FROM tax_documents ORDER BY random() LIMIT ?", (count,)
+    )]
+    conn.close()
+    return [" ".join(rng.choice(doc.split(), size=length)) for doc in docs]
+
+
+def measure(backend, base_path, workdir, queries, k):
+    path = os.path.join(workdir, f"{backend}.sqlite")
+    shutil.copy(base_path, path)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    kb = TaxKnowledgeBase(path, backend=backend)
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    kb.search(queries[0])
+    first_query = time.perf_counter() - started
+    peak_mb = tracemalloc.get_traced_memory()[1] / 1024**2
+    tracemalloc.stop()
+    del kb
+
+    started = time.perf_counter()
+    kb = TaxKnowledgeBase(path, backend=backend)
+    warm = time.perf_counter() - started
+    kb.search(queries[0])
+
+    started = time.perf_counter()
+    for query in queries:
+        kb.search_many([query], k)
+    single = 1e3 * (time.perf_counter() - started) / len(queries)
+
+    started = time.perf_counter()
+    kb.search_many(queries, k)
+    batch = 1e3 * (time.perf_counter() - started) / len(queries)
+    return cold, warm, first_query, peak_mb, single, batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--vocab", type=int, default=50000)
+    parser.add_argument("--doc-length", type=int, default=80)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"{'docs':>8} {'backend':>8} {'cold_s':>8} {'warm_s':>8} {'first_query_s':>14} "
+          f"{'py_mb':>8} {'single_ms':>10} {'batch_ms':>9}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            base_path = os.path.join(workdir, "base.sqlite")
+            make_database(base_path, rng, size, args.vocab, args.doc_length)
+            queries = sample_queries(base_path, rng, args.queries)
+            for backend in SEARCH_BACKENDS:
+                cold, warm, first_query, peak_mb, single, batch = measure(
+                    backend, base_path, workdir, queries, args.k
+                )
+                print(f"{size:>8} {backend:>8} {cold:>8.2f} {warm:>8.2f} {first_query:>14.2f} "
+                      f"{peak_mb:>8.1f} {single:>10.2f} {batch:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
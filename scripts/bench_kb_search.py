@@ -0,0 +1,119 @@
+"""
+FILE: scripts/bench_kb_search.py
+DESCRIPTION: Knowledge base query latency as the corpus grows
+COMPARES:
+  - legacy: BM25Okapi.get_scores-style loop (per query term, a Python pass
+    over every document) followed by argmax
+  - postings: BM25Index.scores over the SQLite inverted index
+  - sparse: SparseBM25Scorer, one query at a time
+  - sparse_batch: SparseBM25Scorer.search_many, per-query cost in a batch
+Corpora are synthetic, with Zipf-distributed terms.
+Run with: python -m scripts.bench_kb_search --sizes 1000 10000 100000 1000000
+"""
+
+import argparse
+import math
+import sqlite3
+import tempfile
+import time
+import numpy as np
+from nlp.tax_knowledge.bm25_index import BM25Index
+from nlp.tax_knowledge.sparse_scorer import SparseBM25Scorer
+
+
+def make_corpus(rng, size, vocab_size, doc_length):
+    """Documents as token lists drawn from a Zipf distribution"""
+    ids = rng.zipf(1.3, size=size * doc_length) % vocab_size
+    words = np.array([f"w{i}" for i in range(vocab_size)])[ids]
+    return [words[i * doc_length:(i + 1) * doc_length].tolist() for i in range(size)]
+
+
+def make_queries(rng, corpus, count, length=4):
+    """Queries sampled from document text so they have matches"""
+    queries = []
+    for _ in range(count):
+        doc = corpus[rng.integers(len(corpus))]
+        queries.append(" ".join(rng.choice(doc, size=length)))
+    return queries
+
+
+class LegacyBM25:
+    """The scoring loop of rank_bm25.BM25Okapi, which TaxKnowledgeBase used before"""
+
+    def __init__(self, corpus, k1=1.5, b=0.75):
+        self.k1, self.b = k1, b
+        self.doc_freqs = []
+        df = {}
+        for doc in corpus:
+            freqs = {}
+            for word in doc:
+                freqs[word] = freqs.get(word, 0) + 1
+            self.doc_freqs.append(freqs)
+            for word in freqs:
+                df[word] = df.get(word, 0) + 1
+        self.doc_len = np.array([len(doc) for doc in corpus])
+        self.avgdl = self.doc_len.mean()
+        n = len(corpus)
+        self.idf = {word: math.log(1 + (n - freq + 0.5) / (freq + 0.5)) for word, freq in df.items()}
+
+    def get_scores(self, query):
+        score = np.zeros(len(self.doc_freqs))
+        for q in query:
+            q_freq = np.array([doc.get(q, 0) for doc in self.doc_freqs])
+            score += self.idf.get(q, 0) * (q_freq * (self.k1 + 1) / (
+                q_freq + self.k1 * (1 - self.b + self.b * self.doc_len / self.avgdl)))
+        return score
+
+
+def ms_per_query(fn, queries):
+    started = time.perf_counter()
+    fn(queries)
+    return 1e3 * (time.perf_counter() - started) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--vocab", type=int, default=50000)
+    parser.add_argument("--doc-length", type=int, default=80)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--legacy-max", type=int, default=100000,
+                        help="Skip the legacy loop above this corpus size")
+    parser.add_argument("--postings-max", type=int, default=100000,
+                        help="Skip building the SQLite index above this corpus size")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    print(f"{'docs':>8} {'build_s':>8} {'legacy_ms':>10} {'postings_ms':>12} "
+          f"{'sparse_ms':>10} {'batch_ms':>9}")
+    for size in args.sizes:
+        corpus = make_corpus(rng, size, args.vocab, args.doc_length)
+        queries = make_queries(rng, corpus, args.queries)
+
+        started = time.perf_counter()
+        scorer = SparseBM25Scorer.from_corpus(enumerate(corpus, 1))
+        build_s = time.perf_counter() - started
+
+        sparse = ms_per_query(lambda qs: [scorer.search(q, args.k) for q in qs], queries)
+        batch = ms_per_query(lambda qs: scorer.search_many(qs, args.k), queries)
+
+        legacy = f"{'skipped':>10}"
+        if size <= args.legacy_max:
+            bm25 = LegacyBM25(corpus)
+            legacy = f"{ms_per_query(lambda qs: [bm25.get_scores(q.split()).argmax() for q in qs], queries):>10.2f}"
+
+        postings = f"{'skipped':>12}"
+        if size <= args.postings_max:
+            with tempfile.NamedTemporaryFile(suffix=".sqlite") as f:
+                conn = sqlite3.connect(f.name)
+                index = BM25Index(lambda: conn)
+                index.add_many((doc_id, " ".join(doc)) for doc_id, doc in enumerate(corpus, 1))
+                postings = f"{ms_per_query(lambda qs: [index.search(q, args.k) for q in qs], queries):>12.2f}"
+                conn.close()
+
+        print(f"{size:>8} {build_s:>8.1f} {legacy} {postings} {sparse:>10.2f} {batch:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+FILE: scripts/bench_ner.py
+DESCRIPTION: Throughput and peak memory of spaCy entity extraction
+COMPARES:
+  - per_call: the original path, full en_core_web_sm pipeline (tagger, parser,
+    lemmatizer...) and one nlp(text) call per query
+  - batch: TaxEntityRecognizer.extract_entities_batch, pruned pipeline and nlp.pipe
+  - batch_no_rules: the same with the rule fast path disabled, so every query
+    reaches spaCy (the templates below all carry structured entities)
+Each mode runs in a fresh process so peak RSS (ru_maxrss) covers model load
+plus extraction.
+Run with: python -m scripts.bench_ner --queries 5000 --batch-size 128 --n-process 1 2
+"""
+
+import argparse
+import multiprocessing
+import random
+import resource
+import sys
+import time
+
+TEMPLATES = [
+    "I need help filing my VAT3 return for PIN A{pin}K before the deadline",
+    "Nimekosa deadline ya P9A kwa PIN A{pin}K",
+    "How do I pay KES {amount} PAYE penalty through M-Pesa?",
+    "Nilipe {amount} shillings kwa kodi ya IT1 mwaka huu",
+    "Kenya Revenue Authority sent me a notice about withholding tax in Nairobi"
+]
+
+
+def make_queries(count, seed=42):
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(pin=rng.randint(10**8, 10**9 - 1), amount=rng.randint(100, 500000))
+        for _ in range(count)
+    ]
+
+
+def run_per_call(queries, _batch_size, _n_process):
+    """The original extract_entities: full pipeline, ruler appended, one call per text"""
+    import re
+    import spacy
+    nlp = spacy.load("en_core_web_sm")
+    sw_nlp = spacy.blank("xx")
+    nlp.add_pipe("entity_ruler").add_patterns([
+        {"label": "KRA_PIN", "pattern": [{"TEXT": {"REGEX": r"^[A-Z]\d{9}[A-Z]$"}}]},
+        {"label": "TAX_FORM", "pattern": [{"TEXT": {"REGEX": r"^(P9A|IT1|VAT3)$"}}]}
+    ])
+    started = time.perf_counter()
+    for text in queries:
+        doc = nlp(text) if any(char.isascii() for char in text[:10]) else sw_nlp(text)
+        [ent.text for ent in doc.ents]
+        re.findall(r"KES\s?\d+|\d+\s?(?:shillings|bob)", text)
+    return time.perf_counter() - started
+
+
+def run_batch(queries, batch_size, n_process, fast_path=True):
+    from nlp.entity_recognition.train_ner import TaxEntityRecognizer
+    recognizer = TaxEntityRecognizer()
+    if not fast_path:
+        recognizer.rules.fast_path = lambda text, raw_text=None: None
+    started = time.perf_counter()
+    recognizer.extract_entities_batch(queries, batch_size=batch_size, n_process=n_process)
+    return time.perf_counter() - started
+
+
+def run_batch_no_rules(queries, batch_size, n_process):
+    return run_batch(queries, batch_size, n_process, fast_path=False)
+
+
+MODES = {"per_call": run_per_call, "batch": run_batch, "batch_no_rules": run_batch_no_rules}
+
+
+def worker(mode, queries, batch_size, n_process, results):
+    elapsed = MODES[mode](queries, batch_size, n_process)
+    # ru_maxrss is KB on Linux, bytes on macOS; children of nlp.pipe are not counted
+    scale = 1 if sys.platform == "darwin" else 1024
+    results.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1024**2))
+
+
+def measure(mode, queries, batch_size, n_process):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=worker, args=(mode, queries, batch_size, n_process, results))
+    process.start()
+    elapsed, peak_mb = results.get()
+    process.join()
+    return len(queries) / elapsed, peak_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--n-process", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries)
+    print(f"{'mode':<14} {'n_process':>9} {'docs/s':>10} {'peak_rss_mb':>12}")
+    docs_per_s, peak_mb = measure("per_call", queries, args.batch_size, 1)
+    print(f"{'per_call':<14} {1:>9} {docs_per_s:>10.0f} {peak_mb:>12.1f}")
+    for mode in ("batch", "batch_no_rules"):
+        for n_process in args.n_process:
+            docs_per_s, peak_mb = measure(mode, queries, args.batch_size, n_process)
+            print(f"{mode:<14} {n_process:>9} {docs_per_s:>10.0f} {peak_mb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+FILE: scripts/bench_normalizer.py
+DESCRIPTION: Per-character cost of query normalization as the glossary grows
+COMPARES:
+  - legacy: loop over every term with str.replace, then a regex (the original
+    TaxNLP._normalize_text)
+  - compiled: GlossaryNormalizer's first-word dictionary lookup
+Run with: python -m scripts.bench_normalizer
+"""
+
+import argparse
+import random
+import re
+import string
+import time
+from nlp.normalizer import GlossaryNormalizer
+
+
+def random_word(rng, low=3, high=10):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+
+def make_glossary(rng, size):
+    """Synthetic glossary of one- to three-word terms"""
+    terms = {}
+    while len(terms) < size:
+        term = " ".join(random_word(rng) for _ in range(rng.randint(1, 3)))
+        terms[term] = term.upper().replace(" ", "_")
+    return terms
+
+
+def make_queries(rng, terms, count, words=20):
+    """Queries of random words with a few glossary terms mixed in"""
+    term_list = list(terms)
+    queries = []
+    for _ in range(count):
+        tokens = [random_word(rng) for _ in range(words)]
+        for _ in range(3):
+            tokens.insert(rng.randrange(len(tokens)), rng.choice(term_list))
+        queries.append(" ".join(tokens) + "?")
+    return queries
+
+
+def legacy_normalize(text, terms):
+    """The original loop-and-replace implementation"""
+    text = text.lower()
+    for term, standard in terms.items():
+        text = text.replace(term.lower(), standard)
+    return re.sub(r"[^\w\s]", "", text)
+
+
+def time_per_char(fn, queries, repeat=1):
+    """Best of repeat passes, so scheduler noise does not inflate the figure"""
+    chars = sum(len(query) for query in queries)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for query in queries:
+            fn(query)
+        best = min(best, time.perf_counter() - started)
+    return 1e9 * best / chars
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000, 20000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5, help="Report the best of N passes")
+    parser.add_argument("--legacy-max", type=int, default=5000,
+                        help="Skip the legacy loop above this glossary size")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'terms':>7} {'compile_s':>10} {'compiled_ns/char':>17} {'legacy_ns/char':>15}")
+    for size in args.sizes:
+        terms = make_glossary(rng, size)
+        queries = make_queries(rng, terms, args.queries)
+
+        started = time.perf_counter()
+        normalizer = GlossaryNormalizer({"*": terms})
+        compile_s = time.perf_counter() - started
+
+        compiled = time_per_char(lambda q: normalizer.normalize(q, "sw"), queries, args.repeat)
+        legacy = (
+            f"{time_per_char(lambda q: legacy_normalize(q, terms), queries):>15.1f}"
+            if size <= args.legacy_max else f"{'skipped':>15}"
+        )
+        print(f"{size:>7} {compile_s:>10.2f} {compiled:>17.1f} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+FILE: scripts/bench_worker_memory.py
+DESCRIPTION: Benchmark per-worker memory with and without shared model weights
+METHOD:
+  - Starts gunicorn (deployment/gunicorn.conf.py) with N workers, once with
+    KRA_SHARE_MODELS=0 (every worker loads its own models) and once with
+    KRA_SHARE_MODELS=1 (models loaded in the master, shared copy-on-write)
+  - Waits for /readyz, sends a few /assist requests so every worker has run
+    inference, then samples each worker's RSS, PSS and USS
+  - USS (memory unique to one process) is the incremental cost of a worker;
+    workers-per-GB is 1024 / mean worker USS in MB
+Run with: python -m scripts.bench_worker_memory --workers 4
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import psutil
+import requests
+
+QUERY = "Nahitaji msaada na malipo ya VAT"
+
+
+def wait_ready(base_url, timeout):
+    """Poll /readyz until every model is warm"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/readyz", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(1)
+    raise TimeoutError(f"Server at {base_url} not ready after {timeout}s")
+
+
+def measure(share_models, workers, port, ready_timeout, warm_requests):
+    """
+    Start the server in one mode and sample worker memory
+    :return: Per-worker memory figures in MB
+    """
+    env = dict(os.environ, KRA_SHARE_MODELS="1" if share_models else "0",
+               WEB_CONCURRENCY=str(workers), PORT=str(port))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "deployment/gunicorn.conf.py", "api.main:app"],
+        env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(base_url, ready_timeout)
+        for idx in range(warm_requests):
+            # Distinct texts, so the query cache cannot answer instead of the models
+            requests.post(f"{base_url}/assist", json={"query": f"{QUERY} {idx}", "language": "sw"},
+                          headers={"X-API-KEY": "VALID_API_KEY"}, timeout=30)
+
+        master = psutil.Process(server.pid)
+        samples = []
+        for worker in master.children():
+            info = worker.memory_full_info()
+            samples.append({
+                "rss": info.rss / 1024**2,
+                "pss": getattr(info, "pss", 0) / 1024**2,
+                "uss": info.uss / 1024**2
+            })
+        return {
+            "master_rss": master.memory_info().rss / 1024**2,
+            "workers": samples
+        }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+def summarize(label, result):
+    workers = result["workers"]
+    mean = {key: sum(w[key] for w in workers) / len(workers) for key in ("rss", "pss", "uss")}
+    print(
+        f"{label:<8} workers={len(workers):<3} master_rss={result['master_rss']:>8.1f}MB "
+        f"rss={mean['rss']:>8.1f}MB pss={mean['pss']:>8.1f}MB uss={mean['uss']:>8.1f}MB "
+        f"workers/GB={1024 / mean['uss']:>6.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--ready-timeout", type=int, default=600)
+    parser.add_argument("--warm-requests", type=int, default=32)
+    args = parser.parse_args()
+
+    for label, share_models in (("private", False), ("shared", True)):
+        result = measure(share_models, args.workers, args.port, args.ready_timeout, args.warm_requests)
+        summarize(label, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+FILE: scripts/build_dense_index.py
+DESCRIPTION: Offline build of the knowledge base dense retrieval index
+STEPS:
+  - Stream tax_documents from SQLite in chunks and embed them with a local
+    encoder (the intent classifier's XLM-R weights by default)
+  - Train the IVF coarse quantizer and write the float16 memory-mapped index
+  - Report recall@k of the IVF search against exact search on sample queries
+Run with: python -m scripts.build_dense_index --nlist 256
+Then: TaxKnowledgeBase(dense_index_path=..., encoder=DenseEncoder(...))
+"""
+
+import argparse
+import sqlite3
+import time
+import numpy as np
+from nlp.tax_knowledge.dense_encoder import DenseEncoder
+from nlp.tax_knowledge.dense_index import DenseIndex, normalize_rows
+
+
+def embed_documents(db_path, encoder, chunk_size, batch_size):
+    """Embeddings and rowids of every document, read chunk by chunk"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.execute("SELECT rowid, content FROM tax_documents ORDER BY rowid")
+    doc_ids, embeddings = [], []
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        doc_ids.extend(row[0] for row in rows)
+        embeddings.append(encoder.encode([row[1] for row in rows], batch_size=batch_size))
+        print(f"embedded {len(doc_ids)} documents")
+    conn.close()
+    return np.concatenate(embeddings), np.array(doc_ids, dtype=np.int64)
+
+
+def recall_at_k(index, embeddings, doc_ids, samples, k, rng):
+    """Share of exact top-k neighbours the IVF search also returns"""
+    vectors = normalize_rows(embeddings)
+    queries = vectors[rng.choice(len(vectors), min(samples, len(vectors)), replace=False)]
+    found = 0
+    for query, hits in zip(queries, index.search_many(queries, k)):
+        exact = set(doc_ids[np.argsort(-(vectors @ query))[:k]].tolist())
+        found += len(exact & {doc_id for doc_id, _ in hits})
+    return found / (len(queries) * k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-path", default="nlp/tax_knowledge/tax_db.sqlite")
+    parser.add_argument("--model-path", default="models/nlp/intent_classifier")
+    parser.add_argument("--output", default="nlp/tax_knowledge/dense_index")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF clusters (default: sqrt(documents))")
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--recall-samples", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    encoder = DenseEncoder(args.model_path)
+    started = time.perf_counter()
+    embeddings, doc_ids = embed_documents(args.db_path, encoder, args.chunk_size, args.batch_size)
+    print(f"embedding took {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    DenseIndex.build(args.output, embeddings, doc_ids, nlist=args.nlist, encoder=args.model_path)
+    index = DenseIndex(args.output, nprobe=args.nprobe)
+    print(f"index of {len(index)} documents in {index.meta['nlist']} clusters "
+          f"built in {time.perf_counter() - started:.1f}s -> {args.output}")
+
+    recall = recall_at_k(index, embeddings, doc_ids, args.recall_samples, args.k, np.random.default_rng(0))
+    print(f"recall@{args.k} with nprobe={args.nprobe}: {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+FILE: scripts/build_language_model.py
+DESCRIPTION: Build the language identification model (vocabularies and character n-grams)
+STEPS:
+  - Read one-text-per-line corpora (lines starting with # are comments),
+    by default nlp/resources/langid/{sw,en}.txt
+  - Keep each language's own vocabulary, fit per-language n-gram log
+    probabilities and write the compact JSON model
+  - Report accuracy on the training texts and on synthetic code-switched texts
+Run with: python -m scripts.build_language_model
+Add --corpus xx=path.txt to extend or replace a language's corpus.
+"""
+
+import argparse
+import json
+import os
+import random
+from nlp.language_id import DEFAULT_MODEL, MIXED, LanguageIdentifier, train
+
+DEFAULT_CORPORA = {"sw": "nlp/resources/langid/sw.txt", "en": "nlp/resources/langid/en.txt"}
+
+
+def read_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def code_switched(rng, sw_texts, en_texts, count):
+    """Swahili sentence with an English clause appended, and vice versa"""
+    texts = []
+    for _ in range(count):
+        sw, en = rng.choice(sw_texts).split(), rng.choice(en_texts).split()
+        texts.append(" ".join(sw[:len(sw) // 2 + 1] + en[len(en) // 2:]))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", action="append", default=[], metavar="LANG=PATH")
+    parser.add_argument("--output", default=DEFAULT_MODEL)
+    parser.add_argument("--max-n", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=3000)
+    parser.add_argument("--top-words", type=int, default=2000)
+    args = parser.parse_args()
+
+    paths = dict(DEFAULT_CORPORA)
+    paths.update(spec.split("=", 1) for spec in args.corpus)
+    corpora = {language: read_corpus(path) for language, path in paths.items()}
+
+    model = train(corpora, max_n=args.max_n, top_k=args.top_k, top_words=args.top_words)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(model, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    print(f"wrote {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")
+
+    identifier = LanguageIdentifier(model)
+    for language, texts in corpora.items():
+        correct = sum(identifier.identify(text) == language for text in texts)
+        print(f"{language}: {correct}/{len(texts)} training texts identified")
+    if {"sw", "en"} <= set(corpora):
+        mixed = code_switched(random.Random(0), corpora["sw"], corpora["en"], 200)
+        correct = sum(identifier.identify(text) == MIXED for text in mixed)
+        print(f"{MIXED}: {correct}/{len(mixed)} synthetic code-switched texts identified")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+FILE: scripts/export_intent_model.py
+DESCRIPTION: Export the intent classifier or NER model for ONNX Runtime and verify optimized backends
+FEATURES:
+  - ONNX export (optionally int8-quantized) next to the PyTorch weights
+  - --task sequence-classification (intent, default): accuracy delta and
+    speed-up of each backend against eager PyTorch on a held-out labelled set
+  - --task token-classification (NER): per-token label agreement with eager
+    PyTorch and speed-up on the held-out texts
+"""
+
+import argparse
+import time
+import pandas as pd
+from nlp.inference_backends import BACKENDS, TASKS, export_onnx, load_model, load_tokenizer
+from nlp.intent_classification.train_classifier import TaxIntentClassifier
+
+DEFAULT_MODEL_PATHS = {
+    "sequence-classification": "models/nlp/intent_classifier",
+    "token-classification": "models/nlp/entity_recognizer"
+}
+
+
+def evaluate_backend(model_path, backend, texts, labels):
+    """
+    Score one backend on the held-out set
+    :return: Accuracy, mean latency (ms) and predictions
+    """
+    classifier = TaxIntentClassifier(model_path, backend=backend)
+    classifier.predict_intent(texts[0])  # warm-up
+
+    predictions = []
+    started = time.perf_counter()
+    for text in texts:
+        predictions.append(classifier.predict_intent(text)['intent'])
+    elapsed = time.perf_counter() - started
+
+    accuracy = sum(p == y for p, y in zip(predictions, labels)) / len(labels)
+    return accuracy, 1000 * elapsed / len(texts), predictions
+
+
+def evaluate_token_backend(model_path, backend, texts):
+    """
+    Run one backend of a token-classification model over the held-out texts
+    :return: Mean latency (ms) and per-text token label ids
+    """
+    model = load_model(model_path, "token-classification", backend)
+    tokenizer = load_tokenizer(model_path)
+
+    def predict(text):
+        inputs = tokenizer(text, return_tensors="pt", truncation=True)
+        return model(**inputs).logits.argmax(-1)[0].tolist()
+
+    predict(texts[0])  # warm-up
+    started = time.perf_counter()
+    predictions = [predict(text) for text in texts]
+    return 1000 * (time.perf_counter() - started) / len(texts), predictions
+
+
+def verify_tokens(model_path, heldout_csv, backends, text_column="text", limit=None):
+    """
+    Compare optimized NER backends with the eager model; no labels needed
+    :return: Report rows, one per backend
+    """
+    heldout = pd.read_csv(heldout_csv)
+    if limit:
+        heldout = heldout.head(limit)
+    texts = heldout[text_column].astype(str).tolist()
+
+    base_latency, base_predictions = evaluate_token_backend(model_path, "eager", texts)
+    total_tokens = sum(len(tokens) for tokens in base_predictions)
+    report = [{"backend": "eager", "agreement": 1.0, "latency_ms": base_latency, "speedup": 1.0}]
+    for backend in backends:
+        if backend == "eager":
+            continue
+        latency, predictions = evaluate_token_backend(model_path, backend, texts)
+        agreeing = sum(
+            p == q for tokens, base in zip(predictions, base_predictions) for p, q in zip(tokens, base)
+        )
+        report.append({
+            "backend": backend,
+            "agreement": agreeing / total_tokens,
+            "latency_ms": latency,
+            "speedup": base_latency / latency
+        })
+    return report
+
+
+def verify(model_path, heldout_csv, backends, text_column="text", label_column="intent", limit=None):
+    """
+    Compare optimized backends with the eager model
+    :return: Report rows, one per backend
+    """
+    heldout = pd.read_csv(heldout_csv)
+    if limit:
+        heldout = heldout.head(limit)
+    texts = heldout[text_column].astype(str).tolist()
+    labels = heldout[label_column].tolist()
+
+    base_accuracy, base_latency, base_predictions = evaluate_backend(model_path, "eager", texts, labels)
+    report = [{
+        "backend": "eager",
+        "accuracy": base_accuracy,
+        "accuracy_delta": 0.0,
+        "agreement": 1.0,
+        "latency_ms": base_latency,
+        "speedup": 1.0
+    }]
+
+    for backend in backends:
+        if backend == "eager":
+            continue
+        accuracy, latency, predictions = evaluate_backend(model_path, backend, texts, labels)
+        report.append({
+            "backend": backend,
+            "accuracy": accuracy,
+            "accuracy_delta": accuracy - base_accuracy,
+            "agreement": sum(p == q for p, q in zip(predictions, base_predictions)) / len(texts),
+            "latency_ms": latency,
+            "speedup": base_latency / latency
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--task", default="sequence-classification", choices=TASKS,
+                        help="sequence-classification for the intent model, token-classification for NER")
+    parser.add_argument("--model-path", help="Default: the served model for --task")
+    parser.add_argument("--heldout", default="nlp/feedback/heldout.csv",
+                        help="CSV with a text column (and an intent column for sequence-classification)")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--label-column", default="intent")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--quantize-onnx", action="store_true",
+                        help="Apply ONNX Runtime dynamic int8 quantization to the export")
+    parser.add_argument("--skip-export", action="store_true")
+    parser.add_argument("--limit", type=int, help="Only use the first N held-out rows")
+    args = parser.parse_args()
+    model_path = args.model_path or DEFAULT_MODEL_PATHS[args.task]
+
+    if "onnx" in args.backends and not args.skip_export:
+        exported = export_onnx(model_path, args.task, quantize=args.quantize_onnx)
+        print(f"Exported ONNX graph to {exported}")
+
+    if args.task == "token-classification":
+        report = verify_tokens(model_path, args.heldout, args.backends,
+                               text_column=args.text_column, limit=args.limit)
+        print(f"{'backend':<8} {'agree':>7} {'ms/query':>9} {'speedup':>8}")
+        for row in report:
+            print(f"{row['backend']:<8} {row['agreement']:>7.3f} {row['latency_ms']:>9.2f} {row['speedup']:>7.2f}x")
+        return
+
+    report = verify(
+        model_path,
+        args.heldout,
+        args.backends,
+        text_column=args.text_column,
+        label_column=args.label_column,
+        limit=args.limit
+    )
+
+    print(f"{'backend':<8} {'accuracy':>9} {'delta':>8} {'agree':>7} {'ms/query':>9} {'speedup':>8}")
+    for row in report:
+        print(
+            f"{row['backend']:<8} {row['accuracy']:>9.4f} {row['accuracy_delta']:>+8.4f} "
+            f"{row['agreement']:>7.3f} {row['latency_ms']:>9.2f} {row['speedup']:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
+
+# Usage:
+# python -m scripts.export_intent_model --heldout nlp/feedback/heldout.csv --quantize-onnx
+# python -m scripts.export_intent_model --task token-classification --quantize-onnx
@@ -0,0 +1,95 @@
+"""
+FILE: scripts/train_intent_cascade.py
+DESCRIPTION: Train the linear first tier of the intent cascade and pick its threshold
+STEPS:
+  - Fit the hashed n-gram classifier on the same labelled CSV as XLM-RoBERTa
+    and save it to nlp_serving.intent_cascade.model_path
+  - Score both tiers one query at a time on a held-out set (serving latency)
+  - For each candidate threshold report the traffic share each tier serves,
+    cascade accuracy and expected latency against the transformer alone
+Run with: python -m scripts.train_intent_cascade --thresholds 0.7 0.8 0.9 0.95
+"""
+
+import argparse
+import time
+import pandas as pd
+from nlp.intent_classification.linear_classifier import DEFAULT_MODEL_PATH, HashedIntentClassifier
+from nlp.intent_classification.train_classifier import TaxIntentClassifier
+
+
+def timed_predictions(predict, texts):
+    """Predictions and mean milliseconds per query"""
+    started = time.perf_counter()
+    predictions = [predict(text) for text in texts]
+    return predictions, 1000 * (time.perf_counter() - started) / len(texts)
+
+
+def threshold_report(linear, transformer, labels, linear_ms, transformer_ms, thresholds):
+    """
+    Cascade outcome per threshold, from both tiers' held-out predictions
+    :return: Report rows
+    """
+    rows = []
+    for threshold in thresholds:
+        kept = [p["confidence"] >= threshold for p in linear]
+        final = [l["intent"] if keep else t["intent"] for l, t, keep in zip(linear, transformer, kept)]
+        linear_share = sum(kept) / len(kept)
+        latency = linear_ms + (1 - linear_share) * transformer_ms
+        rows.append({
+            "threshold": threshold,
+            "linear_share": linear_share,
+            "accuracy": sum(p == y for p, y in zip(final, labels)) / len(labels),
+            "linear_accuracy": (
+                sum(l["intent"] == y for l, y, keep in zip(linear, labels, kept) if keep) / sum(kept)
+                if any(kept) else float("nan")
+            ),
+            "latency_ms": latency,
+            "speedup": transformer_ms / latency
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--train", default="nlp/feedback/labeled_data.csv")
+    parser.add_argument("--heldout", default="nlp/feedback/heldout.csv")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--label-column", default="intent")
+    parser.add_argument("--output", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--model-path", default="models/nlp/intent_classifier", help="Transformer tier")
+    parser.add_argument("--backend", default="eager")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.7, 0.8, 0.9, 0.95, 0.99])
+    args = parser.parse_args()
+
+    train = pd.read_csv(args.train)
+    linear = HashedIntentClassifier().fit(train[args.text_column].astype(str), train[args.label_column])
+    linear.save(args.output)
+    print(f"Saved linear tier ({len(train)} training queries) to {args.output}")
+
+    heldout = pd.read_csv(args.heldout)
+    texts = heldout[args.text_column].astype(str).tolist()
+    labels = heldout[args.label_column].tolist()
+
+    transformer = TaxIntentClassifier(args.model_path, backend=args.backend)
+    transformer.predict_intent(texts[0])  # warm-up
+    linear_predictions, linear_ms = timed_predictions(linear.predict_intent, texts)
+    transformer_predictions, transformer_ms = timed_predictions(transformer.predict_intent, texts)
+
+    transformer_accuracy = sum(p["intent"] == y for p, y in zip(transformer_predictions, labels)) / len(labels)
+    print(f"transformer only: accuracy {transformer_accuracy:.4f}, {transformer_ms:.2f} ms/query")
+    print(f"linear tier:      {linear_ms:.3f} ms/query")
+    print(f"{'threshold':>9} {'linear%':>8} {'xfmr%':>6} {'accuracy':>9} {'delta':>8} "
+          f"{'lin_acc':>8} {'ms/query':>9} {'speedup':>8}")
+    report = threshold_report(
+        linear_predictions, transformer_predictions, labels, linear_ms, transformer_ms, args.thresholds
+    )
+    for row in report:
+        print(
+            f"{row['threshold']:>9.2f} {100 * row['linear_share']:>7.1f}% {100 * (1 - row['linear_share']):>5.1f}% "
+            f"{row['accuracy']:>9.4f} {row['accuracy'] - transformer_accuracy:>+8.4f} "
+            f"{row['linear_accuracy']:>8.4f} {row['latency_ms']:>9.2f} {row['speedup']:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
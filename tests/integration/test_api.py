@@ -0,0 +1,203 @@
+"""
+FILE: tests/integration/test_api.py
+DESCRIPTION: Tests for the FastAPI service's health and readiness endpoints
+"""
+
+import json
+import os
+import threading
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+from nlp.model_registry import ModelRegistry
+
+# api.main configures file logging under logs/ at import
+os.makedirs("logs", exist_ok=True)
+from api import main
+
+@pytest.fixture
+def client():
+    # Without the context manager startup hooks do not run, so nothing real is loaded
+    return TestClient(main.app)
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Stub models behind the service; 'ner' only finishes loading once released"""
+    release = threading.Event()
+
+    def load_ner():
+        release.wait(5)
+        return "ner-model"
+
+    registry = ModelRegistry({"classifier": lambda: "classifier-model", "ner": load_ner})
+    registry.release = release
+    monkeypatch.setattr(main, "nlp_processor", SimpleNamespace(model_status=registry.status))
+    monkeypatch.setattr(main, "loading_config", {"preload": True})
+    return registry
+
+def test_healthz_is_ok_while_models_load(client, registry):
+    response = client.get("/healthz")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert {name: model["state"] for name, model in body["models"].items()} == {
+        "classifier": "pending", "ner": "pending"
+    }
+
+def test_readyz_waits_for_every_model(client, registry):
+    registry.load("classifier")
+    loading = threading.Thread(target=registry.load, args=("ner",))
+    loading.start()
+    try:
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+        assert response.json()["models"]["ner"]["state"] == "loading"
+    finally:
+        registry.release.set()
+        loading.join()
+
+    response = client.get("/readyz")
+    assert response.status_code == 200 and response.json()["ready"] is True
+
+def test_readyz_reports_failed_models(client, registry, monkeypatch):
+    failing = ModelRegistry({"classifier": lambda: "classifier-model", "ner": lambda: 1 / 0})
+    failing.load_all()
+    monkeypatch.setattr(main, "nlp_processor", SimpleNamespace(model_status=failing.status))
+
+    response = client.get("/readyz")
+    assert response.status_code == 503
+    assert "division by zero" in response.json()["models"]["ner"]["error"]
+
+def test_readyz_is_ready_in_lazy_mode(client, registry, monkeypatch):
+    monkeypatch.setattr(main, "loading_config", {"preload": False})
+    assert client.get("/readyz").status_code == 200
+
+@pytest.mark.parametrize("language", ["fr", "x" * 200, None])
+def test_assist_rejects_unknown_languages(client, language):
+    response = client.post(
+        "/assist",
+        json={"query": "Muda wa VAT ni lini?", "language": language},
+        headers={"X-API-KEY": "VALID_API_KEY"}
+    )
+    assert response.status_code == 422
+
+def test_readyz_waits_for_warm_up_with_shared_models(client, registry, monkeypatch):
+    registry.release.set()
+    registry.load_all()
+    warmed_up = threading.Event()
+    monkeypatch.setattr(main, "SHARE_MODELS", True)
+    monkeypatch.setattr(main, "models_warmed_up", warmed_up)
+
+    assert client.get("/readyz").status_code == 503
+    warmed_up.set()
+    assert client.get("/readyz").status_code == 200
+
+def test_failed_warm_up_leaves_the_worker_unready(registry, monkeypatch):
+    def warm_up():
+        raise RuntimeError("out of memory")
+    warmed_up = threading.Event()
+    monkeypatch.setattr(main, "nlp_processor", SimpleNamespace(warm_up=warm_up))
+    monkeypatch.setattr(main, "models_warmed_up", warmed_up)
+
+    main.warm_up_shared_models()
+    assert not warmed_up.is_set()
+    monkeypatch.setattr(main, "nlp_processor", SimpleNamespace(warm_up=lambda: None))
+    main.warm_up_shared_models()
+    assert warmed_up.is_set()
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Records /assist batches; the batcher is bypassed so requests go straight to the executor"""
+    batches = []
+    monkeypatch.setattr(main, "process_batch", lambda queries, languages, fields: batches.append(queries) or [
+        {"intent": "deadline_query"} for _ in queries
+    ])
+    monkeypatch.setattr(main, "query_batcher", None)
+    return batches
+
+def test_assist_sheds_load_with_retry_after(client, pipeline, monkeypatch):
+    executor = main.inference_executor
+    monkeypatch.setattr(executor, "_in_flight", executor.max_pending)
+    monkeypatch.setattr(executor, "retry_after", 3)
+
+    response = client.post("/assist", json={"query": "Muda wa VAT?"}, headers={"X-API-KEY": "VALID_API_KEY"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert pipeline == []
+
+def test_assist_times_out_past_its_deadline(client, pipeline, monkeypatch):
+    monkeypatch.setattr(main, "REQUEST_TIMEOUT_S", -1)
+
+    response = client.post("/assist", json={"query": "Muda wa VAT?"}, headers={"X-API-KEY": "VALID_API_KEY"})
+    assert response.status_code == 504
+    assert pipeline == []
+    assert main.inference_executor._in_flight == 0
+
+def test_assist_answers_within_its_deadline(client, pipeline):
+    response = client.post("/assist", json={"query": "Muda wa VAT?"}, headers={"X-API-KEY": "VALID_API_KEY"})
+    assert response.status_code == 200
+    assert response.json()["data"] == {"intent": "deadline_query"}
+    assert pipeline == [["Muda wa VAT?"]]
+
+def post_batch(client, body, content_type):
+    response = client.post(
+        "/assist/batch", content=body,
+        headers={"X-API-KEY": "VALID_API_KEY", "Content-Type": content_type}
+    )
+    lines = [json.loads(line) for line in response.text.splitlines()] if response.status_code == 200 else None
+    return response, lines
+
+def test_batch_streams_ndjson_in_input_order_across_chunks(client, pipeline, monkeypatch):
+    monkeypatch.setitem(main.bulk_config, "chunk_size", 2)
+    body = "\n".join(json.dumps({"query": f"swali {idx}", "user_id": str(idx)}) for idx in range(5)) + "\n\n"
+
+    response, lines = post_batch(client, body, "application/x-ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [line["index"] for line in lines] == [0, 1, 2, 3, 4]
+    assert [line["metadata"]["user_id"] for line in lines] == ["0", "1", "2", "3", "4"]
+    assert all(line["success"] for line in lines)
+    assert pipeline == [["swali 0", "swali 1"], ["swali 2", "swali 3"], ["swali 4"]]
+    assert main.inference_executor._in_flight == 0
+
+def test_batch_reports_bad_lines_without_dropping_the_rest(client, pipeline):
+    body = "\n".join([
+        json.dumps({"query": "swali 0"}),
+        "not json",
+        json.dumps({"query": "swali 2", "language": "fr"}),
+        json.dumps({"query": "swali 3"})
+    ])
+
+    response, lines = post_batch(client, body, "application/x-ndjson")
+    assert [(line["index"], line["success"]) for line in lines] == [(0, True), (1, False), (2, False), (3, True)]
+    assert "language" in json.dumps(lines[2]["error"])
+    assert pipeline == [["swali 0"], ["swali 3"]]
+
+def test_batch_accepts_a_json_array(client, pipeline):
+    body = json.dumps([{"query": "swali 0"}, {"query": "swali 1"}])
+    response, lines = post_batch(client, body, "application/json")
+    assert [line["index"] for line in lines] == [0, 1]
+
+def test_batch_caps_json_arrays(client, pipeline, monkeypatch):
+    monkeypatch.setitem(main.bulk_config, "max_json_bytes", 64)
+    body = json.dumps([{"query": f"swali {idx}"} for idx in range(10)])
+
+    response, _ = post_batch(client, body, "application/json")
+    assert response.status_code == 413
+    assert "NDJSON" in response.json()["detail"]
+    assert pipeline == []
+
+def test_batch_sheds_load_before_streaming(client, pipeline, monkeypatch):
+    executor = main.inference_executor
+    monkeypatch.setattr(executor, "_in_flight", executor.max_pending)
+
+    response, _ = post_batch(client, json.dumps({"query": "swali"}), "application/x-ndjson")
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert pipeline == []
+    assert executor._in_flight == executor.max_pending
@@ -0,0 +1,109 @@
+"""
+FILE: tests/integration/test_batch_scoring.py
+DESCRIPTION: FraudDetector feature pipeline and chunked, multi-process scoring
+"""
+
+import copy
+import numpy as np
+import pandas as pd
+import pytest
+pytest.importorskip("sklearn")
+from models.fraud_detection.batch_scoring import score_file
+from models.fraud_detection.model import COMPILED_MAX_ROWS, FEATURES, FraudDetector
+
+@pytest.fixture(scope="module")
+def fitted(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.lognormal(10, 1, size=(2000, len(FEATURES))), columns=FEATURES)
+    frame.insert(0, "kra_pin", [f"A{i:09d}K" for i in range(len(frame))])
+
+    directory = tmp_path_factory.mktemp("fraud")
+    detector = FraudDetector()
+    detector.model.fit(detector.preprocess_data(frame))
+    detector.is_trained = True
+    model_path = str(directory / "detector.joblib")
+    detector.save(model_path)
+    return detector, frame, model_path, directory
+
+def test_predict_returns_numpy(fitted):
+    detector, frame, _, _ = fitted
+    X = detector.transform(frame)
+    labels, scores = detector.score(X)
+    assert isinstance(labels, np.ndarray) and labels.dtype == np.int8
+    np.testing.assert_array_equal(labels, (detector.model.predict(X) == -1).astype(np.int8))
+    np.testing.assert_array_equal(detector.predict(X), labels)
+
+@pytest.mark.parametrize("suffix", ["csv", "parquet"])
+def test_score_file_matches_in_memory(fitted, suffix):
+    if suffix == "parquet":
+        pytest.importorskip("pyarrow")
+    detector, frame, model_path, directory = fitted
+    source = directory / f"input.{suffix}"
+    target = directory / f"scores.{suffix}"
+    if suffix == "csv":
+        frame.to_csv(source, index=False)
+    else:
+        frame.to_parquet(source, index=False)
+
+    summary = score_file(str(source), str(target), model_path, chunk_size=300, n_jobs=2,
+                         id_columns=["kra_pin"], max_pending=2)
+    scored = pd.read_csv(target) if suffix == "csv" else pd.read_parquet(target)
+
+    # CSV round-trips floats through text, so compare scores approximately
+    labels, scores = detector.score(detector.transform(pd.read_csv(source) if suffix == "csv" else frame))
+    assert summary["rows"] == len(frame) and summary["flagged"] == labels.sum()
+    assert scored["kra_pin"].tolist() == frame["kra_pin"].tolist()
+    np.testing.assert_array_equal(scored["fraud_label"].to_numpy(), labels)
+    np.testing.assert_allclose(scored["anomaly_score"].to_numpy(), scores, rtol=1e-12)
+
+def test_inference_never_refits(fitted):
+    detector, frame, model_path, _ = fitted
+    restored = FraudDetector.load(model_path)
+    X = restored.transform(frame.head(3))
+    assert X.dtype == np.float32 and X.flags["C_CONTIGUOUS"]
+    # A one-row batch is scaled with the training statistics, not its own
+    np.testing.assert_array_equal(restored.transform(frame.iloc[[1]]), X[1:2])
+    np.testing.assert_array_equal(restored.transform(frame[FEATURES].to_numpy()[:3]), X)
+
+    record = frame.iloc[1][FEATURES].to_dict()
+    label, score = restored.score_record(record)
+    labels, scores = detector.score(X)
+    assert (label, score) == (labels[1], scores[1])
+
+def test_load_rejects_other_pipeline_versions(fitted, tmp_path):
+    detector, _, model_path, _ = fitted
+    stale = FraudDetector.load(model_path)
+    stale.features.version = 0
+    stale.save(str(tmp_path / "stale.joblib"))
+    with pytest.raises(ValueError, match="feature pipeline version"):
+        FraudDetector.load(str(tmp_path / "stale.joblib"))
+
+def test_compiled_score_matches_sklearn_either_side_of_cutoff(fitted):
+    detector, frame, _, _ = fitted
+    compiled = copy.deepcopy(detector).compile()
+    calls = []
+    score_samples = compiled.compiled.score_samples
+    compiled.compiled.score_samples = lambda X: calls.append(len(X)) or score_samples(X)
+
+    large = pd.concat([frame] * (COMPILED_MAX_ROWS // len(frame) + 1), ignore_index=True)
+    for batch in (frame.iloc[[7]], large):
+        X = detector.transform(batch)
+        labels, scores = compiled.score(X)
+        expected_labels, expected_scores = detector.score(X)
+        np.testing.assert_array_equal(labels, expected_labels)
+        np.testing.assert_array_equal(scores, expected_scores)
+    # Only the one-row batch went through the node table
+    assert calls == [1] and len(large) > COMPILED_MAX_ROWS
+
+def test_compiled_score_rejects_what_sklearn_rejects(fitted):
+    detector, frame, _, _ = fitted
+    compiled = copy.deepcopy(detector).compile()
+    X = detector.transform(frame.head(2))
+    for bad in (np.where(np.eye(2, len(FEATURES), dtype=bool), np.nan, X), X[:, :2]):
+        try:
+            expected = detector.model.score_samples(bad)
+        except ValueError:
+            with pytest.raises(ValueError):
+                compiled.score(bad)
+        else:
+            np.testing.assert_array_equal(-compiled.score(bad)[1], expected)
@@ -0,0 +1,98 @@
+"""
+FILE: tests/integration/test_batching.py
+DESCRIPTION: Tests for dynamic micro-batching of /assist queries
+"""
+
+import asyncio
+import time
+import pytest
+pytest.importorskip("fastapi")
+from api.batching import QueryBatcher
+from utils.error_handler import InferenceTimeoutError
+
+class RecordingPipeline:
+    """Echoes each query back and remembers the batches it was given"""
+    def __init__(self, fail_on=None, delay=0.0):
+        self.batches = []
+        self.fail_on = fail_on
+        self.delay = delay
+
+    def __call__(self, queries, languages, fields):
+        self.batches.append(list(queries))
+        time.sleep(self.delay)
+        if self.fail_on in queries:
+            raise ValueError(f"cannot process {self.fail_on}")
+        return [{"query": query, "language": language, "fields": query_fields}
+                for query, language, query_fields in zip(queries, languages, fields)]
+
+def run(pipeline, scenario, **options):
+    """Run scenario(batcher) on a fresh event loop with a started QueryBatcher"""
+    async def main():
+        batcher = QueryBatcher(pipeline, **options)
+        await batcher.start()
+        try:
+            return await scenario(batcher)
+        finally:
+            await batcher.stop()
+    return asyncio.run(main())
+
+def test_flushes_full_batches_and_routes_results():
+    pipeline = RecordingPipeline()
+
+    async def submit_eight(batcher):
+        started = time.monotonic()
+        results = await asyncio.gather(*[
+            batcher.submit(f"q{idx}", "sw" if idx % 2 else "en", fields=["intent"] if idx == 5 else None)
+            for idx in range(8)
+        ])
+        return results, time.monotonic() - started
+
+    results, elapsed = run(pipeline, submit_eight, max_batch_size=4, max_wait_ms=10_000)
+    # Full batches go out without waiting for the (long) window to close
+    assert elapsed < 5
+    assert pipeline.batches == [["q0", "q1", "q2", "q3"], ["q4", "q5", "q6", "q7"]]
+    assert [result["query"] for result in results] == [f"q{idx}" for idx in range(8)]
+    assert [result["language"] for result in results] == ["en", "sw"] * 4
+    assert results[5]["fields"] == ["intent"] and results[4]["fields"] is None
+
+def test_flushes_partial_batch_when_window_closes():
+    pipeline = RecordingPipeline()
+
+    async def trickle(batcher):
+        first = asyncio.gather(batcher.submit("a", "sw"), batcher.submit("b", "sw"))
+        results = await first
+        # Arrives after the first window closed, so it gets a batch of its own
+        results.append(await batcher.submit("c", "en"))
+        return results
+
+    results = run(pipeline, trickle, max_batch_size=16, max_wait_ms=30)
+    assert pipeline.batches == [["a", "b"], ["c"]]
+    assert [result["query"] for result in results] == ["a", "b", "c"]
+
+def test_failures_reach_every_caller_in_the_batch():
+    pipeline = RecordingPipeline(fail_on="bad")
+
+    async def mixed(batcher):
+        return await asyncio.gather(
+            batcher.submit("bad", "sw"), batcher.submit("good", "sw"), batcher.submit("later", "sw"),
+            return_exceptions=True
+        )
+
+    failed, sibling, later = run(pipeline, mixed, max_batch_size=2, max_wait_ms=50)
+    assert isinstance(failed, ValueError) and isinstance(sibling, ValueError)
+    assert later["query"] == "later"
+
+def test_deadline_and_stop():
+    pipeline = RecordingPipeline(delay=0.2)
+
+    async def slow(batcher):
+        with pytest.raises(InferenceTimeoutError):
+            await batcher.submit("slow", "sw", deadline=time.time() + 0.05)
+        return await batcher.submit("patient", "sw")
+
+    assert run(pipeline, slow, max_batch_size=1, max_wait_ms=1)["query"] == "patient"
+
+    async def unstarted():
+        await QueryBatcher(pipeline).submit("q", "sw")
+    with pytest.raises(RuntimeError):
+        asyncio.run(unstarted())
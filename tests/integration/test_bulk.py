@@ -0,0 +1,26 @@
+"""
+FILE: tests/integration/test_bulk.py
+DESCRIPTION: Tests for the /assist/batch streaming helpers
+"""
+
+import asyncio
+from api.bulk import iter_ndjson, read_body
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+async def collect(records):
+    return [record async for record in records]
+
+def test_ndjson_lines_may_span_chunks():
+    stream = chunks(b'{"query": "a"}\n{"que', b'ry": "b"}\n\n', b'{"query": "c"}')
+    assert asyncio.run(collect(iter_ndjson(stream))) == [{"query": "a"}, {"query": "b"}, {"query": "c"}]
+
+def test_undecodable_ndjson_lines_come_back_as_text():
+    stream = chunks(b'{"query": "a"}\n{broken\n\xff\n')
+    assert asyncio.run(collect(iter_ndjson(stream))) == [{"query": "a"}, "{broken", "�"]
+
+def test_read_body_stops_past_the_limit():
+    assert asyncio.run(read_body(chunks(b"[1,", b"2]"), 5)) == b"[1,2]"
+    assert asyncio.run(read_body(chunks(b"[1,", b"2,", b"3]"), 5)) is None
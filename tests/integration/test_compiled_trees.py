@@ -0,0 +1,98 @@
+"""
+FILE: tests/integration/test_compiled_trees.py
+DESCRIPTION: Compiled node-table evaluators reproduce IsolationForest and XGBoost scores
+"""
+
+import numpy as np
+import pytest
+pytest.importorskip("sklearn")
+from sklearn.ensemble import IsolationForest
+from models.fraud_detection.compiled_trees import ROW_BLOCK, compile_isolation_forest, compile_xgboost
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    # More rows than one evaluation block, so block joins are covered too
+    X = rng.normal(size=(ROW_BLOCK * 2 + 37, 6))
+    y = (X[:, 0] + X[:, 1] ** 2 > 1).astype(int)
+    return X, y
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"max_features": 0.5},
+    {"max_samples": 64, "contamination": 0.1},
+    {"n_estimators": 7, "max_samples": 2}
+])
+def test_isolation_forest_parity(data, params):
+    X, _ = data
+    forest = IsolationForest(random_state=1, **params).fit(X)
+    compiled = compile_isolation_forest(forest)
+
+    np.testing.assert_array_equal(compiled.score_samples(X), forest.score_samples(X))
+    np.testing.assert_array_equal(compiled.decision_function(X), forest.decision_function(X))
+    np.testing.assert_array_equal(compiled.predict(X), forest.predict(X))
+    # Single rows take a different summation path in NumPy; still identical
+    np.testing.assert_array_equal(compiled.score_samples(X[:1]), forest.score_samples(X[:1]))
+
+@pytest.fixture(scope="module")
+def xgb():
+    return pytest.importorskip("xgboost")
+
+def test_xgboost_classifier_parity(data, xgb):
+    X, y = data
+    X = X.copy()
+    X[np.random.default_rng(1).random(X.shape) < 0.02] = np.nan
+    model = xgb.XGBClassifier(n_estimators=50, max_depth=5).fit(X, y)
+    compiled = compile_xgboost(model)
+
+    np.testing.assert_array_equal(compiled.predict_margin(X), model.predict(X, output_margin=True))
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+    # XGBoost's expf may differ from NumPy's exp by one float32 ulp
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=2e-7, atol=1e-9)
+
+def test_xgboost_regressor_and_pipeline_parity(data, xgb):
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    X, _ = data
+    pipeline = Pipeline([
+        ("scaler", StandardScaler()),
+        ("regressor", xgb.XGBRegressor(n_estimators=30, max_depth=4))
+    ]).fit(X, X[:, 2] * 3)
+    compiled = compile_xgboost(pipeline)
+    np.testing.assert_array_equal(compiled.predict(pipeline[:-1].transform(X)), pipeline.predict(X))
+
+def test_fraud_trainer_pipeline_parity(xgb):
+    pd = pytest.importorskip("pandas")
+    from scipy import sparse
+    from models.fraud_detection.train import FraudModelTrainer
+    rng = np.random.default_rng(2)
+    rows = 600
+    X = pd.DataFrame({
+        "amount": rng.lognormal(10, 1, rows),
+        "frequency": rng.poisson(4, rows).astype(float),
+        "declared_income": np.where(rng.random(rows) < 0.05, np.nan, rng.lognormal(11, 1, rows)),
+        "sector_code": rng.choice([f"S{i:02d}" for i in range(12)], rows),
+        "business_type": rng.choice([f"B{i}" for i in range(8)], rows)
+    })
+    y = ((X["sector_code"] < "S04") & (X["amount"] > X["amount"].median())).astype(int)
+    trainer = FraudModelTrainer({"fraud_model": {"n_estimators": 40, "max_depth": 4, "lr": 0.3}})
+    trainer.model.fit(X, y)
+    compiled = compile_xgboost(trainer.model)
+
+    # The one-hot columns make the preprocessor emit CSR, whose unstored zeros XGBoost treats as missing
+    features = trainer.preprocessor.transform(X)
+    assert sparse.issparse(features)
+    classifier = trainer.model[-1]
+    np.testing.assert_array_equal(compiled.predict_margin(features), classifier.predict(features, output_margin=True))
+    np.testing.assert_array_equal(compiled.predict(features), trainer.model.predict(X))
+    np.testing.assert_allclose(compiled.predict_proba(features), trainer.model.predict_proba(X), rtol=2e-7, atol=1e-9)
+
+def test_isolation_forest_sparse_input_parity(data):
+    from scipy import sparse
+    X, _ = data
+    X = np.where(np.abs(X) < 0.8, 0.0, X)
+    forest = IsolationForest(random_state=1).fit(X)
+    compiled = compile_isolation_forest(forest)
+    # sklearn reads unstored entries as zeros
+    X_sparse = sparse.csr_matrix(X)
+    np.testing.assert_array_equal(compiled.score_samples(X_sparse), forest.score_samples(X_sparse))
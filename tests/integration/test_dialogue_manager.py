@@ -0,0 +1,59 @@
+"""
+FILE: tests/integration/test_dialogue_manager.py
+DESCRIPTION: Tests for DialogueManager's async turn handling
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from nlp.dialogue_manager import DialogueManager
+
+class StubModels:
+    """Intent and NER stand-ins that only finish when both are running at once"""
+    def __init__(self, confidence=0.9):
+        self.confidence = confidence
+        self.barrier = threading.Barrier(2, timeout=5)
+        self.threads = []
+
+    def predict_intent(self, text, language):
+        self.threads.append(threading.current_thread().name)
+        self.barrier.wait()
+        return {"intent": "deadline_query", "confidence": self.confidence}
+
+    def extract_entities(self, text):
+        self.threads.append(threading.current_thread().name)
+        self.barrier.wait()
+        return {"TAX_FORM": ["P9A"] if "P9A" in text else []}
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="dialogue") as pool:
+        yield pool
+
+def test_async_turn_runs_models_concurrently(executor):
+    models = StubModels()
+    manager = DialogueManager(models, models, executor=executor)
+
+    response = asyncio.run(manager.aprocess_query("user1", "Muda wa P9A ni lini?"))
+    # A barrier of two would time out if intent and NER ran one after the other
+    assert not models.barrier.broken
+    assert len(models.threads) == 2 and all(name.startswith("dialogue") for name in models.threads)
+
+    assert response["action"] == "respond"
+    history = manager.sessions.get_history("user1")
+    assert [(turn.intent, turn.entity_dict()) for turn in history] == [("deadline_query", {"TAX_FORM": ["P9A"]})]
+
+def test_async_follow_up_uses_recorded_turn(executor):
+    models = StubModels(confidence=0.3)
+    manager = DialogueManager(models, models, executor=executor)
+
+    first = asyncio.run(manager.aprocess_query("user1", "Nahitaji msaada na P9A"))
+    assert first["pending_action"] == "clarify"
+    models.barrier.reset()
+
+    # The clarification is answered as a follow-up instead of asking again
+    second = asyncio.run(manager.aprocess_query("user1", "ni tarehe gani?"))
+    assert "pending_action" not in second
+    history = manager.sessions.get_history("user1")
+    assert len(history) == 2 and history[-1].entity_dict() == {"TAX_FORM": ["P9A"]}
@@ -0,0 +1,95 @@
+"""
+FILE: tests/integration/test_entity_batch.py
+DESCRIPTION: Tests for TaxEntityRecognizer.extract_entities_batch with stub spaCy pipelines
+"""
+
+import importlib
+import sys
+from types import ModuleType, SimpleNamespace
+import pytest
+
+ENGLISH = "How do I file my return online"
+SWAHILI = "Nataka kujua jinsi ya kulipa kodi"
+STRUCTURED = "PIN A123456789K VAT3"
+DATED = "Nililipa PAYE tarehe 20/07/2024"
+
+@pytest.fixture
+def train_ner(monkeypatch):
+    """The module under test; spaCy is replaced by empty modules when it is not installed"""
+    try:
+        import spacy  # noqa: F401
+    except ImportError:
+        for name in ("spacy", "spacy.lang", "spacy.lang.en"):
+            module = ModuleType(name)
+            module.English = object
+            monkeypatch.setitem(sys.modules, name, module)
+        monkeypatch.delitem(sys.modules, "nlp.entity_recognition.train_ner", raising=False)
+    return importlib.import_module("nlp.entity_recognition.train_ner")
+
+class StubPipeline:
+    """spaCy Language stand-in: records pipe() calls and tags each doc with its own name"""
+    def __init__(self, name, pipe_names=()):
+        self.name = name
+        self.pipe_names = list(pipe_names)
+        self.calls = []
+        self.patterns = []
+
+    def pipe(self, texts, batch_size, n_process):
+        texts = list(texts)
+        self.calls.append((texts, batch_size, n_process))
+        for text in texts:
+            yield SimpleNamespace(ents=[SimpleNamespace(label_="TAX_TYPE", text=f"{self.name}|{text}")])
+
+    def add_pipe(self, name, before=None):
+        self.pipe_names.insert(self.pipe_names.index(before) if before else len(self.pipe_names), name)
+        return SimpleNamespace(add_patterns=self.patterns.extend)
+
+@pytest.fixture
+def recognizer(train_ner):
+    recognizer = object.__new__(train_ner.TaxEntityRecognizer)
+    recognizer.nlp = StubPipeline("en", ["ner"])
+    recognizer.sw_nlp = StubPipeline("sw")
+    recognizer.model_version = "stub"
+    recognizer.rules = train_ner.RuleExtractor("spacy_ner", {label: label for label in train_ner.ENTITY_LABELS})
+    return recognizer
+
+def test_entity_ruler_runs_before_ner(recognizer, train_ner):
+    recognizer._add_special_patterns()
+    assert recognizer.nlp.pipe_names == ["entity_ruler", "ner"]
+    assert recognizer.sw_nlp.pipe_names == ["entity_ruler"]
+    assert recognizer.nlp.patterns == recognizer.sw_nlp.patterns == train_ner.ENTITY_PATTERNS
+
+def test_results_come_back_in_input_order_across_language_groups(recognizer):
+    texts = [SWAHILI, ENGLISH, STRUCTURED, f"{SWAHILI} leo", DATED, f"{ENGLISH} today"]
+    results = recognizer.extract_entities_batch(texts, batch_size=8, n_process=1)
+
+    assert [calls[0] for calls in recognizer.nlp.calls] == [[ENGLISH, f"{ENGLISH} today"]]
+    assert [calls[0] for calls in recognizer.sw_nlp.calls] == [[SWAHILI, f"{SWAHILI} leo", DATED]]
+    assert recognizer.nlp.calls[0][1:] == (8, 1)
+
+    assert results[0]["TAX_TYPE"] == [f"sw|{SWAHILI}"]
+    assert results[1]["TAX_TYPE"] == [f"en|{ENGLISH}"]
+    assert results[3]["TAX_TYPE"] == [f"sw|{SWAHILI} leo"]
+    assert results[5]["TAX_TYPE"] == [f"en|{ENGLISH} today"]
+
+def test_structured_queries_skip_spacy_and_rules_fill_what_it_missed(recognizer):
+    structured, dated = recognizer.extract_entities_batch([STRUCTURED, DATED])
+
+    assert structured == {"TAX_TYPE": [], "KRA_PIN": ["A123456789K"], "TAX_FORM": ["VAT3"], "CURRENCY": []}
+    # A date cue sends the query to spaCy; the rules still add the tax type it carries
+    assert dated["TAX_TYPE"] == [f"sw|{DATED}", "PAYE"]
+
+def test_single_and_batch_agree(recognizer):
+    texts = [ENGLISH, STRUCTURED, SWAHILI]
+    assert [recognizer.extract_entities(text) for text in texts] == recognizer.extract_entities_batch(texts)
+
+def test_real_pipeline_keeps_rule_labels(train_ner):
+    pytest.importorskip("spacy")
+    pytest.importorskip("en_core_web_sm")
+    recognizer = train_ner.TaxEntityRecognizer()
+
+    names = recognizer.nlp.pipe_names
+    assert names.index("entity_ruler") < names.index("ner")
+    assert not set(train_ner.UNUSED_COMPONENTS) & set(names)
+    entities = recognizer.extract_entities_batch(["Nimekosa deadline ya P9A kwa PIN A123456789K Nairobi"])[0]
+    assert entities["KRA_PIN"] == ["A123456789K"] and entities["TAX_FORM"] == ["P9A"]
@@ -0,0 +1,58 @@
+"""
+FILE: tests/integration/test_executor.py
+DESCRIPTION: Tests for admission control and deadlines in the inference executor
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from api.executor import InferenceExecutor
+from utils.error_handler import InferenceTimeoutError, ServiceOverloadedError
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(kind="thread", max_workers=1, max_pending=2, retry_after=7)
+    yield executor
+    executor.shutdown()
+
+def test_sheds_load_once_every_slot_is_taken(executor):
+    executor.acquire()
+    executor.acquire()
+    assert executor.saturated
+    with pytest.raises(ServiceOverloadedError) as shed:
+        executor.acquire()
+    assert shed.value.status_code == 503 and shed.value.retry_after == 7
+
+    executor.release()
+    executor.acquire()
+    assert executor._in_flight == 2
+
+def test_admit_returns_the_slot_on_failure(executor):
+    with pytest.raises(ValueError):
+        with executor.admit():
+            assert executor._in_flight == 1
+            raise ValueError("pipeline failed")
+    assert executor._in_flight == 0
+
+def test_past_deadline_never_runs(executor):
+    calls = []
+    with pytest.raises(InferenceTimeoutError):
+        asyncio.run(executor.run(calls.append, "query", deadline=time.time() - 1))
+    executor.pool.submit(lambda: None).result()  # drain the pool
+    assert calls == []
+
+def test_queued_work_is_dropped_once_its_deadline_passes(executor):
+    busy = threading.Event()
+    calls = []
+
+    async def scenario():
+        blocker = executor.pool.submit(busy.wait, 5)  # occupies the only worker
+        with pytest.raises(InferenceTimeoutError):
+            await executor.run(calls.append, "late", deadline=time.time() + 0.05)
+        busy.set()
+        blocker.result()
+        assert await executor.run(calls.append, "on time", deadline=time.time() + 5) is None
+
+    asyncio.run(scenario())
+    assert calls == ["on time"]
@@ -0,0 +1,82 @@
+"""
+FILE: tests/integration/test_inference_backends.py
+DESCRIPTION: load_model routes each task and backend to the right loader
+"""
+
+import sys
+from types import ModuleType, SimpleNamespace
+import pytest
+
+pytest.importorskip("transformers")
+from nlp import inference_backends
+from nlp.inference_backends import QUANTIZED_ONNX, load_model, onnx_path
+
+class FakeModel:
+    """Records how it was loaded instead of reading weights"""
+    def __init__(self, kind, path, **options):
+        self.kind, self.path, self.options = kind, path, options
+        self.evaluated = False
+
+    def eval(self):
+        self.evaluated = True
+        return self
+
+def fake_loader(kind):
+    return SimpleNamespace(from_pretrained=lambda path, **options: FakeModel(kind, path, **options))
+
+@pytest.fixture(autouse=True)
+def fake_models(monkeypatch):
+    monkeypatch.setattr(inference_backends, "_TASK_MODELS", {
+        "sequence-classification": fake_loader("pt-sequence"),
+        "token-classification": fake_loader("pt-token")
+    })
+    quantized = []
+    monkeypatch.setattr(
+        inference_backends.torch.quantization, "quantize_dynamic",
+        lambda model, layers, dtype: quantized.append(model) or model
+    )
+    return quantized
+
+@pytest.fixture
+def fake_optimum(monkeypatch):
+    """optimum.onnxruntime stand-in, whether or not optimum is installed"""
+    module = ModuleType("optimum.onnxruntime")
+    module.ORTModelForSequenceClassification = fake_loader("ort-sequence")
+    module.ORTModelForTokenClassification = fake_loader("ort-token")
+    monkeypatch.setitem(sys.modules, "optimum", ModuleType("optimum"))
+    monkeypatch.setitem(sys.modules, "optimum.onnxruntime", module)
+
+@pytest.mark.parametrize("task, kind", [
+    ("sequence-classification", "pt-sequence"),
+    ("token-classification", "pt-token")
+])
+def test_eager_and_int8_load_pytorch_weights(task, kind, fake_models):
+    eager = load_model("models/nlp/m", task, "eager")
+    assert (eager.kind, eager.path, eager.evaluated) == (kind, "models/nlp/m", True)
+    assert fake_models == []
+
+    int8 = load_model("models/nlp/m", task, "int8")
+    assert int8.kind == kind and fake_models == [int8]
+
+@pytest.mark.parametrize("task, kind", [
+    ("sequence-classification", "ort-sequence"),
+    ("token-classification", "ort-token")
+])
+def test_onnx_loads_the_export_and_prefers_int8(task, kind, tmp_path, fake_optimum):
+    exported = onnx_path(str(tmp_path))
+    (tmp_path / "onnx").mkdir()
+    model = load_model(str(tmp_path), task, "onnx")
+    assert (model.kind, model.path, model.options) == (kind, exported, {})
+
+    (tmp_path / "onnx" / QUANTIZED_ONNX).touch()
+    assert load_model(str(tmp_path), task, "onnx").options == {"file_name": QUANTIZED_ONNX}
+
+def test_missing_export_names_the_task(tmp_path, fake_optimum):
+    with pytest.raises(FileNotFoundError, match="--task token-classification"):
+        load_model(str(tmp_path), "token-classification", "onnx")
+
+def test_unknown_backend_or_task():
+    with pytest.raises(ValueError, match="backend"):
+        load_model("models/nlp/m", backend="tensorrt")
+    with pytest.raises(ValueError, match="task"):
+        load_model("models/nlp/m", task="question-answering")
@@ -0,0 +1,68 @@
+"""
+FILE: tests/integration/test_intent_batch.py
+DESCRIPTION: Tests for length-bucketed TaxIntentClassifier.predict_batch
+"""
+
+import pytest
+torch = pytest.importorskip("torch")
+from nlp.intent_classification import train_classifier
+from nlp.intent_classification.train_classifier import WINDOW_BATCHES, TaxIntentClassifier
+
+class StubTokenizer:
+    """One id per word (its length), 0 pads"""
+    def __call__(self, texts, return_tensors=None, padding=False, truncation=False, max_length=None):
+        single = isinstance(texts, str)
+        ids = [[len(word) for word in text.split()][:max_length] for text in ([texts] if single else texts)]
+        if return_tensors == "pt":
+            return self.pad({"input_ids": ids}, return_tensors="pt")
+        return {"input_ids": ids}
+
+    def pad(self, encoded, return_tensors="pt"):
+        ids = encoded["input_ids"]
+        width = max(len(row) for row in ids)
+        return {
+            "input_ids": torch.tensor([row + [0] * (width - len(row)) for row in ids]),
+            "attention_mask": torch.tensor([[1] * len(row) + [0] * (width - len(row)) for row in ids])
+        }
+
+class StubModel:
+    """Logits depend on the unpadded tokens only, so padding cannot change a prediction"""
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, input_ids, attention_mask):
+        self.batches.append(attention_mask.sum(dim=1).tolist())
+        tokens = (input_ids * attention_mask).sum(dim=1)
+        logits = torch.nn.functional.one_hot(tokens % 5, 5).float() * (1 + attention_mask.sum(dim=1, keepdim=True))
+        return type("Output", (), {"logits": logits})()
+
+@pytest.fixture
+def classifier(monkeypatch):
+    monkeypatch.setattr(train_classifier, "load_tokenizer", lambda path: StubTokenizer())
+    monkeypatch.setattr(train_classifier, "load_model", lambda path, task, backend: StubModel())
+    return TaxIntentClassifier("stub", batch_size=4)
+
+def test_predict_batch_matches_predict_intent_in_order(classifier):
+    # Three windows of mixed lengths; the last one is partial
+    texts = [" ".join(["kodi"] * (1 + idx % 7) + ["vat" * (idx % 3 + 1)]) for idx in range(4 * WINDOW_BATCHES * 2 + 5)]
+    expected = [classifier.predict_intent(text) for text in texts]
+    classifier.model.batches.clear()
+
+    predictions = list(classifier.predict_batch(iter(texts)))
+    assert [p["intent"] for p in predictions] == [e["intent"] for e in expected]
+    assert [p["confidence"] for p in predictions] == pytest.approx([e["confidence"] for e in expected])
+
+    # Two full windows of WINDOW_BATCHES passes and a partial one; each window
+    # is fed to the model shortest first, so a batch only pads to its neighbours
+    batches = classifier.model.batches
+    assert [len(batch) for batch in batches] == [4] * (2 * WINDOW_BATCHES) + [4, 1]
+    for window in (batches[:WINDOW_BATCHES], batches[WINDOW_BATCHES:2 * WINDOW_BATCHES], batches[2 * WINDOW_BATCHES:]):
+        lengths = [length for batch in window for length in batch]
+        assert lengths == sorted(lengths)
+
+def test_predict_batch_is_lazy(classifier):
+    assert list(classifier.predict_batch([])) == []
+    predictions = classifier.predict_batch(["kodi ya vat"] * 1000)
+    assert classifier.model.batches == []
+    next(predictions)
+    assert sum(len(batch) for batch in classifier.model.batches) == 4 * WINDOW_BATCHES
@@ -0,0 +1,70 @@
+"""
+FILE: tests/integration/test_intent_cascade.py
+DESCRIPTION: Tests for the hashed linear intent model and the two-tier cascade
+"""
+
+import pytest
+pytest.importorskip("sklearn")
+from nlp.intent_classification.cascade import LINEAR_TIER, TRANSFORMER_TIER, IntentCascade
+from nlp.intent_classification.linear_classifier import HashedIntentClassifier
+
+TRAINING = [
+    ("Nina shida kulipa kwa M-Pesa", "payment_issue"),
+    ("Malipo yangu ya M-Pesa hayajaonekana", "payment_issue"),
+    ("My M-Pesa payment failed", "payment_issue"),
+    ("Payment to KRA did not go through", "payment_issue"),
+    ("Muda wa mwisho wa VAT ni lini", "deadline_query"),
+    ("When is the PAYE deadline", "deadline_query"),
+    ("Tarehe ya mwisho ya kuwasilisha returns", "deadline_query"),
+    ("What is the deadline for filing returns", "deadline_query")
+]
+
+@pytest.fixture(scope="module")
+def linear():
+    texts, labels = zip(*TRAINING)
+    return HashedIntentClassifier(n_features=2 ** 12).fit(texts, labels)
+
+def test_linear_model_roundtrip(linear, tmp_path):
+    path = str(tmp_path / "intent_linear.joblib")
+    linear.save(path)
+    restored = HashedIntentClassifier.load(path)
+    assert restored.predict_intent("M-Pesa payment failed")["intent"] == "payment_issue"
+    assert restored.predict_batch(["deadline ya VAT"]) == linear.predict_batch(["deadline ya VAT"])
+
+def test_cascade_escalates_only_uncertain_queries(linear):
+    texts = ["Nina shida kulipa kwa M-Pesa", "hujambo", "When is the PAYE deadline"]
+    confidences = [p["confidence"] for p in linear.predict_batch(texts)]
+    threshold = sorted(confidences)[1]
+    escalated = []
+
+    def escalate(rest):
+        escalated.extend(rest)
+        return [{"intent": "complaint", "confidence": 0.99} for _ in rest]
+
+    cascade = IntentCascade(linear, threshold=threshold)
+    results = cascade.predict_batch(texts, escalate)
+
+    uncertain = confidences.index(min(confidences))
+    assert escalated == [texts[uncertain]]
+    assert results[uncertain] == {"intent": "complaint", "confidence": 0.99, "tier": TRANSFORMER_TIER}
+    assert [r["tier"] for i, r in enumerate(results) if i != uncertain] == [LINEAR_TIER, LINEAR_TIER]
+    assert cascade.served_fraction() == pytest.approx({LINEAR_TIER: 2 / 3, TRANSFORMER_TIER: 1 / 3})
+
+def test_cascade_skips_transformer_when_confident(linear):
+    cascade = IntentCascade(linear, threshold=0.0)
+    results = cascade.predict_batch(["My M-Pesa payment failed"], escalate=lambda rest: pytest.fail("escalated"))
+    assert results[0]["tier"] == LINEAR_TIER
+    assert cascade.predict_batch([], escalate=lambda rest: pytest.fail("escalated")) == []
+
+def test_cache_key_tracks_cascade_routing(linear):
+    pytest.importorskip("transformers")
+    from nlp.full_pipeline import TaxNLP
+    from nlp.query_cache import QueryCache
+
+    def key(cascade):
+        nlp = TaxNLP(lazy=True, warmup=False, cache=QueryCache(), intent_cascade=cascade)
+        return nlp._cache_key("Muda wa VAT ni lini", "sw", ("intent",))
+
+    keys = {key(None), key(IntentCascade(linear, threshold=0.9)), key(IntentCascade(linear, threshold=0.8))}
+    assert len(keys) == 3
+    assert key(IntentCascade(linear, threshold=0.9)) in keys
@@ -0,0 +1,275 @@
+"""
+FILE: tests/integration/test_knowledge_base.py
+DESCRIPTION: Tests for the persistent, incremental knowledge base index
+"""
+
+import sqlite3
+import threading
+import numpy as np
+import pytest
+from nlp.tax_knowledge.bm25_index import tokenize
+from nlp.tax_knowledge.dense_index import DenseIndex, normalize_rows
+from nlp.tax_knowledge.knowledge_connector import TaxKnowledgeBase, NO_MATCH_MESSAGE
+from nlp.tax_knowledge.sparse_scorer import SparseBM25Scorer
+
+DOCUMENTS = [
+    "VAT returns are due on the 20th day of the following month",
+    "PAYE must be remitted by the 9th of the following month",
+    "Form P9A is issued by employers to employees every year"
+]
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "tax_db.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE tax_documents (content TEXT)")
+    conn.executemany("INSERT INTO tax_documents VALUES (?)", [(doc,) for doc in DOCUMENTS])
+    conn.commit()
+    conn.close()
+    return path
+
+def test_builds_index_once(db_path):
+    kb = TaxKnowledgeBase(db_path)
+    assert len(kb.index) == 3
+    assert kb.search("when is VAT due").startswith("VAT returns")
+
+    # Reopening reuses the stored index
+    reopened = TaxKnowledgeBase(db_path)
+    assert len(reopened.index) == 3
+    assert reopened.search("P9A employers").startswith("Form P9A")
+
+def test_incremental_updates(db_path):
+    kb = TaxKnowledgeBase(db_path)
+    doc_id = kb.add_document("Turnover tax applies to businesses below 25 million shillings")
+    assert kb.search("turnover tax").startswith("Turnover tax")
+
+    kb.update_document(doc_id, "Rental income tax is charged at 7.5 percent")
+    assert kb.index.search("turnover") == []
+    assert kb.search("rental income").startswith("Rental income")
+
+    kb.delete_document(doc_id)
+    assert kb.search("rental income") == NO_MATCH_MESSAGE
+    assert len(kb.index) == 3
+
+def test_picks_up_external_changes(db_path):
+    TaxKnowledgeBase(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM tax_documents WHERE rowid = 2")
+    conn.execute("INSERT INTO tax_documents VALUES ('Excise duty applies to alcohol')")
+    conn.commit()
+
+    kb = TaxKnowledgeBase(db_path)
+    assert len(kb.index) == 3
+    assert kb.index.search("PAYE") == []
+    assert kb.search("excise").startswith("Excise duty")
+
+def test_reindexes_edits_and_reused_rowids(db_path):
+    TaxKnowledgeBase(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE tax_documents SET content = 'Excise duty applies to alcohol' WHERE rowid = 1")
+    # Without AUTOINCREMENT the highest rowid is handed out again after a delete
+    conn.execute("DELETE FROM tax_documents WHERE rowid = 3")
+    assert conn.execute("INSERT INTO tax_documents VALUES ('Turnover tax for small businesses')").lastrowid == 3
+    conn.commit()
+
+    kb = TaxKnowledgeBase(db_path)
+    assert len(kb.index) == 3
+    assert kb.index.search("VAT") == [] and kb.index.search("P9A") == []
+    assert [doc_id for doc_id, _ in kb.index.search("excise")] == [1]
+    assert [doc_id for doc_id, _ in kb.index.search("turnover")] == [3]
+
+def test_incremental_matches_full_build(db_path, tmp_path):
+    kb = TaxKnowledgeBase(db_path)
+    kb.delete_document(1)
+    kb.add_document(DOCUMENTS[0])
+
+    other = str(tmp_path / "fresh.sqlite")
+    conn = sqlite3.connect(other)
+    conn.execute("CREATE TABLE tax_documents (content TEXT)")
+    conn.executemany("INSERT INTO tax_documents VALUES (?)", [(doc,) for doc in DOCUMENTS[1:] + DOCUMENTS[:1]])
+    conn.commit()
+    fresh = TaxKnowledgeBase(other)
+
+    for query in ["following month", "VAT", "employers"]:
+        assert [score for _, score in kb.index.search(query)] == pytest.approx(
+            [score for _, score in fresh.index.search(query)]
+        )
+
+def test_sparse_scores_match_index(db_path):
+    kb = TaxKnowledgeBase(db_path)
+    kb.add_document("VAT VAT refunds are processed within 90 days")
+    for query in ["VAT following month", "month month", "employers VAT", "unknown words"]:
+        expected = sorted(kb.index.scores(tokenize(query)).items(), key=lambda item: -item[1])
+        assert [doc_id for doc_id, _ in kb.scorer.search(query)] == [doc_id for doc_id, _ in expected]
+        assert [score for _, score in kb.scorer.search(query)] == pytest.approx(
+            [score for _, score in expected], rel=1e-5
+        )
+
+def test_search_many_ranks_batches(db_path):
+    kb = TaxKnowledgeBase(db_path)
+    results = kb.search_many(["following month", "P9A", "nothing matches"], k=2)
+    assert [len(hits) for hits in results] == [2, 1, 0]
+    assert results[0][0].score >= results[0][1].score
+    assert results[1][0].content == DOCUMENTS[2]
+
+def test_scorer_from_corpus_matches_index(db_path):
+    kb = TaxKnowledgeBase(db_path)
+    corpus = SparseBM25Scorer.from_corpus(
+        [(doc_id, tokenize(doc)) for doc_id, doc in reversed(list(enumerate(DOCUMENTS, 1)))]
+    )
+    queries = ["VAT due month", "employees P9A"]
+    for expected, actual in zip(kb.scorer.search_many(queries), corpus.search_many(queries)):
+        assert [doc_id for doc_id, _ in actual] == [doc_id for doc_id, _ in expected]
+        assert [score for _, score in actual] == pytest.approx([score for _, score in expected])
+
+def test_fts5_backend(db_path):
+    kb = TaxKnowledgeBase(db_path, backend="fts5")
+    assert len(kb.index) == 3
+    assert kb.search("when is VAT due").startswith("VAT returns")
+
+    doc_id = kb.add_document("Turnover tax applies to small businesses")
+    assert kb.search("turnover").startswith("Turnover tax")
+    kb.update_document(doc_id, "Rental income tax is charged monthly")
+    assert kb.search("turnover") == NO_MATCH_MESSAGE
+    kb.delete_document(doc_id)
+    assert kb.search("rental") == NO_MATCH_MESSAGE
+
+    # Documents written directly to the table are indexed by the triggers
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO tax_documents VALUES ('Excise duty applies to alcohol')")
+    conn.commit()
+    assert kb.search("excise").startswith("Excise duty")
+
+def test_backends_rank_alike(db_path):
+    bm25 = TaxKnowledgeBase(db_path)
+    fts5 = TaxKnowledgeBase(db_path, backend="fts5")
+    for query in ["VAT following month", "P9A employers", "PAYE", "nothing \"matches"]:
+        assert [hit.doc_id for hit in fts5.search_many([query], k=1)[0]] == \
+            [hit.doc_id for hit in bm25.search_many([query], k=1)[0]]
+
+def test_content_fetched_lazily_through_lru(db_path):
+    kb = TaxKnowledgeBase(db_path, content_cache_size=2, fetch_chunk_size=2)
+    assert len(kb.index) == 3
+    assert len(kb._contents) == 0
+
+    kb.search_many(["VAT", "PAYE", "P9A"], k=1)
+    assert len(kb._contents) == 2
+
+    kb.update_document(1, "VAT refunds are processed within 90 days")
+    assert kb.search("VAT").startswith("VAT refunds")
+
+def test_content_lru_sees_external_writes(db_path):
+    kb = TaxKnowledgeBase(db_path, backend="fts5")
+    assert kb.search("P9A").startswith("Form P9A")
+
+    # Another process editing the row directly; the FTS5 triggers reindex it
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE tax_documents SET content = 'Form P9A is now issued by 28 February' WHERE rowid = 3")
+    conn.commit()
+    assert kb.search("P9A").startswith("Form P9A is now issued")
+
+    # Reads alone do not empty the LRU
+    kb.search("P9A")
+    assert 3 in kb._contents
+
+class KeywordEncoder:
+    """Deterministic stand-in encoder: one dimension per keyword"""
+    KEYWORDS = ["vat", "paye", "p9a", "month", "employers", "turnover"]
+
+    def encode(self, texts, batch_size=32):
+        return np.array([
+            [text.lower().count(word) + 0.01 for word in self.KEYWORDS] for text in texts
+        ], dtype=np.float32)
+
+def test_dense_index_matches_exact_search(tmp_path):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(500, 16)).astype(np.float32)
+    index = DenseIndex.build(str(tmp_path / "dense"), embeddings, np.arange(1, 501), nlist=10)
+    index.nprobe = 10  # scanning every cluster is exact
+
+    vectors = normalize_rows(embeddings)
+    for row in [0, 123, 499]:
+        expected = np.argsort(-(vectors @ vectors[row]))[:5] + 1
+        assert [doc_id for doc_id, _ in index.search_many(vectors[row:row + 1], k=5)[0]] == expected.tolist()
+
+def test_dense_and_hybrid_modes(db_path, tmp_path):
+    encoder = KeywordEncoder()
+    index_dir = str(tmp_path / "dense")
+    DenseIndex.build(index_dir, encoder.encode(DOCUMENTS), np.arange(1, 4), nlist=2)
+
+    kb = TaxKnowledgeBase(db_path, dense_index_path=index_dir, encoder=encoder, nprobe=2)
+    assert kb.search("p9a", mode="dense").startswith("Form P9A")
+    hybrid = kb.search_many(["PAYE month"], k=3, mode="hybrid")[0]
+    assert hybrid[0].content == DOCUMENTS[1]
+    assert len(hybrid) == 3
+
+    with pytest.raises(ValueError):
+        TaxKnowledgeBase(db_path).search("VAT", mode="dense")
+
+def test_writes_do_not_rebuild_the_matrix(db_path):
+    kb = TaxKnowledgeBase(db_path)
+    scorer = kb.scorer
+    doc_id = kb.add_document("VAT refunds are processed within 90 days")
+    assert kb.search("VAT refunds").startswith("VAT refunds")
+    kb.update_document(1, "Excise duty applies to alcohol")
+    assert kb.search("excise").startswith("Excise duty")
+
+    # Hits merge the stale matrix with documents scored from the index
+    for query in ["VAT following month", "month", "excise alcohol"]:
+        expected = sorted(kb.index.scores(tokenize(query)).items(), key=lambda item: -item[1])
+        assert [doc_id for doc_id, _ in kb._lexical([query], 5)[0]] == [doc_id for doc_id, _ in expected]
+
+    kb.delete_document(doc_id)
+    assert [hit.doc_id for hit in kb.search_many(["VAT refunds following month"])[0]] == [2]
+    assert kb.scorer is scorer
+
+def test_rebuild_keeps_writes_that_race_with_it(db_path, monkeypatch):
+    from nlp.tax_knowledge import knowledge_connector
+    kb = TaxKnowledgeBase(db_path)
+    from_index = SparseBM25Scorer.from_index
+
+    def add_during_build(index):
+        scorer = from_index(index)
+        # Committed after the snapshot was read, before the matrix is installed
+        kb.add_document("Turnover tax applies to small businesses")
+        return scorer
+
+    monkeypatch.setattr(knowledge_connector.SparseBM25Scorer, "from_index", add_during_build)
+    kb.refresh_scorer()
+    monkeypatch.undo()
+    assert kb.search("turnover").startswith("Turnover tax")
+
+def test_rebuilds_in_background_after_max_delta_docs(db_path):
+    kb = TaxKnowledgeBase(db_path, max_delta_docs=2)
+    scorer = kb.scorer
+    kb.add_document("Turnover tax applies to small businesses")
+    assert kb.scorer is scorer
+    kb.add_document("Excise duty applies to alcohol")
+    for thread in threading.enumerate():
+        if thread.name == "bm25-rebuild":
+            thread.join(5)
+
+    assert kb.scorer is not scorer
+    assert kb._scorer_snapshot()[1] == set()
+    assert [doc_id for doc_id, _ in kb.scorer.search("excise")] == [5]
+
+def test_startup_reindexes_only_logged_changes(db_path, monkeypatch):
+    from nlp.tax_knowledge.bm25_index import BM25Index
+    TaxKnowledgeBase(db_path)
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM bm25_changes").fetchone()[0] == 0
+    conn.execute("UPDATE tax_documents SET content = 'Excise duty applies to alcohol' WHERE rowid = 2")
+    conn.commit()
+
+    indexed = []
+    add_many = BM25Index.add_many
+    monkeypatch.setattr(BM25Index, "add_many", lambda self, docs: indexed.extend(docs) or add_many(self, docs))
+    kb = TaxKnowledgeBase(db_path)
+    assert indexed == [(2, "Excise duty applies to alcohol")]
+    assert kb.search("excise").startswith("Excise duty")
+    assert conn.execute("SELECT COUNT(*) FROM bm25_changes").fetchone()[0] == 0
+
+    # Nothing changed, nothing is read back
+    indexed.clear()
+    TaxKnowledgeBase(db_path)
+    assert indexed == []
@@ -0,0 +1,35 @@
+"""
+FILE: tests/integration/test_language_id.py
+DESCRIPTION: Tests for the cached Swahili / English / code-switched language identifier
+"""
+
+import pytest
+from nlp.language_id import MIXED, UNKNOWN, LanguageIdentifier, default_identifier, detect_language, train
+
+@pytest.mark.parametrize("text, expected", [
+    ("Nahitaji msaada na malipo ya VAT", "sw"),
+    ("Je, ni tarehe gani?", "sw"),
+    ("Asante sana", "sw"),
+    ("When is the PAYE deadline?", "en"),
+    ("Can I get a refund for overpaid taxes", "en"),
+    ("Nimekosa deadline ya filing returns yangu", MIXED),
+    ("A123456789K 5000", UNKNOWN)
+])
+def test_shipped_model(text, expected):
+    assert detect_language(text) == expected
+
+def test_results_are_memoized():
+    identifier = default_identifier()
+    detect_language("Muda wa kuwasilisha fomu P9A")
+    hits = identifier.identify.cache_info().hits
+    detect_language("Muda wa kuwasilisha fomu P9A")
+    assert identifier.identify.cache_info().hits == hits + 1
+
+def test_trained_vocabulary_excludes_shared_words():
+    model = train({"sw": ["kodi ya VAT", "lipa kodi"], "en": ["pay the VAT", "tax"]})
+    assert "vat" not in model["languages"]["sw"]["words"]
+    assert "kodi" in model["languages"]["sw"]["words"]
+
+    identifier = LanguageIdentifier(model)
+    assert identifier.identify("lipa kodi") == "sw"
+    assert identifier.proportions("") == {}
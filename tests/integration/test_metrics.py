@@ -0,0 +1,30 @@
+"""
+FILE: tests/integration/test_metrics.py
+DESCRIPTION: Metric label values stay within a fixed set
+"""
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+from prometheus_client import REGISTRY
+from utils.metrics import language_label, timed_stage
+
+def stage_count(stage, language):
+    return REGISTRY.get_sample_value(
+        "tax_nlp_stage_latency_seconds_count",
+        {"stage": stage, "language": language, "model_version": "test"}
+    ) or 0
+
+@pytest.mark.parametrize("language, label", [
+    ("sw", "sw"), ("en", "en"), ("mixed", "mixed"), ("multi", "multi"),
+    ("unknown", "other"), ("fr", "other"), ("x" * 500, "other"), (None, "other")
+])
+def test_language_label_is_bounded(language, label):
+    assert language_label(language) == label
+
+def test_timed_stage_clamps_the_language():
+    before = stage_count("test.stage", "other")
+    with timed_stage("test.stage", "'; DROP TABLE", "test"):
+        pass
+    assert stage_count("test.stage", "other") == before + 1
+    assert stage_count("test.stage", "'; DROP TABLE") == 0
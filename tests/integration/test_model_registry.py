@@ -0,0 +1,92 @@
+"""
+FILE: tests/integration/test_model_registry.py
+DESCRIPTION: Tests for ModelRegistry loading, warm-up and status reporting
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from nlp.model_registry import FAILED, PENDING, READY, ModelRegistry
+
+def test_models_load_lazily_on_first_get():
+    calls = []
+    registry = ModelRegistry({"ner": lambda: calls.append("ner") or "ner-model"})
+
+    assert registry.status()["ner"]["state"] == PENDING and not registry.is_ready()
+    assert registry.get("ner") == "ner-model"
+    assert registry.get("ner") == "ner-model"
+    assert calls == ["ner"]
+    assert registry.status()["ner"]["state"] == READY and registry.is_ready()
+
+def test_load_all_loads_models_concurrently():
+    # A barrier of two would time out if the loaders ran one after the other
+    barrier = threading.Barrier(2, timeout=5)
+    threads = []
+
+    def loader(name):
+        def load():
+            threads.append(threading.current_thread().name)
+            barrier.wait()
+            return name
+        return load
+
+    registry = ModelRegistry({"classifier": loader("classifier"), "ner": loader("ner")})
+    registry.load_all(parallel=True)
+
+    assert registry.is_ready()
+    assert all(name.startswith("model-load") for name in threads)
+    assert all(entry["load_time_s"] is not None for entry in registry.status().values())
+
+def test_concurrent_gets_share_one_load():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "model"
+
+    registry = ModelRegistry({"sentiment": load})
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(registry.get, "sentiment") for _ in range(4)]
+        started.wait(5)
+        release.set()
+        assert [future.result() for future in futures] == ["model"] * 4
+    assert calls == [1]
+
+def test_warm_up_runs_on_load_unless_deferred():
+    warmed = []
+    loaders = {"ner": lambda: "ner-model"}
+    warmups = {"ner": warmed.append}
+
+    ModelRegistry(loaders, warmups).load("ner")
+    assert warmed == ["ner-model"]
+
+    deferred = ModelRegistry(loaders, warmups, warmup_on_load=False)
+    deferred.load_all()
+    assert warmed == ["ner-model"]
+    deferred.warm_up()
+    assert warmed == ["ner-model", "ner-model"]
+
+def test_failed_load_is_reported_not_raised():
+    def broken():
+        raise OSError("weights missing")
+
+    registry = ModelRegistry({"translator": broken, "ner": lambda: "ner-model"})
+    registry.load_all(parallel=True)
+
+    status = registry.status()
+    assert status["translator"]["state"] == FAILED and "weights missing" in status["translator"]["error"]
+    assert status["ner"]["state"] == READY
+    assert registry.is_ready(["ner"]) and not registry.is_ready()
+
+def test_reload_bumps_version_and_notifies():
+    versions = iter(["v1", "v2"])
+    registry = ModelRegistry({"classifier": lambda: next(versions)})
+    notified = []
+    registry.on_reload(notified.append)
+
+    assert registry.get("classifier") == "v1"
+    registry.reload()
+    assert registry.get("classifier") == "v2"
+    assert registry.version == 1 and notified == [1]
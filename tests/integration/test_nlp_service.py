@@ -0,0 +1,66 @@
+"""
+FILE: tests/integration/test_nlp_service.py
+DESCRIPTION: Tests for the dialogue-backed /assist router
+"""
+
+import threading
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from api import nlp_service
+
+class StubModels:
+    """Intent and NER stand-ins recording the threads they run on"""
+    def __init__(self):
+        self.threads = []
+
+    def predict_intent(self, text, language):
+        self.threads.append(threading.current_thread().name)
+        return {"intent": "deadline_query", "confidence": 0.9}
+
+    def extract_entities(self, text):
+        self.threads.append(threading.current_thread().name)
+        return {"TAX_FORM": ["P9A"] if "P9A" in text else []}
+
+@pytest.fixture
+def models(monkeypatch):
+    models = StubModels()
+    monkeypatch.setattr(nlp_service, "load_dialogue_models", lambda: (models, models))
+    monkeypatch.setattr(nlp_service, "_dialogue_manager", None)
+    return models
+
+@pytest.fixture
+def client(models):
+    app = FastAPI()
+    app.include_router(nlp_service.router)
+    app.dependency_overrides[nlp_service.verify_token] = lambda: None
+    return TestClient(app)
+
+def test_dialogue_manager_is_built_once_on_the_shared_pool(models):
+    manager = nlp_service.get_dialogue_manager()
+    assert nlp_service.get_dialogue_manager() is manager
+    assert manager.intent_classifier is models and manager.entity_recognizer is models
+    assert manager.executor is nlp_service.dialogue_executor.pool
+
+def test_assist_answers_through_the_dialogue_manager(client, models):
+    response = client.post("/assist", json={"query": "Muda wa P9A ni lini?", "user_id": "user1"})
+    assert response.status_code == 200
+    assert response.json()["action_required"] == "respond"
+    assert len(models.threads) == 2 and all(name.startswith("inference") for name in models.threads)
+
+    history = nlp_service.get_dialogue_manager().sessions.get_history("user1")
+    assert [turn.entity_dict() for turn in history] == [{"TAX_FORM": ["P9A"]}]
+    assert nlp_service.dialogue_executor._in_flight == 0
+
+def test_sessions_come_from_the_configured_store(models, monkeypatch, tmp_path):
+    from nlp.session_store import SQLiteSessionStore
+    monkeypatch.setitem(nlp_service.serving_config, "sessions", {
+        "backend": "sqlite", "sqlite_path": str(tmp_path / "sessions.sqlite"), "max_turns": 3
+    })
+    sessions = nlp_service.get_dialogue_manager().sessions
+    assert isinstance(sessions, SQLiteSessionStore)
+    assert sessions.max_turns == 3
@@ -0,0 +1,55 @@
+"""
+FILE: tests/integration/test_normalizer.py
+DESCRIPTION: Tests for the glossary-driven query normalizer
+"""
+
+import pytest
+from nlp.normalizer import GlossaryNormalizer
+
+@pytest.fixture
+def normalizer():
+    return GlossaryNormalizer({
+        "*": {"VAT": "VAT", "VAT3": "VAT3", "P9A": "P9A", "M-Pesa": "M-Pesa"},
+        "sw": {"kodi ya ongezeko la thamani": "VAT", "lipa kadiri unavyopata": "PAYE"},
+        "en": {"value added tax": "VAT"}
+    })
+
+def test_shipped_glossary_loads():
+    normalizer = GlossaryNormalizer.from_file()
+    assert normalizer.normalize("Nahitaji msaada na malipo ya VAT", "sw") == "nahitaji msaada na malipo ya VAT"
+
+def test_replaces_terms_and_strips_punctuation(normalizer):
+    assert normalizer.normalize("Muda wa P9A na vat?", "sw") == "muda wa P9A na VAT"
+
+def test_longest_term_wins(normalizer):
+    assert normalizer.normalize("fomu ya vat3", "sw") == "fomu ya VAT3"
+
+def test_whole_words_only(normalizer):
+    assert normalizer.normalize("private savings", "en") == "private savings"
+
+def test_multi_word_terms_tolerate_whitespace(normalizer):
+    text = "Kodi  ya ongezeko\tla thamani na lipa kadiri unavyopata"
+    assert normalizer.normalize(text, "sw") == "VAT na PAYE"
+
+def test_language_specific_terms(normalizer):
+    assert normalizer.normalize("value added tax", "en") == "VAT"
+    assert normalizer.normalize("value added tax", "sw") == "value added tax"
+    assert normalizer.normalize("vat", "fr") == "VAT"
+
+def test_batch_matches_single(normalizer):
+    texts = ["Muda wa VAT", "value added tax!", "lipa kadiri unavyopata"]
+    languages = ["sw", "en", "sw"]
+    assert normalizer.normalize_batch(texts, languages) == [
+        normalizer.normalize(text, language) for text, language in zip(texts, languages)
+    ]
+
+def test_punctuated_terms_match_as_written(normalizer):
+    assert normalizer.normalize("Nililipa kwa m-pesa.", "sw") == "nililipa kwa MPesa"
+    assert normalizer.normalize("m - pesa", "sw") == "m  pesa"
+    assert normalizer.normalize("xm-pesa", "sw") == "xmpesa"
+
+def test_only_complete_terms_match():
+    normalizer = GlossaryNormalizer({"*": {t: t.upper() for t in ["vat", "vat3", "paye", "kodi ya mapato"]}})
+    assert normalizer.normalize("kodi ya mapato", "en") == "KODI YA MAPATO"
+    assert normalizer.normalize("kodi ya vat", "en") == "kodi ya VAT"
+    assert normalizer.normalize("vat33 pay", "en") == "vat33 pay"
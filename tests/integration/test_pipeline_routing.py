@@ -0,0 +1,107 @@
+"""
+FILE: tests/integration/test_pipeline_routing.py
+DESCRIPTION: Tests that TaxNLP only runs the models behind the requested fields
+"""
+
+import pytest
+
+pytest.importorskip("transformers")
+from nlp.full_pipeline import TaxNLP
+from nlp.model_registry import PENDING, ModelRegistry
+
+ENGLISH = "When is the filing deadline for my return?"
+SWAHILI = "Asante sana kwa msaada wenu mzuri"
+MIXED = "Nimekosa deadline ya filing returns yangu"
+
+class StubModels:
+    """Pipeline stand-ins that record the texts each model is given"""
+    def __init__(self):
+        self.calls = {"classifier": [], "ner": [], "sentiment": [], "translator": []}
+
+    def classifier(self, texts, batch_size):
+        self.calls["classifier"].append(list(texts))
+        return [{"label": "deadline_query", "score": 0.9} for _ in texts]
+
+    def ner(self, texts, batch_size):
+        self.calls["ner"].append(list(texts))
+        return [[] for _ in texts]
+
+    def sentiment(self, texts, batch_size):
+        self.calls["sentiment"].append(list(texts))
+        return [{"label": "NEUTRAL"} for _ in texts]
+
+    def translator(self, texts, batch_size):
+        self.calls["translator"].append(list(texts))
+        return [{"translation_text": f"english: {text}"} for text in texts]
+
+def build(stubs, **options):
+    nlp = TaxNLP(lazy=True, warmup=False, **options)
+    nlp.models = ModelRegistry(
+        loaders={name: (lambda model=getattr(stubs, name): model) for name in stubs.calls},
+        warmup_on_load=False
+    )
+    return nlp
+
+@pytest.fixture
+def stubs():
+    return StubModels()
+
+def test_only_the_requested_fields_models_load_and_run(stubs):
+    nlp = build(stubs)
+    result = nlp.process_query(ENGLISH, language="en", fields=["intent"])
+
+    assert result["intent"] == "deadline_query"
+    assert "entities" not in result and "sentiment" not in result
+    assert [len(batch) for batch in stubs.calls["classifier"]] == [1]
+    assert stubs.calls["ner"] == stubs.calls["sentiment"] == stubs.calls["translator"] == []
+    status = nlp.models.status()
+    assert {name: status[name]["state"] for name in ("ner", "sentiment", "translator")} == {
+        "ner": PENDING, "sentiment": PENDING, "translator": PENDING
+    }
+
+def test_each_model_sees_only_the_queries_that_asked_for_it(stubs):
+    nlp = build(stubs)
+    queries = [f"{ENGLISH} one", f"{ENGLISH} two", f"{ENGLISH} three"]
+    results = nlp.process_batch(queries, ["en"] * 3, [["intent"], ["entities"], None])
+
+    def last_words(model):
+        return [[text.split()[-1] for text in batch] for batch in stubs.calls[model]]
+
+    assert last_words("classifier") == [["one", "three"]]
+    assert last_words("ner") == [["two", "three"]]
+    assert last_words("sentiment") == [["three"]]
+    assert [sorted(set(result) & {"intent", "entities", "sentiment"}) for result in results] == [
+        ["intent"], ["entities"], ["entities", "intent", "sentiment"]
+    ]
+
+def test_unserved_fields_are_ignored(stubs):
+    nlp = build(stubs, fields=["intent", "entities"])
+    result = nlp.process_query(ENGLISH, language="en", fields=["sentiment"])
+
+    assert "sentiment" not in result
+    assert all(calls == [] for calls in stubs.calls.values())
+    assert nlp.routed_models() == ["classifier", "ner"]
+
+def test_only_swahili_and_mixed_text_is_translated_for_english_only_models(stubs):
+    nlp = build(stubs)
+    results = nlp.process_batch([ENGLISH, SWAHILI, MIXED], ["en", "sw", "sw"], [["sentiment"]] * 3)
+
+    assert [result["detected_language"] for result in results] == ["en", "sw", "mixed"]
+    assert stubs.calls["translator"] == [[SWAHILI, MIXED]]
+    (sentiment_inputs,) = stubs.calls["sentiment"]
+    assert sentiment_inputs[0] == nlp.normalizer.normalize(ENGLISH, "en")
+    assert sentiment_inputs[1:] == [f"english: {SWAHILI}", f"english: {MIXED}"]
+
+def test_multilingual_fields_are_never_translated(stubs):
+    nlp = build(stubs)
+    nlp.process_batch([SWAHILI, MIXED], ["sw", "sw"], [["intent", "entities"]] * 2)
+    assert stubs.calls["translator"] == []
+    assert stubs.calls["classifier"] and stubs.calls["ner"]
+
+def test_translation_can_be_turned_off(stubs):
+    nlp = build(stubs, translate=False)
+    nlp.process_query(SWAHILI, language="sw", fields=["sentiment"])
+
+    assert stubs.calls["translator"] == []
+    assert stubs.calls["sentiment"] == [[nlp.normalizer.normalize(SWAHILI, "sw")]]
+    assert "translator" not in nlp.routed_models()
@@ -0,0 +1,117 @@
+"""
+FILE: tests/integration/test_query_cache.py
+DESCRIPTION: Tests for the NLP query result cache
+"""
+
+import time
+import pytest
+from nlp.query_cache import MemoryCacheBackend, QueryCache, SQLiteCacheBackend
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCacheBackend(max_entries=3, max_bytes=1024)
+    return SQLiteCacheBackend(str(tmp_path / "cache.sqlite"), max_entries=3, max_bytes=1024)
+
+def test_hit_miss_and_copy(backend):
+    """Cached results round-trip and callers get independent copies"""
+    cache = QueryCache(backend, ttl_seconds=60, model_version="v1")
+    key = cache.make_key("nahitaji msaada na malipo ya VAT", "sw")
+
+    assert cache.get(key) is None
+    cache.put(key, {"intent": "payment_issue", "entities": {"TAX_TYPE": ["VAT"]}})
+
+    result = cache.get(key)
+    result["entities"]["TAX_TYPE"].append("PAYE")
+    assert cache.get(key)["entities"]["TAX_TYPE"] == ["VAT"]
+    assert cache.stats["hits"] == 2
+    assert cache.stats["misses"] == 1
+
+def test_lru_eviction(backend):
+    """Least recently used entries go first once the entry limit is hit"""
+    cache = QueryCache(backend, ttl_seconds=60)
+    for name in ["a", "b", "c"]:
+        cache.put(name, {"v": name})
+        time.sleep(0.01)
+    cache.get("a")
+    cache.put("d", {"v": "d"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": "a"}
+    assert cache.stats["evictions"] == 1
+
+def test_byte_limit_and_ttl(backend):
+    """Oversized values are not stored and expired entries are not served"""
+    cache = QueryCache(backend, ttl_seconds=0.05)
+    cache.put("big", {"v": "x" * 2048})
+    cache.put("small", {"v": "x"})
+
+    assert cache.get("big") is None
+    assert cache.get("small") == {"v": "x"}
+    time.sleep(0.1)
+    assert cache.get("small") is None
+
+def test_key_includes_language_and_version():
+    cache = QueryCache(model_version="v1")
+    assert cache.make_key("vat", "sw", 0) != cache.make_key("vat", "en", 0)
+    assert cache.make_key("vat", "sw", 0) != cache.make_key("vat", "sw", 1)
+
+def test_invalidate():
+    cache = QueryCache()
+    cache.put("k", {"v": 1})
+    cache.invalidate(2)
+    assert len(cache) == 0
+
+def test_sqlite_hits_do_not_write(tmp_path):
+    """Access times are buffered, and applied before eviction picks a victim"""
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.sqlite"), max_entries=2, access_flush_s=60)
+    cache = QueryCache(backend, ttl_seconds=60)
+    cache.put("a", {"v": "a"})
+    time.sleep(0.01)
+    cache.put("b", {"v": "b"})
+
+    conn = backend._connection()
+    writes = conn.total_changes
+    for _ in range(5):
+        assert cache.get("a") == {"v": "a"}
+    assert conn.total_changes == writes
+
+    cache.put("c", {"v": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": "a"}
+
+def test_pipeline_key_covers_raw_text_inputs():
+    """Queries that normalize alike but differ where a stage reads the raw text are cached apart"""
+    pytest.importorskip("transformers")
+    from nlp.full_pipeline import TaxNLP
+    from nlp.model_registry import ModelRegistry
+
+    ner_calls, translated = [], []
+    def ner(texts, batch_size):
+        ner_calls.extend(texts)
+        return [[{"entity_group": "DATE", "word": "20/07/2024"}] for _ in texts]
+
+    def translator(texts, batch_size):
+        translated.extend(texts)
+        return [{"translation_text": "thank you very much"} for _ in texts]
+
+    def sentiment(texts, batch_size):
+        return [{"label": "POSITIVE"} for _ in texts]
+
+    nlp = TaxNLP(lazy=True, warmup=False, cache=QueryCache(), fields=["entities", "sentiment"])
+    nlp.models = ModelRegistry(
+        loaders={"ner": lambda: ner, "translator": lambda: translator, "sentiment": lambda: sentiment},
+        warmup_on_load=False
+    )
+
+    # Normalization turns both into "vat due on 20072024"; only the first has a date cue
+    dated = nlp.process_query("VAT due on 20/07/2024", language="en", fields=["entities"])
+    plain = nlp.process_query("VAT due on 20072024", language="en", fields=["entities"])
+    assert len(ner_calls) == 1
+    assert dated["entities"]["DATE"] == ["20/07/2024"] and plain["entities"]["DATE"] == []
+
+    # The translator sees raw text, so casing and punctuation matter for Swahili input
+    nlp.process_query("Asante sana kwa msaada!", language="sw", fields=["sentiment"])
+    nlp.process_query("asante sana kwa msaada", language="sw", fields=["sentiment"])
+    nlp.process_query("Asante sana kwa msaada!", language="sw", fields=["sentiment"])
+    assert translated == ["Asante sana kwa msaada!", "asante sana kwa msaada"]
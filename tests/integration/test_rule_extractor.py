@@ -0,0 +1,63 @@
+"""
+FILE: tests/integration/test_rule_extractor.py
+DESCRIPTION: Tests for the rule-only structured entity fast path
+"""
+
+import pytest
+from nlp.entity_recognition.rule_extractor import RuleExtractor
+
+@pytest.fixture
+def rules():
+    return RuleExtractor("test", {label: label for label in ("TAX_TYPE", "KRA_PIN", "TAX_FORM", "CURRENCY")})
+
+def test_structured_query_skips_model(rules):
+    entities = rules.fast_path("Nimekosa deadline ya P9A kwa PIN A123456789K, nilipe KES 5,000?")
+    assert entities == {
+        "TAX_TYPE": [], "KRA_PIN": ["A123456789K"], "TAX_FORM": ["P9A"], "CURRENCY": ["KES 5,000"]
+    }
+    assert rules.stats == {"hits": 1, "misses": 0}
+
+def test_form_code_is_not_a_tax_type(rules):
+    assert rules.extract("fomu ya VAT3 na VAT")["TAX_FORM"] == ["VAT3"]
+    assert rules.extract("fomu ya VAT3 na VAT")["TAX_TYPE"] == ["VAT"]
+
+def test_model_needed_without_hits_or_with_dates(rules):
+    assert rules.fast_path("Nahitaji msaada tafadhali") is None
+    assert rules.fast_path("PAYE ya tarehe 9 Juni") is None
+    assert rules.fast_path("VAT due on 20/07/2024") is None
+    assert rules.stats == {"hits": 0, "misses": 3}
+
+def test_lowercased_input_and_label_mapping():
+    rules = RuleExtractor("test", {"KRA_PIN": "KRA_PIN", "CURRENCY": "AMOUNT"},
+                          ("TAX_TYPE", "KRA_PIN", "AMOUNT", "DATE"))
+    assert rules.fast_path("pin a123456789k nilipe 500 bob") == {
+        "TAX_TYPE": [], "KRA_PIN": ["a123456789k"], "AMOUNT": ["500 bob"], "DATE": []
+    }
+
+def test_merge_adds_missed_rule_hits():
+    merged = RuleExtractor.merge(
+        {"KRA_PIN": ["a123456789k"], "DATE": ["30 June"]},
+        {"KRA_PIN": ["A123456789K"], "AMOUNT": ["KES 500", "KES 500"]}
+    )
+    assert merged == {"KRA_PIN": ["a123456789k"], "DATE": ["30 June"], "AMOUNT": ["KES 500"]}
+
+def test_pipeline_sends_numeric_dates_to_model():
+    """Normalization strips "/", so TaxNLP must look for date cues in the raw query"""
+    pytest.importorskip("transformers")
+    from nlp.full_pipeline import TaxNLP
+    from nlp.model_registry import ModelRegistry
+
+    calls = []
+    def ner(texts, batch_size):
+        calls.extend(texts)
+        return [[{"entity_group": "DATE", "word": "20/07/2024"}] for _ in texts]
+
+    nlp = TaxNLP(lazy=True, warmup=False, fields=["entities"])
+    nlp.models = ModelRegistry(loaders={"ner": lambda: ner}, warmup_on_load=False)
+
+    dated = nlp.process_query("VAT due on 20/07/2024", language="en")
+    assert len(calls) == 1
+    assert dated["entities"]["DATE"] == ["20/07/2024"] and dated["entities"]["TAX_TYPE"]
+
+    undated = nlp.process_query("VAT ya PIN A123456789K", language="sw")
+    assert len(calls) == 1 and undated["entities"]["DATE"] == []
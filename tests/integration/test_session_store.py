@@ -0,0 +1,86 @@
+"""
+FILE: tests/integration/test_session_store.py
+DESCRIPTION: Tests for bounded dialogue session storage
+"""
+
+import threading
+import pytest
+from nlp.session_store import InMemorySessionStore, SQLiteSessionStore, Turn
+
+def make_turn(intent="deadline_query", pending_action=None):
+    return Turn.create(
+        {"intent": intent, "confidence": 0.9},
+        {"TAX_FORM": ["P9A"], "KRA_PIN": []},
+        {"action": "respond", "pending_action": pending_action}
+    )
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def build(**options):
+        if request.param == "sqlite":
+            return SQLiteSessionStore(path=str(tmp_path / "sessions.sqlite"), **options)
+        return InMemorySessionStore(**options)
+    return build
+
+def test_turn_round_trip():
+    turn = make_turn(pending_action="clarify")
+    assert Turn.decode(turn.encode()) == turn
+    assert turn.entity_dict() == {"TAX_FORM": ["P9A"]}
+
+def test_history_keeps_last_turns(make_store):
+    store = make_store(max_turns=3)
+    for intent in ["a", "b", "c", "d", "e"]:
+        store.append_turn("user1", make_turn(intent))
+    assert [turn.intent for turn in store.get_history("user1")] == ["c", "d", "e"]
+
+def test_sessions_expire(make_store):
+    store = make_store(ttl_seconds=0)
+    store.append_turn("user1", make_turn())
+    assert store.get_history("user1") == []
+    assert len(store) == 0
+
+def test_least_recently_used_session_evicted(make_store):
+    store = make_store(max_sessions=2)
+    store.append_turn("user1", make_turn())
+    store.append_turn("user2", make_turn())
+    store.append_turn("user1", make_turn())
+    store.append_turn("user3", make_turn())
+    assert store.get_history("user2") == []
+    assert len(store.get_history("user1")) == 2
+    assert len(store) == 2
+
+def test_memory_cap_evicts(make_store):
+    size = len(make_turn().encode())
+    store = make_store(max_bytes=size * 3 + size // 2)
+    for user in ["user1", "user2", "user3", "user4"]:
+        store.append_turn(user, make_turn())
+    assert len(store) == 3
+    assert store.get_history("user1") == []
+
+def test_reading_history_does_not_refresh_recency(make_store):
+    store = make_store(max_sessions=2)
+    store.append_turn("user1", make_turn())
+    store.append_turn("user2", make_turn())
+    store.get_history("user1")
+    store.append_turn("user3", make_turn())
+    assert store.get_history("user1") == []
+    assert len(store.get_history("user2")) == 1
+
+def test_concurrent_appends_keep_every_turn(tmp_path):
+    """Separate connections, as separate worker processes would use"""
+    path = str(tmp_path / "sessions.sqlite")
+    SQLiteSessionStore(path=path)
+
+    def append(worker):
+        store = SQLiteSessionStore(path=path, max_turns=1000)
+        for idx in range(25):
+            store.append_turn("user1", make_turn(f"{worker}-{idx}"))
+
+    threads = [threading.Thread(target=append, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    history = SQLiteSessionStore(path=path, max_turns=1000).get_history("user1")
+    assert sorted(turn.intent for turn in history) == sorted(f"{w}-{i}" for w in range(4) for i in range(25))
@@ -14,6 +14,17 @@ class TaxAPIError(Exception):
         self.status_code = status_code
         super().__init__(message)
 
+class ServiceOverloadedError(TaxAPIError):
+    """Raised when the inference queue is full and the request is shed"""
+    def __init__(self, message: str = "Service busy, please retry shortly", retry_after: int = 1):
+        self.retry_after = retry_after
+        super().__init__(message, status_code=503)
+
+class InferenceTimeoutError(TaxAPIError):
+    """Raised when a request's deadline passes before inference finishes"""
+    def __init__(self, message: str = "Request timed out waiting for inference"):
+        super().__init__(message, status_code=504)
+
 def handle_api_error(error: Exception) -> Dict[str, Any]:
     """
     Standard error response format
@@ -0,0 +1,116 @@
+"""
+FILE: utils/metrics.py
+DESCRIPTION: Prometheus metrics shared by the API and NLP services
+"""
+
+import time
+from contextlib import contextmanager
+from prometheus_client import Counter, Gauge, Histogram
+
+# Language label values; anything else (e.g. a client-supplied string) is reported as
+# "other" so a bad input cannot mint new time series
+LANGUAGE_LABELS = ("sw", "en", "mixed", "multi")
+OTHER_LANGUAGE = "other"
+
+# Label for batches whose queries are in more than one language
+MULTI_LANGUAGE = "multi"
+
+def language_label(language: str) -> str:
+    """Clamp a language to a bounded metrics label value"""
+    return language if language in LANGUAGE_LABELS else OTHER_LANGUAGE
+
+# Micro-batching
+BATCH_QUEUE_DEPTH = Gauge(
+    'tax_nlp_batch_queue_depth',
+    'Queries waiting to be coalesced into an NLP batch'
+)
+BATCH_SIZE = Histogram(
+    'tax_nlp_batch_size',
+    'Queries per NLP batch',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+BATCH_WAIT_SECONDS = Histogram(
+    'tax_nlp_batch_wait_seconds',
+    'Time a query spent queued before its batch started',
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+
+# Inference executor
+INFERENCE_IN_FLIGHT = Gauge(
+    'tax_nlp_inference_in_flight',
+    'Requests admitted to the inference executor'
+)
+INFERENCE_REJECTED = Counter(
+    'tax_nlp_inference_rejected_total',
+    'Requests shed because the admission queue was full'
+)
+INFERENCE_TIMEOUTS = Counter(
+    'tax_nlp_inference_timeouts_total',
+    'Requests whose deadline passed before inference finished'
+)
+
+# Query result cache
+CACHE_REQUESTS = Counter(
+    'tax_nlp_cache_requests_total',
+    'Query cache lookups',
+    ['result']
+)
+CACHE_EVICTIONS = Counter(
+    'tax_nlp_cache_evictions_total',
+    'Entries evicted from the query cache to stay within limits'
+)
+
+# NLP pipeline stages
+STAGE_LATENCY_SECONDS = Histogram(
+    'tax_nlp_stage_latency_seconds',
+    'Wall time per NLP pipeline stage call',
+    ['stage', 'language', 'model_version'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+REQUEST_TOKENS = Histogram(
+    'tax_nlp_request_tokens',
+    'Whitespace tokens per normalized query',
+    ['language'],
+    buckets=(2, 4, 8, 16, 32, 64, 128, 256)
+)
+PIPELINE_BATCH_SIZE = Histogram(
+    'tax_nlp_pipeline_batch_size',
+    'Queries per TaxNLP pipeline call',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+
+# Rule-only entity fast path
+RULE_FASTPATH_QUERIES = Counter(
+    'tax_nlp_rule_fastpath_queries_total',
+    'Entity extraction requests, by whether rules alone answered them',
+    ['component', 'result']
+)
+RULE_FASTPATH_SAVED_SECONDS = Counter(
+    'tax_nlp_rule_fastpath_saved_seconds_total',
+    'Estimated model time avoided by the rule fast path (mean model cost per query x hits)',
+    ['component']
+)
+
+# Two-tier intent cascade
+INTENT_CASCADE_QUERIES = Counter(
+    'tax_nlp_intent_cascade_queries_total',
+    'Intent predictions, by the cascade tier that produced them',
+    ['component', 'tier']
+)
+
+@contextmanager
+def timed_stage(stage: str, language: str = OTHER_LANGUAGE, model_version: str = "unknown"):
+    """
+    Record the wall time of a pipeline stage
+    :param stage: Stage name, e.g. "intent" or "ner"
+    :param language: Query language ("multi" for batches spanning languages); clamped
+        with language_label
+    :param model_version: Deployed model version
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY_SECONDS.labels(stage, language_label(language), model_version).observe(
+            time.perf_counter() - started
+        )